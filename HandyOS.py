@@ -1,18 +1,35 @@
 # HandyOS_full_v3.py
 import tkinter as tk
-from tkinter import ttk, messagebox, colorchooser
-import datetime, random
+import random
+from scheduler import get_scheduler
+from clock_service import get_clock_service
+from screens import ScreenManager
+from window_pool import WindowPool
+from drag import DragController
+from settings_store import get_settings
+from console import Console
+from theme import Theme
+from wallpaper import Wallpaper, FILETYPES, prefetch
+from lazy import lazy_import
+import leakcheck
+import tracing
+import watchdog
+
+messagebox = lazy_import("tkinter.messagebox")
+colorchooser = lazy_import("tkinter.colorchooser")
+filedialog = lazy_import("tkinter.filedialog")
 
 # ---------------- UTILITY FOR MOVABLE WINDOWS ----------------
 class DraggableWindow(tk.Toplevel):
-    def __init__(self, parent, title="Window", width=400, height=300, bg="#222222"):
+    def __init__(self, parent, title="Window", width=400, height=300, bg="#222222", snap=16):
         super().__init__(parent)
         self.title(title)
         self.geometry(f"{width}x{height}+300+200")
         self.configure(bg=bg)
         self.overrideredirect(True)  # Remove default title bar
-        self._offsetx = 0
-        self._offsety = 0
+        # Motion events are coalesced to one move per frame; windows snap to screen edges
+        self.drag = DragController(self, lambda x, y: self.geometry(f"+{x}+{y}"),
+                                   snap=snap, bounds=self.drag_bounds)
 
         # Custom title bar
         self.title_bar = tk.Frame(self, bg="#555555", relief="raised", bd=0, height=25)
@@ -22,101 +39,170 @@ class DraggableWindow(tk.Toplevel):
         self.close_btn = tk.Button(self.title_bar, text="X", bg="#ff4444", fg="white", command=self.destroy, bd=0)
         self.close_btn.pack(side="right", padx=5)
 
-        self.title_bar.bind("<Button-1>", self.click_win)
-        self.title_bar.bind("<B1-Motion>", self.drag_win)
+        # Toplevel bindings also fire for the title bar and other children
         self.bind("<Button-1>", self.click_win)
         self.bind("<B1-Motion>", self.drag_win)
+        self.bind("<ButtonRelease-1>", self.drop_win)
 
     def click_win(self, event):
-        self._offsetx = event.x
-        self._offsety = event.y
+        self.drag.start(event, self.winfo_rootx(), self.winfo_rooty())
 
     def drag_win(self, event):
-        x = self.winfo_pointerx() - self._offsetx
-        y = self.winfo_pointery() - self._offsety
-        self.geometry(f"+{x}+{y}")
+        self.drag.motion(event)
+
+    def drop_win(self, event):
+        self.drag.end(event)
+
+    def drag_bounds(self):
+        return (0, 0, self.winfo_screenwidth() - self.winfo_width(),
+                self.winfo_screenheight() - self.winfo_height())
 
 # ---------------- HANDY OS ----------------
 class HandyOS:
+    TRANSITIONS = ("show_boot", "show_setup_stage", "show_desktop", "restart", "shutdown")
+
     def __init__(self, root):
         self.root = root
         self.root.title("HandyOS")
         self.root.attributes("-fullscreen", True)
+        self.settings = get_settings("handy")
         self.user_data = {"color": "#0080ff", "bg": "#003366", "username": "User"}
+        self.user_data.update(self.settings.get("user_data", {}))
+        # Widgets refer to these roles, so a colour change reaches every one of them
+        self.theme = Theme(self.root, {"accent": self.user_data["color"], "background": self.user_data["bg"]})
+        # Decode the saved wallpaper while booting
+        if self.settings.get("wallpaper"):
+            prefetch(self.root, self.settings.get("wallpaper"))
+        self.scheduler = get_scheduler(self.root)
+        tracing.install(self)
+        watchdog.install(self)
+        leakcheck.install(self)
+        # Screens are built once and switched by raising them
+        self.screens = ScreenManager(self.root)
+        self.screens.register("boot", self.build_boot)
+        self.screens.register("setup", self.build_setup_stage)
+        self.screens.register("desktop", self.build_desktop, pinned=True)
+        self.screens.register("shutdown", self.build_shutdown)
+        self.windows = WindowPool(self.root)
+        self.windows.register("start_menu", self.build_start_menu, single_instance=True)
+        self.boot_job = None
         self.show_boot()
 
     def clear(self):
+        # Close open app windows; the screens themselves are retained
         for w in self.root.winfo_children():
-            w.destroy()
+            if isinstance(w, tk.Toplevel) and not self.windows.owns(w):
+                w.destroy()
+        self.windows.close_all()
 
     # ---------------- BOOT SCREEN ----------------
     def show_boot(self):
         self.clear()
-        self.root.configure(bg="black")
-        tk.Label(self.root, text="HandyOS", fg="lightgreen",
-                 bg="black", font=("Segoe UI", 40, "bold")).place(relx=0.5, rely=0.5, anchor="center")
-        self.root.after(2500, self.show_setup_stage)
+        frame = self.screens.show("boot")
+        if self.boot_job is not None:
+            self.boot_job.cancel()
+        self.boot_job = self.scheduler.after(2500, self.finish_boot, owner=frame)
+
+    def finish_boot(self):
+        # The setup wizard only runs until it has been completed once
+        if self.settings.get("setup_done"):
+            self.show_desktop()
+        else:
+            self.show_setup_stage()
+
+    def build_boot(self, frame):
+        frame.configure(bg="black")
+        logo = tk.Label(frame, text="HandyOS", fg="lightgreen",
+                        bg="black", font=("Segoe UI", 40, "bold"))
+        logo.place(relx=0.5, rely=0.5, anchor="center")
 
     # ---------------- SETUP ----------------
     def show_setup_stage(self):
-        self.clear()
-        self.root.configure(bg="#001a33")
-        tk.Label(self.root, text="HandyOS Setup", fg="lightgreen",
+        self.screens.show("setup")
+
+    def build_setup_stage(self, frame):
+        frame.configure(bg="#001a33")
+        tk.Label(frame, text="HandyOS Setup", fg="lightgreen",
                  bg="#001a33", font=("Segoe UI", 36, "bold")).pack(pady=50)
-        tk.Label(self.root, text="Choose Accent Color and Background", fg="white",
+        tk.Label(frame, text="Choose Accent Color and Background", fg="white",
                  bg="#001a33", font=("Segoe UI", 18)).pack(pady=20)
-        tk.Button(self.root, text="Pick Accent Color", font=("Segoe UI", 14),
+        tk.Button(frame, text="Pick Accent Color", font=("Segoe UI", 14),
                   command=self.pick_accent).pack(pady=10)
-        tk.Button(self.root, text="Pick Background Color", font=("Segoe UI", 14),
+        tk.Button(frame, text="Pick Background Color", font=("Segoe UI", 14),
                   command=self.pick_background).pack(pady=10)
-        tk.Label(self.root, text="Username:", fg="white", bg="#001a33", font=("Segoe UI", 14)).pack(pady=10)
-        self.username_entry = tk.Entry(self.root, font=("Segoe UI", 14))
+        tk.Label(frame, text="Username:", fg="white", bg="#001a33", font=("Segoe UI", 14)).pack(pady=10)
+        self.username_entry = tk.Entry(frame, font=("Segoe UI", 14))
+        self.username_entry.insert(0, self.settings.get("user_data", {}).get("username", ""))
         self.username_entry.pack(pady=10)
-        tk.Button(self.root, text="Finish Setup ▶", font=("Segoe UI", 16),
+        tk.Button(frame, text="Finish Setup ▶", font=("Segoe UI", 16),
                   command=self.finish_setup).pack(pady=30)
 
     def pick_accent(self):
         color = colorchooser.askcolor(title="Choose Accent Color")
         if color[1]:
             self.user_data["color"] = color[1]
+            self.save_user_data()
+            self.theme.set_palette(accent=color[1])
 
     def pick_background(self):
         color = colorchooser.askcolor(title="Choose Background Color")
         if color[1]:
             self.user_data["bg"] = color[1]
-            self.root.configure(bg=color[1])
+            self.save_user_data()
+            self.theme.set_palette(background=color[1])
+            # A plain colour replaces the wallpaper image
+            self.settings.delete("wallpaper")
+            if self.screens.built("desktop"):
+                self.wallpaper.clear()
+            # Preview on the setup screen, which keeps its own colours otherwise
+            self.screens.get(self.screens.current).configure(bg=color[1])
+
+    def pick_wallpaper(self):
+        path = filedialog.askopenfilename(title="Choose Wallpaper", filetypes=FILETYPES)
+        if path:
+            self.wallpaper.show(path)
+            self.settings.set("wallpaper", path)
 
     def finish_setup(self):
         self.user_data["username"] = self.username_entry.get() or "User"
+        self.save_user_data()
+        self.settings.set("setup_done", True)
         self.show_desktop()
 
+    def save_user_data(self):
+        self.settings.set("user_data", dict(self.user_data))
+
     # ---------------- DESKTOP ----------------
     def show_desktop(self):
-        self.clear()
-        self.root.configure(bg=self.user_data["bg"])
-        self.root.bind("<Button-3>", self.show_context_menu)
+        self.screens.show("desktop")
+
+    def build_desktop(self, frame):
+        self.theme.bind(frame, bg="background")
+        frame.bind("<Button-3>", self.show_context_menu)
+        self.wallpaper = Wallpaper(frame, on_error=lambda msg: messagebox.showerror("Wallpaper", msg))
+        if self.settings.get("wallpaper"):
+            self.wallpaper.show(self.settings.get("wallpaper"))
         # Taskbar
-        taskbar = tk.Frame(self.root, bg=self.user_data["color"], height=40)
-        taskbar.pack(side="bottom", fill="x")
-        start_btn = tk.Button(taskbar, text="Start", bg="#333", fg="white",
+        self.taskbar = tk.Frame(frame, height=40)
+        self.theme.bind(self.taskbar, bg="accent")
+        self.taskbar.pack(side="bottom", fill="x")
+        start_btn = tk.Button(self.taskbar, text="Start", bg="#333", fg="white",
                               font=("Segoe UI", 10), command=self.open_start_menu)
         start_btn.pack(side="left")
-        self.clock = tk.Label(taskbar, text=datetime.datetime.now().strftime("%H:%M:%S"),
-                              fg="white", bg=self.user_data["color"], font=("Segoe UI", 12))
+        self.clock = tk.Label(self.taskbar, font=("Segoe UI", 12))
+        self.theme.bind(self.clock, bg="accent", fg="accent~text")
         self.clock.pack(side="right", padx=10)
-        self.update_clock()
+        get_clock_service(self.root).subscribe(self.clock, "%H:%M:%S")
         # Desktop Icons
-        my_comp = tk.Button(self.root, text="My Computer", width=14, height=2, command=self.show_setup_stage)
+        my_comp = tk.Button(frame, text="My Computer", width=14, height=2, command=self.show_setup_stage)
         my_comp.place(x=100, y=100)
-        tk.Button(self.root, text="Recycle Bin", width=14, height=2).place(x=100, y=180)
-
-    def update_clock(self):
-        self.clock.config(text=datetime.datetime.now().strftime("%H:%M:%S"))
-        self.root.after(1000, self.update_clock)
+        tk.Button(frame, text="Recycle Bin", width=14, height=2).place(x=100, y=180)
 
     # ---------------- START MENU ----------------
     def open_start_menu(self):
-        menu = tk.Toplevel(self.root)
+        self.windows.open("start_menu")
+
+    def build_start_menu(self, menu):
         menu.title("Start Menu")
         menu.geometry("400x500+10+200")
         menu.configure(bg="#1a1a1a")
@@ -131,14 +217,16 @@ class HandyOS:
             ("Power", self.power_menu)
         ]
         for text, cmd in sections:
-            tk.Button(menu, text=text, width=30, height=2, bg=self.user_data["color"], fg="white",
-                      font=("Segoe UI", 12), command=cmd).pack(pady=4)
+            btn = tk.Button(menu, text=text, width=30, height=2, font=("Segoe UI", 12), command=cmd)
+            self.theme.bind(btn, bg="accent", fg="accent~text", activebackground="accent~light")
+            btn.pack(pady=4)
 
     # ---------------- RIGHT CLICK ----------------
     def show_context_menu(self, event):
         ctx = tk.Menu(self.root, tearoff=0)
         ctx.add_command(label="Refresh", command=lambda: messagebox.showinfo("Refreshed", "Desktop refreshed"))
         ctx.add_command(label="Change Background", command=self.pick_background)
+        ctx.add_command(label="Change Wallpaper", command=self.pick_wallpaper)
         ctx.add_command(label="Personalize", command=self.control_panel)
         ctx.post(event.x_root, event.y_root)
 
@@ -151,8 +239,10 @@ class HandyOS:
             "System", "Product Activation", "Browser Options", "Network Settings", "Updates"
         ]
         for opt in options:
-            tk.Button(cp, text=opt, width=30, height=2, bg=self.user_data["color"], fg="white",
-                      font=("Segoe UI", 12), command=lambda o=opt: messagebox.showinfo(o, f"{o} settings coming soon")).pack(pady=4)
+            btn = tk.Button(cp, text=opt, width=30, height=2, font=("Segoe UI", 12),
+                            command=lambda o=opt: messagebox.showinfo(o, f"{o} settings coming soon"))
+            self.theme.bind(btn, bg="accent", fg="accent~text", activebackground="accent~light")
+            btn.pack(pady=4)
 
     # ---------------- OTHER APPS ----------------
     def about_os(self):
@@ -167,18 +257,20 @@ class HandyOS:
 
     def command_prompt(self):
         cmd = DraggableWindow(self.root, title="Command Prompt", width=600, height=400)
-        text = tk.Text(cmd, bg="black", fg="lightgreen", insertbackground="lightgreen")
-        text.pack(fill="both", expand=True)
-        text.insert("end", "HandyOS CMD v1.0\nType 'help' for commands.\n\nC:\\> ")
-        text.bind("<Return>", lambda e: text.insert("end", "\nC:\\> "))
+        # Built-ins and real programs; output is streamed in per frame with a capped scrollback
+        console = Console(cmd, banner="HandyOS CMD v1.0\nType 'help' for commands.\n\n",
+                          bg="black", fg="lightgreen", insertbackground="lightgreen")
+        console.pack(fill="both", expand=True)
+        console.focus()
 
     def run_box(self):
         rb = DraggableWindow(self.root, title="Run", width=400, height=150)
         tk.Label(rb, text="Type the name of a program:", fg="white", bg="#222222", font=("Segoe UI", 12)).pack(pady=10)
         entry = tk.Entry(rb, font=("Segoe UI", 12))
         entry.pack(pady=5)
-        tk.Button(rb, text="OK", bg=self.user_data["color"], fg="white",
-                  command=lambda: messagebox.showinfo("Run", f"Running: {entry.get()}")).pack(pady=5)
+        ok = tk.Button(rb, text="OK", command=lambda: messagebox.showinfo("Run", f"Running: {entry.get()}"))
+        self.theme.bind(ok, bg="accent", fg="accent~text", activebackground="accent~light")
+        ok.pack(pady=5)
 
     def power_menu(self):
         pwr = DraggableWindow(self.root, title="Power Options", width=300, height=200)
@@ -190,9 +282,12 @@ class HandyOS:
     def shutdown(self, win):
         win.destroy()
         self.clear()
-        self.root.configure(bg="black")
-        tk.Label(self.root, text="Shutting down HandyOS...", fg="white", bg="black", font=("Segoe UI", 24)).pack(pady=300)
-        self.root.after(2500, self.root.quit)
+        self.screens.show("shutdown")
+        self.scheduler.after(2500, self.root.quit)
+
+    def build_shutdown(self, frame):
+        frame.configure(bg="black")
+        tk.Label(frame, text="Shutting down HandyOS...", fg="white", bg="black", font=("Segoe UI", 24)).pack(pady=300)
 
     def restart(self, win):
         win.destroy()
@@ -203,7 +298,11 @@ class HandyOS:
         messagebox.showinfo("Coming Soon", "This feature is under development.")
 
 # ---------------- RUN APP ----------------
-if __name__ == "__main__":
+def main():
     root = tk.Tk()
-    app = HandyOS(root)
+    HandyOS(root)
     root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,103 @@
 ﻿import tkinter as tk
-from tkinter import messagebox, filedialog
-import time
-import threading
-import os
-import winsound
-from datetime import datetime
+from lazy import lazy_import
+from audio import get_mixer
+from clock_service import get_clock_service
+from power_model import get_power_service, battery_text, wifi_text
+from scheduler import get_scheduler
+from screens import ScreenManager
+from window_pool import WindowPool
+from settings_store import get_settings
+from wallpaper import Wallpaper, FILETYPES, prefetch
+import leakcheck
+import tracing
+import watchdog
+
+# Only loaded when first used
+messagebox = lazy_import("tkinter.messagebox")
+filedialog = lazy_import("tkinter.filedialog")
+colorchooser = lazy_import("tkinter.colorchooser")
+
+BOOT_SOUND = ("boot.wav", (1000, 500))
+CLICK_SOUND = ("click.wav", (800, 100))
 
 # Main OS Class
 class MacMacSystemOS:
-    def __init__(self):
-        self.root = tk.Tk()
+    TRANSITIONS = ("boot_screen", "login_screen", "desktop_screen", "restart_system")
+
+    def __init__(self, root=None):
+        # Run standalone with our own Tk root, or inside a root owned by a host/benchmark
+        self.owns_root = root is None
+        self.root = tk.Tk() if root is None else root
+        self.scheduler = get_scheduler(self.root)
+        self.settings = get_settings("mac")
+        self.power = get_power_service(self.root, seed=1, battery=100.0)
+        # Sounds are decoded once on the mixer's worker, so clicks never touch the disk
+        self.mixer = get_mixer()
+        self.mixer.preload(CLICK_SOUND[0])
+        # Decode the saved wallpaper while the boot and login screens are up
+        if self.settings.get("wallpaper"):
+            prefetch(self.root, self.settings.get("wallpaper"))
+        tracing.install(self)
+        watchdog.install(self)
+        leakcheck.install(self)
+        # Screens are built once and switched by raising them
+        self.screens = ScreenManager(self.root)
+        self.screens.register("boot", self.build_boot_screen)
+        self.screens.register("login", self.build_login_screen, self.refresh_login_screen)
+        self.screens.register("desktop", self.build_desktop_screen, pinned=True)
+        # App windows are built once and reused across launches
+        self.windows = WindowPool(self.root)
+        self.windows.register("file_manager", self.build_file_manager, single_instance=True)
+        self.windows.register("web", self.build_web, single_instance=True)
+        self.windows.register("store", self.build_store, single_instance=True)
+        self.windows.register("settings", self.build_settings, single_instance=True)
+        self.power.add_input(lambda model: model.set_apps(self.windows.open_count()))
+        self.boot_screen()
+        if self.owns_root:
+            self.root.mainloop()
+
+    def boot_screen(self):
         self.root.title("Mac Mac System OS Boot")
         self.root.configure(bg="black")
         self.root.attributes('-fullscreen', True)
+        self.screens.show("boot")
+
+        # Play boot sound
+        self.play_boot_sound()
+        # Start boot loading animation
+        self.boot_step = 0
+        self.scheduler.every(300, self.boot_loading, owner=self.loading, delay_ms=0)
+
+    def build_boot_screen(self, frame):
+        frame.configure(bg="black")
 
         # Boot Apple logo
-        self.apple_logo = tk.Label(self.root, text="", font=("Helvetica", 180), fg="white", bg="black")
+        self.apple_logo = tk.Label(frame, text="", font=("Helvetica", 180), fg="white", bg="black")
         self.apple_logo.pack(pady=200)
 
         # Loading animation
-        self.loading = tk.Label(self.root, text="●", fg="white", bg="black", font=("Arial", 30))
+        self.loading = tk.Label(frame, text="●", fg="white", bg="black", font=("Arial", 30))
         self.loading.pack()
 
-        # Play boot sound
-        threading.Thread(target=self.play_boot_sound).start()
-        # Start boot loading animation
-        threading.Thread(target=self.boot_loading).start()
-
-        self.root.mainloop()
-
     def play_boot_sound(self):
-        try:
-            if os.path.exists("boot.wav"):
-                winsound.PlaySound("boot.wav", winsound.SND_FILENAME)
-            else:
-                winsound.Beep(1000, 500)
-        except:
-            pass
+        path, beep = BOOT_SOUND
+        self.mixer.play(path, fallback=beep)
 
     def boot_loading(self):
-        for i in range(12):
-            self.loading.config(text="●" + "." * (i % 4))
-            time.sleep(0.3)
-        self.root.after(0, self.login_screen)
+        if self.boot_step == 12:
+            self.login_screen()
+            return False
+        self.loading.config(text="●" + "." * (self.boot_step % 4))
+        self.boot_step += 1
 
     def login_screen(self):
-        for widget in self.root.winfo_children():
-            widget.destroy()
-
         self.root.title("Mac Mac System OS - Login")
-        self.root.configure(bg="#EAEAEA")
+        self.screens.show("login")
+
+    def build_login_screen(self, frame):
+        frame.configure(bg="#EAEAEA")
 
-        login_frame = tk.Frame(self.root, bg="white", bd=0, relief="flat")
+        login_frame = tk.Frame(frame, bg="white", bd=0, relief="flat")
         login_frame.place(relx=0.5, rely=0.5, anchor="center", width=400, height=300)
         login_frame.config(highlightthickness=2, highlightbackground="#CCCCCC")
 
@@ -66,6 +112,10 @@ class MacMacSystemOS:
         self.password_entry.pack(pady=10)
         tk.Button(login_frame, text="Login", font=("Arial", 12), command=self.check_password).pack(pady=5)
 
+    def refresh_login_screen(self, frame):
+        self.password_entry.delete(0, "end")
+        self.password_entry.focus_set()
+
     def check_password(self):
         if self.password_entry.get() == "1234":
             self.desktop_screen()
@@ -73,14 +123,18 @@ class MacMacSystemOS:
             messagebox.showerror("Error", "Incorrect password!")
 
     def desktop_screen(self):
-        for widget in self.root.winfo_children():
-            widget.destroy()
-
         self.root.title("Mac Mac System OS - Desktop")
-        self.root.configure(bg="#FFD700")  # Gold-themed desktop
+        self.screens.show("desktop")
+
+    def build_desktop_screen(self, frame):
+        self.desktop = frame
+        self.desktop.configure(bg=self.settings.get("background", "#FFD700"))  # Gold-themed by default
+        self.wallpaper = Wallpaper(frame, on_error=lambda msg: messagebox.showerror("Wallpaper", msg))
+        if self.settings.get("wallpaper"):
+            self.wallpaper.show(self.settings.get("wallpaper"))
 
         # Top Bar
-        top_bar = tk.Frame(self.root, bg="#FFFFFF", height=40, relief="flat", bd=0)
+        top_bar = tk.Frame(frame, bg="#FFFFFF", height=40, relief="flat", bd=0)
         top_bar.pack(side="top", fill="x")
 
         # Apple Button
@@ -91,19 +145,21 @@ class MacMacSystemOS:
         # Date/Time Display
         self.time_label = tk.Label(top_bar, font=("Arial", 12), bg="white")
         self.time_label.pack(side="right", padx=10)
-        self.update_time()
+        get_clock_service(self.root).subscribe(self.time_label, "%Y-%m-%d %H:%M:%S")
 
-        # Battery and Wi-Fi Icons (simple placeholders)
-        battery_label = tk.Label(top_bar, text="🔋 100%", bg="white", font=("Arial", 12))
+        # Battery and Wi-Fi, updated by the device model only when they change
+        battery_label = tk.Label(top_bar, bg="white", font=("Arial", 12))
         battery_label.pack(side="right", padx=5)
-        wifi_label = tk.Label(top_bar, text="📶", bg="white", font=("Arial", 12))
+        self.power.subscribe(battery_label, battery_text)
+        wifi_label = tk.Label(top_bar, bg="white", font=("Arial", 12))
         wifi_label.pack(side="right", padx=5)
+        self.power.subscribe(wifi_label, wifi_text)
 
         # Desktop Interaction (double-click)
-        self.root.bind("<Double-1>", self.change_background)
+        frame.bind("<Double-1>", self.change_background)
 
         # Floating Dock / Taskbar
-        taskbar = tk.Frame(self.root, bg="#F0F0F0", height=70, relief="flat")
+        taskbar = tk.Frame(frame, bg="#F0F0F0", height=70, relief="flat")
         taskbar.place(relx=0.5, rely=0.95, anchor="s", width=550, height=70)
         taskbar.config(highlightbackground="#DADADA", highlightthickness=2)
 
@@ -117,10 +173,9 @@ class MacMacSystemOS:
         tk.Button(taskbar, text="⚙️", font=("Arial", 20), relief="flat", bg="#F0F0F0",
                   command=self.open_settings).pack(side="left", padx=20)
 
-    def update_time(self):
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.time_label.config(text=now)
-        self.root.after(1000, self.update_time)
+        # Build the dock apps' windows in the background so launching them is instant
+        for app_type in ("file_manager", "web", "store", "settings"):
+            self.windows.prewarm(app_type)
 
     # Apple Menu
     def show_apple_menu(self):
@@ -133,64 +188,86 @@ class MacMacSystemOS:
                   bg="white", relief="flat").pack(fill="x")
         tk.Button(menu, text="Shut Down", command=self.shutdown_system,
                   bg="white", relief="flat").pack(fill="x")
-        menu.after(5000, menu.destroy)
+        # On the scheduler, so the timeout stands still while the session is suspended
+        self.scheduler.after(5000, menu.destroy, owner=menu)
 
     def restart_system(self):
+        # Reboot on the same root: close app windows, keep the built screens
         for widget in self.root.winfo_children():
-            widget.destroy()
-        self.__init__()
+            if isinstance(widget, tk.Toplevel) and not self.windows.owns(widget):
+                widget.destroy()
+        self.windows.close_all()
+        self.boot_screen()
 
     def shutdown_system(self):
         self.root.destroy()  # Fully closes the OS simulator
 
     def change_background(self, event=None):
-        color = filedialog.askcolor(title="Choose Desktop Background")[1]
+        color = colorchooser.askcolor(title="Choose Desktop Background")[1]
         if color:
-            self.root.configure(bg=color)
+            # A plain colour replaces the wallpaper image
+            self.wallpaper.clear()
+            self.desktop.configure(bg=color)
+            self.settings.set("background", color)
+            self.settings.delete("wallpaper")
+
+    def change_wallpaper(self):
+        path = filedialog.askopenfilename(title="Choose Wallpaper", filetypes=FILETYPES)
+        if path:
+            self.wallpaper.show(path)
+            self.settings.set("wallpaper", path)
 
     # App Windows
     def open_file_manager(self):
         self.play_click_sound()
-        win = tk.Toplevel(self.root)
+        self.windows.open("file_manager")
+
+    def open_web(self):
+        self.play_click_sound()
+        self.windows.open("web")
+
+    def open_store(self):
+        self.play_click_sound()
+        self.windows.open("store")
+
+    def open_settings(self):
+        self.play_click_sound()
+        self.windows.open("settings")
+
+    def build_file_manager(self, win):
         win.title("File Manager")
         win.geometry("400x300")
         tk.Label(win, text="File Manager App", font=("Arial", 16)).pack(pady=20)
 
-    def open_web(self):
-        self.play_click_sound()
-        win = tk.Toplevel(self.root)
+    def build_web(self, win):
         win.title("Web Browser")
         win.geometry("400x300")
         tk.Label(win, text="Web Browser App", font=("Arial", 16)).pack(pady=20)
 
-    def open_store(self):
-        self.play_click_sound()
-        win = tk.Toplevel(self.root)
+    def build_store(self, win):
         win.title("App Store")
         win.geometry("400x300")
         tk.Label(win, text="App Store App", font=("Arial", 16)).pack(pady=20)
 
-    def open_settings(self):
-        self.play_click_sound()
-        win = tk.Toplevel(self.root)
+    def build_settings(self, win):
         win.title("Settings")
         win.geometry("400x350")
         tk.Label(win, text="Settings App", font=("Arial", 16)).pack(pady=10)
 
         tk.Button(win, text="Change Background", command=self.change_background).pack(pady=5)
+        tk.Button(win, text="Change Wallpaper", command=self.change_wallpaper).pack(pady=5)
         tk.Button(win, text="Display Settings (Placeholder)", command=lambda: messagebox.showinfo("Display", "Display settings placeholder")).pack(pady=5)
         tk.Button(win, text="About Mac Mac System OS", command=lambda: messagebox.showinfo("About", "Mac Mac System OS v1.0\nCreated in Python")).pack(pady=5)
 
     # Sounds
     def play_click_sound(self):
-        try:
-            if os.path.exists("click.wav"):
-                winsound.PlaySound("click.wav", winsound.SND_FILENAME | winsound.SND_ASYNC)
-            else:
-                winsound.Beep(800, 100)
-        except:
-            pass
+        path, beep = CLICK_SOUND
+        self.mixer.play(path, fallback=beep)
 
-if __name__ == "__main__":
+def main():
     MacMacSystemOS()
 
+
+if __name__ == "__main__":
+    main()
+
@@ -1,12 +1,51 @@
 import tkinter as tk
 import random
+from scheduler import get_scheduler, FRAME_MS, PRIORITY_LOW
+import leakcheck
+import tracing
+import watchdog
+# A channel has a few shapes, so its SpriteField never imports numpy
+import tv_physics
+
+# Holding Left/Right repeats the key ~30 times a second; channels in between
+# only show their name, the picture follows once the keys have been quiet
+ZAP_SETTLE_MS = 150
+
+
+class ChannelScene:
+    """One channel's shapes: built once, then only hidden and shown.
+
+    Every item of the scene carries ``tag``, so switching channels is one
+    ``itemconfigure`` per scene, and the scene's sprites keep their positions
+    and velocities while another channel is on.
+    """
+
+    def __init__(self, canvas, index, kind):
+        self.canvas = canvas
+        self.kind = kind
+        self.tag = f"channel{index}"
+        self.sprites = tv_physics.SpriteField(int(canvas["width"]), int(canvas["height"]), tag=self.tag)
+        self.built = False
+
+    def show(self):
+        self.canvas.itemconfigure(self.tag, state="normal")
+
+    def hide(self):
+        self.canvas.itemconfigure(self.tag, state="hidden")
+
 
 class TV:
+    TRANSITIONS = ("show_channel",)
+
     def __init__(self, root):
         self.root = root
         self.root.title("tvOS Cartoon Simulator")
         self.root.geometry("800x600")
         self.root.config(bg="black")
+        self.scheduler = get_scheduler(self.root)
+        tracing.install(self)
+        watchdog.install(self)
+        leakcheck.install(self)
 
         self.is_on = False
         self.volume = 50
@@ -41,16 +80,27 @@ class TV:
         self.root.bind("<Right>", self.next_channel)
         self.root.bind("<Return>", self.first_channel)
 
-        self.animation_objects = []
+        self.scenes = None
+        self.scene = None
+        self.sprites = None
+        self.animation_job = None
+        self._zap_job = None
+        self._zap_pending = False
+        self._prefetch_job = None
+        # Stats
+        self.scenes_built = 0
 
     # Power On sequence
     def power_on(self):
         if not self.is_on:
             self.power_button.destroy()
             self.label.config(text="Booting up tvOS...")
-            self.root.after(2000, self.start_tv)
+            self.scheduler.after(2000, self.start_tv)
 
     def start_tv(self):
+        if self.scenes is None:
+            self.scenes = [ChannelScene(self.canvas, i, channel["type"])
+                           for i, channel in enumerate(self.channels)]
         self.is_on = True
         self.show_channel()
 
@@ -62,64 +112,82 @@ class TV:
     def show_channel(self):
         if not self.is_on:
             return
-        self.canvas.delete("all")
         channel = self.channels[self.channel_index]
         self.label.config(text=f"{channel['name']} | Volume: {self.volume}%")
-        self.animation_objects = []
-
-        if channel['type'] == "news":
-            self.create_news_shapes()
-        elif channel['type'] == "tomjerry":
-            self.create_tom_jerry_shapes()
-        else:
-            self.create_cartoon_shapes()
-
-        self.animate()
+        scene = self.build_scene(self.channel_index)
+        if scene is not self.scene:
+            if self.scene is not None:
+                self.scene.hide()
+            scene.show()
+            self.scene = scene
+            self.sprites = scene.sprites
+
+        # One animation loop per TV, however often the channel changes
+        if self.animation_job is None or not self.animation_job.active:
+            self.animation_job = self.scheduler.every(30, self.animate, owner=self.canvas)
+        # Build the neighbours once this frame is on screen
+        if self._prefetch_job is None or not self._prefetch_job.active:
+            self._prefetch_job = self.scheduler.after(FRAME_MS, self.prefetch, priority=PRIORITY_LOW,
+                                                      owner=self.canvas)
+
+    def build_scene(self, index):
+        """Return channel ``index``'s scene, creating its shapes (hidden) the first time."""
+        scene = self.scenes[index]
+        if not scene.built:
+            if scene.kind == "news":
+                self.create_news_shapes(scene)
+            elif scene.kind == "tomjerry":
+                self.create_tom_jerry_shapes(scene)
+            else:
+                self.create_cartoon_shapes(scene)
+            scene.built = True
+            self.scenes_built += 1
+        return scene
+
+    def prefetch(self):
+        """Build the channels either side of the current one, so zapping to them is instant."""
+        count = len(self.scenes)
+        for index in (self.channel_index + 1, self.channel_index - 1):
+            self.build_scene(index % count)
 
     # News shapes
-    def create_news_shapes(self):
+    def create_news_shapes(self, scene):
         for i in range(3):
             x = random.randint(50, 700)
             y = random.randint(50, 450)
-            rect = self.canvas.create_rectangle(x, y, x+50, y+100, fill="blue")
-            self.animation_objects.append({"id": rect, "dx": 0, "dy": random.choice([-2, 2])})
+            rect = self.canvas.create_rectangle(x, y, x+50, y+100, fill="blue", tags=scene.tag, state="hidden")
+            scene.sprites.add(rect, x, y, 50, 100, 0, random.choice([-2, 2]))
 
     # Tom and Jerry shapes
-    def create_tom_jerry_shapes(self):
+    def create_tom_jerry_shapes(self, scene):
         # Tom as big gray rectangle, Jerry as small brown circle
         tom_x = random.randint(100, 600)
         tom_y = random.randint(100, 400)
-        tom = self.canvas.create_rectangle(tom_x, tom_y, tom_x+80, tom_y+120, fill="gray")
-        self.animation_objects.append({"id": tom, "dx": random.choice([-3,3]), "dy": random.choice([-3,3])})
+        tom = self.canvas.create_rectangle(tom_x, tom_y, tom_x+80, tom_y+120, fill="gray",
+                                           tags=scene.tag, state="hidden")
+        scene.sprites.add(tom, tom_x, tom_y, 80, 120, random.choice([-3,3]), random.choice([-3,3]))
 
         jerry_x = random.randint(100, 600)
         jerry_y = random.randint(100, 400)
-        jerry = self.canvas.create_oval(jerry_x, jerry_y, jerry_x+40, jerry_y+40, fill="brown")
-        self.animation_objects.append({"id": jerry, "dx": random.choice([-4,4]), "dy": random.choice([-4,4])})
+        jerry = self.canvas.create_oval(jerry_x, jerry_y, jerry_x+40, jerry_y+40, fill="brown",
+                                        tags=scene.tag, state="hidden")
+        scene.sprites.add(jerry, jerry_x, jerry_y, 40, 40, random.choice([-4,4]), random.choice([-4,4]))
 
     # Other cartoon shapes
-    def create_cartoon_shapes(self):
+    def create_cartoon_shapes(self, scene):
         for i in range(5):
             x = random.randint(50, 700)
             y = random.randint(50, 450)
             size = random.randint(30, 80)
             color = random.choice(["red", "green", "yellow", "purple", "orange", "pink", "cyan"])
-            oval = self.canvas.create_oval(x, y, x+size, y+size, fill=color)
-            self.animation_objects.append({"id": oval, "dx": random.choice([-3,3]), "dy": random.choice([-3,3]), "size": size})
+            oval = self.canvas.create_oval(x, y, x+size, y+size, fill=color, tags=scene.tag, state="hidden")
+            scene.sprites.add(oval, x, y, size, size, random.choice([-3,3]), random.choice([-3,3]))
 
     # Animate shapes
     def animate(self):
-        for obj in self.animation_objects:
-            coords = self.canvas.coords(obj["id"])
-            dx, dy = obj["dx"], obj["dy"]
-            x1, y1, x2, y2 = coords
-            # Bounce off walls
-            if x1+dx < 0 or x2+dx > 780:
-                obj["dx"] *= -1
-            if y1+dy < 0 or y2+dy > 480:
-                obj["dy"] *= -1
-            self.canvas.move(obj["id"], obj["dx"], obj["dy"])
-        self.root.after(30, self.animate)
+        # Bounce off walls for every shape at once, then one batched canvas update
+        self.sprites.step()
+        self.sprites.push(self.canvas)
 
     # Controls
     def volume_up(self, event=None):
@@ -134,21 +202,46 @@ class TV:
 
     def next_channel(self, event=None):
         if self.is_on:
-            self.channel_index = (self.channel_index + 1) % len(self.channels)
-            self.show_channel()
+            self.zap((self.channel_index + 1) % len(self.channels))
 
     def prev_channel(self, event=None):
         if self.is_on:
-            self.channel_index = (self.channel_index - 1) % len(self.channels)
-            self.show_channel()
+            self.zap((self.channel_index - 1) % len(self.channels))
 
     def first_channel(self, event=None):
         if self.is_on:
-            self.channel_index = 0
+            self.zap(0)
+
+    def zap(self, index):
+        """Switch to channel ``index``, debouncing key repeat.
+
+        The first press switches at once.  Presses that follow within
+        ``ZAP_SETTLE_MS`` only update the name; the picture catches up with
+        the last of them once the keys are quiet.
+        """
+        self.channel_index = index
+        if self._zap_job is not None and self._zap_job.active:
+            self._zap_job.cancel()
+            self._zap_pending = True
+            self.label.config(text=f"{self.channels[index]['name']} | Volume: {self.volume}%")
+        else:
+            self.show_channel()
+        self._zap_job = self.scheduler.after(ZAP_SETTLE_MS, self._zap_settled, owner=self.canvas)
+
+    def _zap_settled(self):
+        self._zap_job = None
+        # A single press is already on screen
+        if self._zap_pending:
+            self._zap_pending = False
             self.show_channel()
 
 # Main
-root = tk.Tk()
-tv = TV(root)
-root.mainloop()
+def main():
+    root = tk.Tk()
+    TV(root)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
 
@@ -1,144 +1,162 @@
 ﻿import tkinter as tk
-from tkinter import ttk, simpledialog, messagebox
-from datetime import datetime
+from tkinter import ttk
 import threading
 import sys
 import time
+from scheduler import get_scheduler
+from clock_service import get_clock_service
+from screens import ScreenManager
+from icon_layer import IconLayer
+from recycle_bin import RecycleBin, SORT_NAME, SORT_TIME
+from virtual_list import VirtualList
+from settings_store import get_settings
+from theme import Theme
+from lazy import lazy_import
+import leakcheck
+import tracing
+import watchdog
+
+messagebox = lazy_import("tkinter.messagebox")
+simpledialog = lazy_import("tkinter.simpledialog")
 
 # ---------- CONFIG ----------
 BOOT_DELAY = 2
-DESKTOP_BG = "#3a6ea5"
-TASKBAR_COLOR = "#245edb"
-START_COLOR = "#0b4acb"
+# Theme palettes: widgets are bound to these roles (see theme.py)
+THEMES = {
+    "Luna Blue": {"desktop": "#3a6ea5", "taskbar": "#245edb", "start": "#0b4acb", "menu": "#e4e4e4"},
+    "Silver": {"desktop": "#c0c0c0", "taskbar": "#9c9cb0", "start": "#6f6f84", "menu": "#ececec"},
+    "Olive Green": {"desktop": "#9dbb61", "taskbar": "#8ba169", "start": "#5e7a31", "menu": "#eef0e2"},
+}
+DEFAULT_THEME = "Luna Blue"
+ICON_GRID = 0   # snap dragged icons to this grid (0 = free placement)
+ICON_SNAP = 8   # snap dragged icons to the desktop edges within this many px
 
 # ---------- APP ----------
 class WindowsXB:
+    TRANSITIONS = ("show_desktop", "lock_system", "unlock_system", "sleep_system",
+                   "wake_system", "set_icon_size", "toggle_icons", "refresh_desktop")
+
     def __init__(self, root):
         self.root = root
         self.root.title("Windows.xb")
         self.root.attributes("-fullscreen", True)
         self.root.configure(bg="black")
+        self.scheduler = get_scheduler(self.root)
+        tracing.install(self)
+        watchdog.install(self)
+        leakcheck.install(self)
         self.root.bind("<Escape>", lambda e: self.root.destroy())
         self.root.bind("<Control-z>", self.unlock_system)
 
-        # State
-        self.desktop_icons_visible = True
-        self.icon_size = "medium"
-        self.recycle_bin_items = ["Old Document.txt", "Photo.png", "Archive.zip"]
+        # State (persisted across runs)
+        self.settings = get_settings("windows")
+        self.desktop_icons_visible = self.settings.get("icons_visible", True)
+        self.icon_size = self.settings.get("icon_size", "medium")
+        self.theme_name = self.settings.get("theme", DEFAULT_THEME)
+        self.theme = Theme(self.root, THEMES.get(self.theme_name, THEMES[DEFAULT_THEME]))
+        self.recycle_bin = RecycleBin()
+        # Items restored in an earlier run are on the desktop, not in the bin
+        restored = {name for _, name, _, _ in self.settings.get("restored_icons", [])}
+        self.recycle_bin.add_many([name for name in ("Old Document.txt", "Photo.png", "Archive.zip")
+                                   if name not in restored])
+        self.bin_view = None
         self.locked = False
         self.start_menu_open = False
 
+        # Screens are built once and switched by raising them
+        self.screens = ScreenManager(self.root)
+        self.screens.register("boot", self.build_boot_screen)
+        self.screens.register("desktop", self.build_desktop, pinned=True)
+        self.screens.register("lock", self.build_lock_screen)
+        self.screens.register("sleep", self.build_sleep_screen)
+
         # Start boot screen
         self.show_boot_screen()
 
     # ---------- BOOT SCREEN ----------
     def show_boot_screen(self):
         self.root.config(cursor="none")
-        boot_frame = tk.Frame(self.root, bg="black")
-        boot_frame.pack(fill="both", expand=True)
-        label = tk.Label(boot_frame, text="Windows.xb", fg="white", bg="black",
+        boot_frame = self.screens.show("boot")
+        # Driven by the scheduler rather than ttk's own timer, so it pauses with the session
+        self.scheduler.every(10, self.boot_bar.step, owner=boot_frame)
+        self.scheduler.after(BOOT_DELAY * 1000, self.boot_sequence, owner=boot_frame)
+
+    def build_boot_screen(self, frame):
+        frame.configure(bg="black")
+        label = tk.Label(frame, text="Windows.xb", fg="white", bg="black",
                          font=("Segoe UI", 40, "bold"))
         label.pack(expand=True)
-        bar = ttk.Progressbar(boot_frame, mode="indeterminate", length=300)
-        bar.pack(pady=20)
-        bar.start(10)
-        threading.Thread(target=self.boot_sequence, args=(boot_frame,)).start()
-
-    def boot_sequence(self, frame):
-        time.sleep(BOOT_DELAY)
-        frame.destroy()
+        self.boot_bar = ttk.Progressbar(frame, mode="indeterminate", length=300)
+        self.boot_bar.pack(pady=20)
+
+    def boot_sequence(self):
         self.show_desktop()
+        # The boot screen is only seen once per run
+        self.screens.evict("boot")
 
     # ---------- DESKTOP ----------
     def show_desktop(self):
         self.root.config(cursor="arrow")
-        self.desktop = tk.Frame(self.root, bg=DESKTOP_BG)
-        self.desktop.pack(fill="both", expand=True)
+        self.screens.show("desktop")
+
+    def build_desktop(self, frame):
+        self.desktop = frame
+        self.theme.bind(self.desktop, bg="desktop")
         self.desktop.bind("<Button-3>", self.show_context_menu)
 
         # Taskbar
-        self.taskbar = tk.Frame(self.desktop, bg=TASKBAR_COLOR, height=40)
+        self.taskbar = tk.Frame(self.desktop, height=40)
+        self.theme.bind(self.taskbar, bg="taskbar")
         self.taskbar.pack(side="bottom", fill="x")
 
         # Start button
-        self.start_btn = tk.Button(self.taskbar, text="Start", bg=START_COLOR,
-                              fg="white", font=("Segoe UI", 10, "bold"),
-                              command=self.toggle_start_menu)
+        self.start_btn = tk.Button(self.taskbar, text="Start", font=("Segoe UI", 10, "bold"),
+                                   command=self.toggle_start_menu)
+        self.theme.bind(self.start_btn, bg="start", fg="start~text",
+                        activebackground="start~light", activeforeground="start~text")
         self.start_btn.pack(side="left", padx=5, pady=5)
 
         # System tray clock
-        self.clock_label = tk.Label(self.taskbar, fg="white", bg=TASKBAR_COLOR, font=("Segoe UI", 10))
+        self.clock_label = tk.Label(self.taskbar, font=("Segoe UI", 10))
+        self.theme.bind(self.clock_label, bg="taskbar", fg="taskbar~text")
         self.clock_label.pack(side="right", padx=10)
-        self.update_clock()
-
-        self.icon_widgets = []
+        get_clock_service(self.root).subscribe(self.clock_label, "%H:%M:%S")
+
+        # Icons are items on one canvas rather than widgets
+        self.icon_canvas = tk.Canvas(self.desktop, highlightthickness=0)
+        self.theme.bind(self.icon_canvas, bg="desktop")
+        self.icon_canvas.pack(fill="both", expand=True)
+        self.icons = IconLayer(self.icon_canvas, size=self.icon_size, grid=ICON_GRID, snap=ICON_SNAP,
+                               menu=self.show_context_menu, on_move=self.save_icon_positions)
+        self.theme.watch("desktop~text", self.icons.set_caption_color, owner=self.icon_canvas)
+        self.icons.set_visible(self.desktop_icons_visible)
         self.create_desktop_icons()
 
-    def update_clock(self):
-        now = datetime.now().strftime("%H:%M:%S")
-        self.clock_label.config(text=now)
-        self.root.after(1000, self.update_clock)
-
     # ---------- DESKTOP ICONS ----------
     def create_desktop_icons(self):
-        for w in getattr(self, 'icon_widgets', []):
-            w.destroy()
-        self.icon_widgets = []
-        if not self.desktop_icons_visible:
-            return
-
-        size_map = {"small": 30, "medium": 45, "large": 65}
-        font_map = {"small": 10, "medium": 11, "large": 13}
-        size = size_map[self.icon_size]
-        font_size = font_map[self.icon_size]
-
         icons_data = [
             ("♻️", "Recycle Bin", 50, 100),
             ("🌐", "Browser", 50, 220)
         ]
-        for emoji, name, x, y in icons_data:
-            icon = self.create_icon(x, y, emoji, name, size, font_size)
-            self.icon_widgets.append(icon)
-
-    def create_icon(self, x, y, emoji, text, size, font_size):
-        frame = tk.Frame(self.desktop, bg=DESKTOP_BG)
-        frame.place(x=x, y=y)
-        label_img = tk.Label(frame, text=emoji, font=("Segoe UI Emoji", size), bg=DESKTOP_BG)
-        label_img.pack()
-        label_text = tk.Label(frame, text=text, fg="white", bg=DESKTOP_BG, font=("Segoe UI", font_size))
-        label_text.pack()
-
-        # Dragging
-        def start_drag(e):
-            frame._drag_x = e.x
-            frame._drag_y = e.y
-        def do_drag(e):
-            dx = e.x - frame._drag_x
-            dy = e.y - frame._drag_y
-            new_x = frame.winfo_x() + dx
-            new_y = frame.winfo_y() + dy
-            frame.place(x=new_x, y=new_y)
-        label_img.bind("<Button-1>", start_drag)
-        label_img.bind("<B1-Motion>", do_drag)
-        label_text.bind("<Button-1>", start_drag)
-        label_text.bind("<B1-Motion>", do_drag)
-
-        # Double-click
-        def open_icon(e):
+        # Plus the items restored from the Recycle Bin
+        for emoji, name, x, y in icons_data + [tuple(icon) for icon in self.settings.get("restored_icons", [])]:
+            self.create_icon(x, y, emoji, name)
+
+    def create_icon(self, x, y, emoji, text):
+        # Icons keep the position they were last dragged to
+        x, y = self.settings.get("icon_positions", {}).get(text, (x, y))
+        def open_icon():
             if text == "Recycle Bin":
                 self.open_recycle_bin()
             else:
                 messagebox.showinfo("Windows.xb", f"Opening {text}...")
-        label_img.bind("<Double-Button-1>", open_icon)
-        label_text.bind("<Double-Button-1>", open_icon)
+        return self.icons.add(emoji, text, x, y, on_open=open_icon, on_menu=self.recycle_bin_menu)
 
-        # Right-click Recycle Bin
-        def right_click(e):
-            self.recycle_bin_menu(e)
-        frame.bind("<Button-3>", right_click)
-        label_img.bind("<Button-3>", right_click)
-        label_text.bind("<Button-3>", right_click)
-        return frame
+    def save_icon_positions(self, icon_ids):
+        positions = dict(self.settings.get("icon_positions", {}))
+        for icon_id in icon_ids:
+            positions[self.icons.icons[icon_id].text] = self.icons.position(icon_id)
+        self.settings.set("icon_positions", positions)
 
     # ---------- RIGHT-CLICK MENUS ----------
     def show_context_menu(self, event):
@@ -167,16 +185,18 @@ class WindowsXB:
         menu.tk_popup(event.x_root, event.y_root)
 
     def empty_recycle_bin(self):
-        if not self.recycle_bin_items:
+        if not self.recycle_bin:
             messagebox.showinfo("Recycle Bin", "Nothing to delete.")
             return
-        if messagebox.askyesno("Recycle Bin", f"Are you sure you want to empty the Recycle Bin? {len(self.recycle_bin_items)} items?"):
-            self.recycle_bin_items.clear()
+        if messagebox.askyesno("Recycle Bin", f"Are you sure you want to empty the Recycle Bin? {len(self.recycle_bin)} items?"):
+            self.recycle_bin.clear()
+            self.update_recycle_bin_view()
 
     def add_new_item(self):
         name = simpledialog.askstring("Create Shortcut", "Enter the name of the new item:")
         if name:
-            self.recycle_bin_items.append(name)
+            self.recycle_bin.add(name)
+            self.update_recycle_bin_view()
             messagebox.showinfo("Create Shortcut", f"{name} created.")
 
     # ---------- Start Menu ----------
@@ -189,9 +209,11 @@ class WindowsXB:
             self.start_menu = tk.Toplevel(self.root)
             self.start_menu.geometry(f"250x450+0+50")
             self.start_menu.overrideredirect(True)
-            self.start_menu.configure(bg="#e4e4e4", highlightbackground="black", highlightthickness=2)
+            self.start_menu.configure(highlightbackground="black", highlightthickness=2)
+            self.theme.bind(self.start_menu, bg="menu")
 
-            tk.Label(self.start_menu, text="Pinned Apps", font=("Segoe UI", 12, "bold"), bg="#e4e4e4").pack(pady=5)
+            self.theme.bind(tk.Label(self.start_menu, text="Pinned Apps", font=("Segoe UI", 12, "bold")),
+                            bg="menu", fg="menu~text").pack(pady=5)
             apps = ["Browser", "Notepad", "WordPad", "Calendar", "Calculator", "Paint", "Email", "System Explorer"]
             for app in apps:
                 btn = tk.Button(self.start_menu, text=app, anchor="w", width=25,
@@ -200,39 +222,48 @@ class WindowsXB:
                 btn.pack(pady=2, padx=5)
 
             # Power Options
-            tk.Label(self.start_menu, text="Power Options", font=("Segoe UI", 12, "bold"), bg="#e4e4e4").pack(pady=5)
+            self.theme.bind(tk.Label(self.start_menu, text="Power Options", font=("Segoe UI", 12, "bold")),
+                            bg="menu", fg="menu~text").pack(pady=5)
             tk.Button(self.start_menu, text="Lock", anchor="w", command=self.lock_system).pack(fill="x", padx=10)
             tk.Button(self.start_menu, text="Sleep", anchor="w", command=self.sleep_system).pack(fill="x", padx=10)
             tk.Button(self.start_menu, text="Restart", anchor="w", command=self.restart_system).pack(fill="x", padx=10)
             tk.Button(self.start_menu, text="Shutdown", anchor="w", command=self.shutdown_system).pack(fill="x", padx=10)
 
     # ---------- POWER ACTIONS ----------
+    def close_start_menu(self):
+        if self.start_menu_open:
+            self.start_menu.destroy()
+            self.start_menu_open = False
+
     def lock_system(self):
         self.locked = True
-        self.desktop.pack_forget()
-        self.taskbar.pack_forget()
-        self.lock_screen = tk.Frame(self.root, bg="black")
-        self.lock_screen.pack(fill="both", expand=True)
-        tk.Label(self.lock_screen, text="SYSTEM LOCKED\nPress CTRL+Z to unlock", fg="white", bg="black", font=("Segoe UI", 24)).pack(expand=True)
+        self.close_start_menu()
+        self.screens.show("lock")
+
+    def build_lock_screen(self, frame):
+        frame.configure(bg="black")
+        tk.Label(frame, text="SYSTEM LOCKED\nPress CTRL+Z to unlock", fg="white", bg="black", font=("Segoe UI", 24)).pack(expand=True)
 
     def unlock_system(self, event=None):
         if self.locked:
-            self.lock_screen.destroy()
             self.show_desktop()
             self.locked = False
 
     def sleep_system(self):
-        self.desktop.pack_forget()
-        self.taskbar.pack_forget()
-        self.sleep_screen = tk.Frame(self.root, bg="gray20")
-        self.sleep_screen.pack(fill="both", expand=True)
-        tk.Label(self.sleep_screen, text="SYSTEM SLEEP\nPress Start button to wake", fg="white", bg="gray20", font=("Segoe UI", 24)).pack(expand=True)
-        # Wake on start button
-        self.start_btn.bind("<Button-1>", self.wake_system)
+        self.close_start_menu()
+        self.screens.show("sleep")
+
+    def build_sleep_screen(self, frame):
+        frame.configure(bg="gray20")
+        label = tk.Label(frame, text="SYSTEM SLEEP\nClick anywhere to wake", fg="white", bg="gray20", font=("Segoe UI", 24))
+        label.pack(expand=True)
+        # Wake on click
+        frame.bind("<Button-1>", self.wake_system)
+        label.bind("<Button-1>", self.wake_system)
 
     def wake_system(self, event=None):
-        self.sleep_screen.destroy()
-        self.show_desktop()
+        if self.screens.current == "sleep":
+            self.show_desktop()
 
     def restart_system(self):
         python = sys.executable
@@ -247,46 +278,104 @@ class WindowsXB:
         personalize = tk.Toplevel(self.root)
         personalize.title("Personalize")
         personalize.geometry("400x300")
-        personalize.configure(bg="#e4e4e4")
-        tk.Label(personalize, text="Choose Theme:", bg="#e4e4e4").pack()
-        theme_var = tk.StringVar(value="Luna Blue")
-        def apply_theme():
-            choice = theme_var.get()
-            colors = {"Luna Blue": "#3a6ea5", "Silver": "#c0c0c0", "Olive Green": "#9dbb61"}
-            self.desktop.configure(bg=colors.get(choice, "#3a6ea5"))
-        for t in ["Luna Blue", "Silver", "Olive Green"]:
-            tk.Radiobutton(personalize, text=t, variable=theme_var, value=t,
-                           bg="#e4e4e4", command=apply_theme).pack(anchor="w", padx=20)
+        self.theme.bind(personalize, bg="menu")
+        self.theme.bind(tk.Label(personalize, text="Choose Theme:"), bg="menu", fg="menu~text").pack()
+        theme_var = tk.StringVar(value=self.theme_name)
+        for t in THEMES:
+            radio = tk.Radiobutton(personalize, text=t, variable=theme_var, value=t,
+                                   command=lambda: self.set_theme(theme_var.get()))
+            self.theme.bind(radio, bg="menu", fg="menu~text", activebackground="menu~light")
+            radio.pack(anchor="w", padx=20)
         tk.Button(personalize, text="Close", command=personalize.destroy).pack(pady=20)
 
+    def set_theme(self, theme):
+        # Everything bound to a theme role is recoloured in one batched pass
+        self.theme_name = theme
+        self.theme.set_palette(THEMES.get(theme, THEMES[DEFAULT_THEME]))
+        self.settings.set("theme", theme)
+
     # ---------- Recycle Bin ----------
     def open_recycle_bin(self):
+        if self.bin_view is not None and self.bin_view.winfo_exists():
+            self.bin_view.winfo_toplevel().lift()
+            return
         bin_win = tk.Toplevel(self.root)
-        bin_win.geometry("300x400+200+100")
+        bin_win.geometry("320x460+200+100")
         bin_win.title("Recycle Bin")
         tk.Label(bin_win, text="Recycle Bin Items", font=("Segoe UI", 12, "bold")).pack(pady=5)
 
-        listbox = tk.Listbox(bin_win)
-        for item in self.recycle_bin_items:
-            listbox.insert(tk.END, item)
-        listbox.pack(fill="both", expand=True, padx=10, pady=10)
+        # Search and sort
+        self.bin_query = tk.StringVar()
+        self.bin_contains = tk.BooleanVar(value=False)
+        self.bin_sort = tk.StringVar(value="Date deleted")
+        controls = tk.Frame(bin_win)
+        controls.pack(fill="x", padx=10)
+        tk.Entry(controls, textvariable=self.bin_query).pack(side="left", fill="x", expand=True)
+        tk.Checkbutton(controls, text="Contains", variable=self.bin_contains,
+                       command=self.update_recycle_bin_view).pack(side="left")
+        tk.OptionMenu(controls, self.bin_sort, "Date deleted", "Name",
+                      command=lambda _: self.update_recycle_bin_view()).pack(side="left")
+        self.bin_query.trace_add("write", lambda *_: self.update_recycle_bin_view())
+
+        tk.Button(bin_win, text="Close", command=bin_win.destroy).pack(side="bottom", pady=5)
+        tk.Button(bin_win, text="Empty Recycle Bin", command=self.empty_recycle_bin).pack(side="bottom", pady=5)
+        buttons = tk.Frame(bin_win)
+        buttons.pack(side="bottom", pady=5)
+        tk.Button(buttons, text="Restore", command=self.restore_bin_item).pack(side="left", padx=2)
+        tk.Button(buttons, text="Delete", command=self.delete_bin_item).pack(side="left", padx=2)
+
+        # Only the visible rows are ever handed to Tk
+        def render(item_id):
+            item = self.recycle_bin.get(item_id)
+            return f"{item.name}    {time.strftime('%Y-%m-%d %H:%M', time.localtime(item.deleted_at))}"
+        self.bin_view = VirtualList(bin_win, render=render, alive=self.recycle_bin.__contains__)
+        self.bin_view.pack(fill="both", expand=True, padx=10, pady=10)
+        self.update_recycle_bin_view()
+
+    def update_recycle_bin_view(self):
+        if self.bin_view is None or not self.bin_view.winfo_exists():
+            return
+        sort = SORT_NAME if self.bin_sort.get() == "Name" else SORT_TIME
+        rows = self.recycle_bin.search(self.bin_query.get(), substring=self.bin_contains.get(), sort=sort)
+        self.bin_view.set_rows(rows)
 
-        tk.Button(bin_win, text="Empty Recycle Bin", command=self.empty_recycle_bin).pack(pady=5)
-        tk.Button(bin_win, text="Close", command=bin_win.destroy).pack(pady=5)
+    def restore_bin_item(self):
+        item_id = self.bin_view.selection()
+        if item_id is None:
+            return
+        item = self.recycle_bin.restore(item_id)
+        x, y = self.icons.free_slot()
+        icon_id = self.create_icon(x, y, "📄", item.name)
+        self.settings.set("restored_icons", self.settings.get("restored_icons", []) + [["📄", item.name, x, y]])
+        self.save_icon_positions([icon_id])
+        self.update_recycle_bin_view()
+
+    def delete_bin_item(self):
+        item_id = self.bin_view.selection()
+        if item_id is None:
+            return
+        self.recycle_bin.delete(item_id)
+        self.update_recycle_bin_view()
 
     # ---------- DESKTOP ICON SIZE ----------
     def set_icon_size(self, size):
         self.icon_size = size
-        self.create_desktop_icons()
+        self.icons.set_size(size)
+        self.settings.set("icon_size", size)
     def toggle_icons(self):
         self.desktop_icons_visible = not self.desktop_icons_visible
-        self.create_desktop_icons()
+        self.icons.set_visible(self.desktop_icons_visible)
+        self.settings.set("icons_visible", self.desktop_icons_visible)
     def refresh_desktop(self):
-        self.create_desktop_icons()
+        self.icons.refresh()
 
 # ---------- RUN ----------
-if __name__ == "__main__":
+def main():
     root = tk.Tk()
-    app = WindowsXB(root)
+    WindowsXB(root)
     root.mainloop()
 
+
+if __name__ == "__main__":
+    main()
+
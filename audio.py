@@ -0,0 +1,500 @@
+"""Non-blocking sound mixer for the simulators.
+
+The Mac simulator used to start a thread running a blocking
+``winsound.PlaySound`` for every boot and to check the disk and load the file
+again on every click.  Everything but Windows got silence.  ``Mixer`` replaces
+that:
+
+* ``play(path_or_sound)`` only queues a request and returns right away
+* WAV files are decoded once, on the worker thread, into in-memory 16-bit
+  buffers in the mixer's format.  Missing files are remembered too, and
+  ``fallback=(freq, ms)`` plays a generated tone instead, like
+  ``winsound.Beep``.
+* one long-lived worker thread mixes up to ``max_voices`` voices and streams
+  blocks to a backend.  The oldest voice is dropped when the limit is reached.
+* backends are pluggable: ``WinsoundBackend``, ``AplayBackend`` (ALSA on
+  Linux), ``NullBackend`` (discard, optionally paced in real time) and
+  ``FileSinkBackend`` (writes the mixed output to a WAV file, for headless
+  testing).  ``$OS_AUDIO`` selects one: ``null``, ``file:out.wav``,
+  ``aplay``, ``winsound``.  Otherwise the first one that works here is used.
+
+    mixer = get_mixer()
+    mixer.preload("click.wav")
+    mixer.play("click.wav", fallback=(800, 100))
+"""
+import array
+import atexit
+import collections
+import math
+import os
+import queue
+import sys
+import threading
+import time
+
+from lazy import lazy_import
+
+# Only needed once the worker decodes or a backend starts, not at import
+shutil = lazy_import("shutil")
+subprocess = lazy_import("subprocess")
+tempfile = lazy_import("tempfile")
+wave = lazy_import("wave")
+
+ENV_VAR = "OS_AUDIO"
+RATE = 22050
+MAX_VOICES = 8
+TONE_VOLUME = 0.3
+FADE_MS = 5
+
+_CLOSE = object()
+_mixer = None
+
+
+# ---------- SOUNDS ----------
+class Sound:
+    """Mono, signed 16-bit samples at the mixer's rate."""
+    __slots__ = ("name", "samples", "rate")
+
+    def __init__(self, name, samples, rate):
+        self.name = name
+        self.samples = samples
+        self.rate = rate
+
+    @property
+    def duration_ms(self):
+        return len(self.samples) * 1000 / self.rate
+
+    def __repr__(self):
+        return f"<Sound {self.name!r} {self.duration_ms:.0f}ms>"
+
+
+def decode_wav(path, rate=RATE):
+    """Read a PCM WAV file and convert it to a mono 16-bit ``Sound`` at ``rate``."""
+    with wave.open(path, "rb") as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        src_rate = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+
+    if width == 1:
+        samples = array.array("h", ((b - 128) << 8 for b in raw))
+    else:
+        # Keep the two most significant bytes of each (little-endian) sample
+        top = bytearray(len(raw) // width * 2)
+        top[0::2] = raw[width - 2::width]
+        top[1::2] = raw[width - 1::width]
+        samples = array.array("h", bytes(top))
+        if sys.byteorder == "big":
+            samples.byteswap()
+
+    if channels > 1:
+        left, right = samples[0::channels], samples[1::channels]
+        samples = array.array("h", ((a + b) >> 1 for a, b in zip(left, right)))
+    if src_rate != rate and samples:
+        step = src_rate / rate
+        count = int(len(samples) / step)
+        samples = array.array("h", (samples[int(i * step)] for i in range(count)))
+    return Sound(os.path.basename(path), samples, rate)
+
+
+def make_tone(freq, ms, rate=RATE, volume=TONE_VOLUME):
+    """A sine beep with short fades so it does not click."""
+    count = int(rate * ms / 1000)
+    fade = max(1, min(count // 2, int(rate * FADE_MS / 1000)))
+    amp = volume * 32767
+    step = 2 * math.pi * freq / rate
+    samples = array.array("h", bytes(2 * count))
+    for i in range(count):
+        envelope = min(1.0, i / fade, (count - 1 - i) / fade)
+        samples[i] = int(amp * envelope * math.sin(i * step))
+    return Sound(f"tone {freq}Hz {ms}ms", samples, rate)
+
+
+def _clip(acc):
+    """Clamp summed samples to the 16-bit range."""
+    if acc and (max(acc) > 32767 or min(acc) < -32768):
+        return [32767 if s > 32767 else -32768 if s < -32768 else s for s in acc]
+    return acc
+
+
+# ---------- BACKENDS ----------
+class NullBackend:
+    """Discards audio.  ``realtime=True`` paces writes like a sound card would."""
+    block_ms = 20
+
+    def __init__(self, realtime=False):
+        self.realtime = realtime
+        self.frames = 0
+        self._rate = RATE
+        self._clock = None
+
+    def open(self, rate):
+        self._rate = rate
+
+    def write(self, data):
+        frames = len(data) // 2
+        self.frames += frames
+        if self.realtime:
+            now = time.monotonic()
+            self._clock = max(self._clock or now, now) + frames / self._rate
+            time.sleep(max(0.0, self._clock - now - self.block_ms / 1000))
+
+    def idle(self):
+        self._clock = None
+
+    def close(self):
+        pass
+
+
+class FileSinkBackend:
+    """Appends everything that is mixed to a WAV file (silence between sounds is skipped)."""
+    block_ms = 20
+
+    def __init__(self, path):
+        self.path = path
+        self._wav = None
+
+    def open(self, rate):
+        self._wav = wave.open(self.path, "wb")
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(rate)
+
+    def write(self, data):
+        self._wav.writeframes(data)
+
+    def idle(self):
+        pass
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+
+class AplayBackend:
+    """Streams raw PCM into a long-lived ``aplay`` process (ALSA)."""
+    block_ms = 20
+
+    def __init__(self, command="aplay"):
+        self.command = command
+        self._proc = None
+
+    @staticmethod
+    def available():
+        return shutil.which("aplay") is not None
+
+    def open(self, rate):
+        self._proc = subprocess.Popen(
+            [self.command, "-q", "-t", "raw", "-f", "S16_LE", "-c", "1", "-r", str(rate)],
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def write(self, data):
+        if sys.byteorder == "big":
+            samples = array.array("h", data)
+            samples.byteswap()
+            data = samples.tobytes()
+        self._proc.stdin.write(data)
+        self._proc.stdin.flush()
+
+    def idle(self):
+        pass
+
+    def close(self):
+        if self._proc is not None:
+            try:
+                self._proc.stdin.close()
+            except OSError:
+                pass
+            self._proc.wait(timeout=2)
+            self._proc = None
+
+
+class WinsoundBackend:
+    """Plays the mixed output with ``winsound``, a whole burst at a time.
+
+    ``PlaySound`` cannot stream: every call replaces what is playing, and from
+    memory it can only block, which left a gap after every block.  So blocks
+    are collected until the mixer goes idle and then played asynchronously
+    from a WAV file.  The part of the previous burst not heard yet is mixed
+    in, so a click during the boot sound does not cut it off.  Two files are
+    used in turn; the one playing is never rewritten.
+    """
+    block_ms = 100
+
+    def __init__(self):
+        import winsound
+        self._winsound = winsound
+        self._rate = RATE
+        self._pending = bytearray()
+        self._playing = None     # samples handed to PlaySound last
+        self._started = 0.0
+        self._dir = None
+        self._bursts = 0
+
+    @staticmethod
+    def available():
+        try:
+            import winsound  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def open(self, rate):
+        self._rate = rate
+        self._dir = tempfile.mkdtemp(prefix="os-audio-")
+
+    def write(self, data):
+        self._pending += data
+
+    def idle(self):
+        if not self._pending:
+            return
+        samples = array.array("h", bytes(self._pending))
+        self._pending.clear()
+        tail = self._unplayed()
+        if tail:
+            longer, shorter = (samples, tail) if len(samples) >= len(tail) else (tail, samples)
+            acc = list(longer)
+            acc[:len(shorter)] = map(int.__add__, acc[:len(shorter)], shorter)
+            samples = array.array("h", _clip(acc))
+        path = os.path.join(self._dir, f"burst{self._bursts % 2}.wav")
+        self._bursts += 1
+        with wave.open(path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self._rate)
+            wav.writeframes(samples.tobytes())
+        flags = self._winsound.SND_FILENAME | self._winsound.SND_ASYNC | self._winsound.SND_NODEFAULT
+        try:
+            self._winsound.PlaySound(path, flags)
+        except RuntimeError as exc:
+            raise OSError(str(exc)) from exc
+        self._playing = samples
+        self._started = time.monotonic()
+
+    def _unplayed(self):
+        if self._playing is None:
+            return None
+        heard = round((time.monotonic() - self._started) * self._rate)
+        return self._playing[heard:]
+
+    def close(self):
+        if self._dir is None:
+            return
+        try:
+            self.idle()
+            tail = self._unplayed()
+            if tail:
+                # Let the last burst finish before its file goes
+                time.sleep(len(tail) / self._rate)
+            self._winsound.PlaySound(None, 0)
+        finally:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+
+def default_backend():
+    """The backend named by ``$OS_AUDIO``, else the first one that works here."""
+    choice = os.environ.get(ENV_VAR, "")
+    if choice == "null":
+        return NullBackend()
+    if choice.startswith("file:"):
+        return FileSinkBackend(choice[len("file:"):])
+    if choice == "aplay" or (not choice and not WinsoundBackend.available() and AplayBackend.available()):
+        return AplayBackend()
+    if choice == "winsound" or (not choice and WinsoundBackend.available()):
+        return WinsoundBackend()
+    return NullBackend()
+
+
+# ---------- MIXER ----------
+class Voice:
+    __slots__ = ("sound", "volume", "pos")
+
+    def __init__(self, sound, volume):
+        self.sound = sound
+        self.volume = volume
+        self.pos = 0
+
+
+class Mixer:
+    def __init__(self, backend=None, rate=RATE, max_voices=MAX_VOICES):
+        self.backend = backend if backend is not None else default_backend()
+        self.rate = rate
+        self.max_voices = max_voices
+        self.block_frames = max(1, int(rate * self.backend.block_ms / 1000))
+        self._requests = queue.SimpleQueue()
+        self._cache = {}         # path -> Sound, or None if it could not be loaded
+        self._tones = {}         # (freq, ms) -> Sound
+        self._voices = collections.deque()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        # Stats
+        self.played = 0
+        self.dropped = 0
+        self.blocks = 0
+        self.errors = 0
+
+    # ---------- PUBLIC API ----------
+    def play(self, sound, volume=1.0, fallback=None):
+        """Queue ``sound`` (a ``Sound`` or a WAV path); never blocks.
+
+        ``fallback=(freq, ms)`` plays a tone if the file cannot be loaded.
+        """
+        self._submit(("play", sound, volume, fallback))
+
+    def preload(self, *paths):
+        """Decode ``paths`` on the worker ahead of their first ``play``."""
+        for path in paths:
+            self._submit(("load", path, 0.0, None))
+
+    def close(self, timeout=2.0):
+        """Stop taking requests; sounds already playing are finished first."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._requests.put(_CLOSE)
+            thread.join(timeout)
+
+    def active_voices(self):
+        return len(self._voices)
+
+    def cached(self):
+        return {path: sound for path, sound in self._cache.items() if sound is not None}
+
+    # ---------- WORKER ----------
+    def _submit(self, request):
+        with self._lock:
+            if self._closed:
+                return
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audio-mixer", daemon=True)
+                self._thread.start()
+        self._requests.put(request)
+
+    def _run(self):
+        try:
+            self.backend.open(self.rate)
+        except Exception:
+            self.errors += 1
+            self.backend = NullBackend()
+            self.backend.open(self.rate)
+        closing = False
+        while True:
+            # Sleep until there is something to do; keep streaming while voices play
+            if not self._voices:
+                if closing:
+                    break
+                self._idle()
+                request = self._requests.get()
+                if request is _CLOSE:
+                    break
+                self._handle(request)
+            closing = not self._drain() or closing
+            if self._voices:
+                self._write(self._mix(self.block_frames))
+        self.backend.close()
+
+    def _drain(self):
+        """Take every queued request; False once the mixer is closing."""
+        while True:
+            try:
+                request = self._requests.get_nowait()
+            except queue.Empty:
+                return True
+            if request is _CLOSE:
+                return False
+            self._handle(request)
+
+    def _handle(self, request):
+        kind, sound, volume, fallback = request
+        if isinstance(sound, str):
+            sound = self._load(sound)
+        if sound is None and fallback is not None:
+            sound = self._tone(*fallback)
+        if kind != "play" or sound is None or not sound.samples:
+            return
+        if len(self._voices) >= self.max_voices:
+            self._voices.popleft()
+            self.dropped += 1
+        self._voices.append(Voice(sound, volume))
+        self.played += 1
+
+    def _load(self, path):
+        try:
+            return self._cache[path]
+        except KeyError:
+            pass
+        try:
+            sound = decode_wav(path, self.rate)
+        except (OSError, EOFError, wave.Error):
+            sound = None
+        self._cache[path] = sound
+        return sound
+
+    def _tone(self, freq, ms):
+        sound = self._tones.get((freq, ms))
+        if sound is None:
+            sound = self._tones[(freq, ms)] = make_tone(freq, ms, self.rate)
+        return sound
+
+    def _mix(self, frames):
+        voices = self._voices
+        if len(voices) == 1 and voices[0].volume == 1.0:
+            # Common case (one click): copy the buffer straight through
+            voice = voices[0]
+            chunk = voice.sound.samples[voice.pos:voice.pos + frames]
+            voice.pos += frames
+            if voice.pos >= len(voice.sound.samples):
+                voices.clear()
+            out = chunk.tobytes()
+            return out + bytes(2 * frames - len(out))
+
+        acc = [0] * frames
+        for voice in list(voices):
+            chunk = voice.sound.samples[voice.pos:voice.pos + frames]
+            voice.pos += frames
+            if voice.volume != 1.0:
+                chunk = [int(s * voice.volume) for s in chunk]
+            acc[:len(chunk)] = map(int.__add__, acc[:len(chunk)], chunk)
+            if voice.pos >= len(voice.sound.samples):
+                voices.remove(voice)
+        return array.array("h", _clip(acc)).tobytes()
+
+    def _write(self, data):
+        try:
+            self.backend.write(data)
+            self.blocks += 1
+        except (OSError, ValueError):
+            self._lost_backend()
+
+    def _idle(self):
+        try:
+            self.backend.idle()
+        except (OSError, ValueError):
+            self._lost_backend()
+
+    def _lost_backend(self):
+        # Device gone (e.g. aplay exited): keep running silently
+        self.errors += 1
+        try:
+            self.backend.close()
+        except Exception:
+            pass
+        self.backend = NullBackend()
+        self.backend.open(self.rate)
+
+
+# ---------- SHARED INSTANCE ----------
+def get_mixer():
+    """Return the process-wide mixer (every simulator shares one worker)."""
+    global _mixer
+    if _mixer is None:
+        _mixer = Mixer()
+        atexit.register(_mixer.close)
+    return _mixer
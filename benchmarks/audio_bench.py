@@ -0,0 +1,85 @@
+"""Cost of click feedback on the UI thread, and of the mixer worker.
+
+* ``play()`` latency: what a button handler pays per click, p50/p99, while
+  the worker is busy mixing the previous clicks (null backend, paced in real
+  time like a sound card)
+* the old way: loading the WAV from disk on every click (``os.path.exists``
+  plus a decode), and starting a thread per sound as the boot sound did
+* mixing throughput: how much faster than real time the worker mixes 1, 4
+  and 8 overlapping voices
+
+    python benchmarks/audio_bench.py [--clicks 2000]
+"""
+import argparse
+import array
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio import Mixer, NullBackend, Voice, decode_wav, make_tone, RATE
+from sim_bench import percentile
+
+
+def write_click(path, ms=100, rate=44100):
+    count = rate * ms // 1000
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(array.array("h", (int(8000 * math.sin(i / 4)) for i in range(count * 2))).tobytes())
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def report(label, samples):
+    print(f"{label:<38} p50 {percentile(samples, 50):>9.1f}us  p99 {percentile(samples, 99):>9.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clicks", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        click = os.path.join(tmp, "click.wav")
+        write_click(click)
+
+        mixer = Mixer(NullBackend(realtime=True))
+        mixer.preload(click)
+        report("mixer.play (cached)", timed(lambda: mixer.play(click), args.clicks))
+        print(f"{'':<38} played {mixer.played}, dropped {mixer.dropped} (voice limit {mixer.max_voices})")
+        mixer.close(timeout=0)
+
+        def load_per_click():
+            if os.path.exists(click):
+                decode_wav(click)
+        report("exists + decode per click (no cache)", timed(load_per_click, min(args.clicks, 200)))
+        report("thread per sound (old boot)", timed(lambda: threading.Thread(target=lambda: None).start(),
+                                                    args.clicks))
+
+    tone = make_tone(800, 1000)
+    for voices in (1, 4, 8):
+        mixer = Mixer(NullBackend())
+        mixer._voices.extend(Voice(tone, 1.0 if voices == 1 else 0.5) for _ in range(voices))
+        start = time.perf_counter()
+        while mixer._voices:
+            mixer._write(mixer._mix(mixer.block_frames))
+        elapsed = time.perf_counter() - start
+        print(f"mix {voices} voice(s) x 1s: {elapsed * 1000:>7.1f}ms  ({1 / elapsed:>6.0f}x real time at {RATE} Hz)")
+
+
+if __name__ == "__main__":
+    main()
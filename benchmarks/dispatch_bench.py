@@ -0,0 +1,93 @@
+"""Main-thread dispatch under load: latency, frame budget and backpressure.
+
+Worker threads post label updates through a ``Dispatcher`` as fast as they
+can while the Tk main loop runs.  Reported:
+
+* post -> run latency (p50/p99): how stale an update is when it is shown
+* event-loop latency: how late a 5 ms probe timer fires during the burst,
+  i.e. what the burst costs input handling and animations
+* the longest drain in one frame, the deepest the queue got, and how often
+  workers were held back by ``max_pending``
+
+    python benchmarks/dispatch_bench.py [--workers 4] [--posts 20000]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dispatch import Dispatcher
+from sim_bench import percentile, start_xvfb
+
+PROBE_MS = 5
+
+
+def run(workers, posts, max_pending):
+    import tkinter as tk
+    root = tk.Tk()
+    root.withdraw()
+    label = tk.Label(root)
+    label.pack()
+    dispatcher = Dispatcher(root, max_pending=max_pending)
+    latencies = []
+    lateness = []
+
+    def update(posted_at, i):
+        label.configure(text=str(i))
+        latencies.append((time.perf_counter() - posted_at) * 1e6)
+
+    def work():
+        for i in range(posts // workers):
+            dispatcher.post(update, time.perf_counter(), i)
+        dispatcher.post(dispatcher.release)
+
+    def probe(expected):
+        lateness.append((time.perf_counter() - expected) * 1000)
+        if dispatcher.posted < posts + workers or dispatcher.depth:
+            root.after(PROBE_MS, probe, time.perf_counter() + PROBE_MS / 1000)
+
+    for _ in range(workers):
+        dispatcher.hold()
+    threads = [threading.Thread(target=work) for _ in range(workers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    root.after(PROBE_MS, probe, time.perf_counter() + PROBE_MS / 1000)
+    while dispatcher.drained < posts + workers and dispatcher.dropped == 0:
+        root.update()
+    elapsed = time.perf_counter() - start
+    for thread in threads:
+        thread.join()
+    root.destroy()
+
+    stats = dispatcher.stats()
+    print(f"max_pending {max_pending}: {len(latencies)} updates in {elapsed * 1000:.0f} ms")
+    print(f"  post -> run      p50 {percentile(latencies, 50) / 1000:>8.2f} ms   "
+          f"p99 {percentile(latencies, 99) / 1000:>8.2f} ms")
+    print(f"  event loop late  p50 {percentile(lateness, 50):>8.2f} ms   "
+          f"p99 {percentile(lateness, 99):>8.2f} ms   max {max(lateness, default=0):.2f} ms")
+    print(f"  longest drain {stats['max_drain_ms']} ms, max depth {stats['max_depth']}, "
+          f"workers blocked {stats['blocked']}x ({stats['blocked_ms']} ms), dropped {stats['dropped']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--posts", type=int, default=20000)
+    args = parser.parse_args()
+    xvfb = None
+    if not os.environ.get("DISPLAY"):
+        xvfb, os.environ["DISPLAY"] = start_xvfb()
+    try:
+        for max_pending in (100, 1000, 100000):
+            run(args.workers, args.posts, max_pending)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+
+if __name__ == "__main__":
+    main()
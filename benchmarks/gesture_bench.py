@@ -0,0 +1,72 @@
+"""Per-event cost of the gesture recognizer, on synthetic 1000 Hz traces.
+
+Each trace is one touch (press, motion events every millisecond, release)
+fed straight to ``GestureTracker``, the part that runs in the motion
+handler.  Reported per trace: what was recognized, how many motion events
+became samples, and the handler cost per event (p50/p99).
+
+    python benchmarks/gesture_bench.py [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestures import GestureTracker
+from sim_bench import percentile
+
+
+def drag(dx, dy, ms, hold_ms=0):
+    """A straight drag at constant speed, 1 event/ms, optionally held still first."""
+    points = [(0, 0, t) for t in range(hold_ms)]
+    points += [(round(dx * i / ms), round(dy * i / ms), hold_ms + i) for i in range(1, ms + 1)]
+    return points
+
+
+TRACES = {
+    "swipe down (200px/400ms)": drag(0, 200, 400),
+    "fling up (40px/20ms)": drag(0, -40, 20),
+    "slow drag (40px/1s)": drag(40, 0, 1000),
+    "tap": drag(2, 1, 60),
+    "long press (700ms)": drag(0, 0, 1, hold_ms=700),
+}
+
+
+def run(trace, repeat):
+    costs = []
+    result = None
+    for _ in range(repeat):
+        tracker = GestureTracker()
+        tracker.press(0, 0, 0)
+        gestures = []
+        perf = time.perf_counter_ns
+        for x, y, t in trace:
+            start = perf()
+            gesture = tracker.move(x, y, t)
+            costs.append(perf() - start)
+            if gesture is not None:
+                gestures.append(gesture)
+        x, y, t = trace[-1]
+        if t >= 600:
+            gestures.append(tracker.long_press(600))
+        gestures.append(tracker.release(x, y, t + 1))
+        result = [g.kind + (f" {g.direction}" if g.direction else "") for g in gestures if g is not None]
+        samples = tracker.samples
+    return result, samples, costs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    print(f"{'trace':<26} {'recognized':<14} {'events':>6} {'samples':>7} {'p50 ns':>7} {'p99 ns':>7}")
+    for name, trace in TRACES.items():
+        gestures, samples, costs = run(trace, args.repeat)
+        print(f"{name:<26} {', '.join(gestures) or '-':<14} {len(trace):>6} {samples:>7} "
+              f"{percentile(costs, 50):>7.0f} {percentile(costs, 99):>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Memory of the multi-OS host against one process per simulator.
+
+Baseline: each simulator is started in a process of its own and left running
+for ``--settle-ms``; the resident set sizes of the five processes are added
+up.  Host: one process starts all of them as ``host.Host`` sessions (the last
+one in front, the others suspended) and reports its resident set after each
+session is started.  An empty Tk root is measured as well, to show what every
+extra process pays before a simulator draws anything.
+
+    python benchmarks/host_bench.py [--settle-ms 3000] [--only mac,tv]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from simulators import SIMULATORS, load_simulator
+from host import Host, resident_kb
+
+
+def settle(root, ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        root.update()
+        time.sleep(0.005)
+
+
+# ---------- CHILDREN ----------
+def child_empty(settle_ms):
+    import tkinter as tk
+    root = tk.Tk()
+    settle(root, settle_ms)
+    return {"rss_kb": resident_kb()}
+
+
+def child_single(name, settle_ms):
+    import tkinter as tk
+    root = tk.Tk()
+    load_simulator(name)(root)
+    settle(root, settle_ms)
+    return {"rss_kb": resident_kb()}
+
+
+def child_host(names, settle_ms):
+    import tkinter as tk
+    root = tk.Tk()
+    host = Host(root, names)
+    steps = []
+    for name in names:
+        host.switch(name)
+        settle(root, settle_ms)
+        steps.append([name, resident_kb()])
+    return {"rss_kb": resident_kb(), "steps": steps,
+            "suspended": sorted(n for n, s in host.sessions.items() if s.suspended)}
+
+
+def spawn(env, *args):
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", *args],
+                          env=env, capture_output=True, text=True)
+    lines = proc.stdout.strip().splitlines()
+    try:
+        return json.loads(lines[-1])
+    except (IndexError, ValueError):
+        raise RuntimeError(f"{' '.join(args)}: {proc.stderr.strip()[-1000:] or proc.returncode}")
+
+
+# ---------- REPORT ----------
+def mb(kb):
+    return f"{kb / 1024:>8.1f}" if kb else f"{'-':>8}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--settle-ms", type=int, default=3000)
+    parser.add_argument("--only", help="comma-separated simulator names")
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, rest = args.child[0], args.child[1:]
+        if mode == "empty":
+            result = child_empty(args.settle_ms)
+        elif mode == "single":
+            result = child_single(rest[0], args.settle_ms)
+        else:
+            result = child_host(rest, args.settle_ms)
+        print(json.dumps(result), flush=True)
+        os._exit(0)
+
+    names = args.only.split(",") if args.only else list(SIMULATORS)
+    env = dict(os.environ)
+    env.setdefault("OS_AUDIO", "null")  # no sound from benchmark runs
+    xvfb = None
+    if not env.get("DISPLAY"):
+        from sim_bench import start_xvfb
+        xvfb, env["DISPLAY"] = start_xvfb()
+    settle_ms = ["--settle-ms", str(args.settle_ms)]
+    try:
+        with tempfile.TemporaryDirectory() as settings:
+            env["OS_SETTINGS_DIR"] = settings
+            empty = spawn(env, "empty", *settle_ms)["rss_kb"]
+            print(f"{'process':<24} {'RSS MB':>8}")
+            print(f"{'empty Tk root':<24} {mb(empty)}")
+            total = 0
+            for name in names:
+                rss = spawn(env, "single", name, *settle_ms)["rss_kb"] or 0
+                total += rss
+                print(f"{name:<24} {mb(rss)}")
+            print(f"{f'{len(names)} processes':<24} {mb(total)}")
+
+            hosted = spawn(env, "host", *names, *settle_ms)
+            print()
+            for name, rss in hosted["steps"]:
+                print(f"{'host + ' + name:<24} {mb(rss)}")
+            print(f"suspended: {', '.join(hosted['suspended']) or '-'}")
+            if total and hosted["rss_kb"]:
+                saved = total - hosted["rss_kb"]
+                print(f"\none host uses {mb(hosted['rss_kb']).strip()} MB vs {mb(total).strip()} MB: "
+                      f"{saved / 1024:.1f} MB ({saved / total * 100:.0f}%) less")
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Benchmark for the canvas desktop icon layer.
+
+Times hit-testing and rubber-band queries through ``SpatialGrid`` against a
+linear scan of every icon.  With a display (or Xvfb) it also builds an
+``IconLayer`` with thousands of icons on a real canvas and times resizing,
+hiding/showing, refreshing, selecting everything and dragging the selection.
+
+    python benchmarks/icon_layer_bench.py [--icons N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from icon_layer import IconLayer, SpatialGrid
+
+WIDTH, HEIGHT = 1920, 1040
+CELL_W, CELL_H = 90, 100
+
+
+def grid_positions(n):
+    cols = WIDTH // CELL_W
+    return [((i % cols) * CELL_W, (i // cols) * CELL_H % HEIGHT) for i in range(n)]
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench_index(n, rng):
+    boxes = {k: (x, y, x + CELL_W, y + CELL_H) for k, (x, y) in enumerate(grid_positions(n))}
+    index = SpatialGrid()
+    for k, box in boxes.items():
+        index.insert(k, box)
+    points = [(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)) for _ in range(1000)]
+    rects = []
+    for _ in range(100):
+        x, y = rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)
+        rects.append((x, y, x + rng.uniform(50, 600), y + rng.uniform(50, 400)))
+
+    def scan_points():
+        for px, py in points:
+            [k for k, (x0, y0, x1, y1) in boxes.items() if x0 <= px <= x1 and y0 <= py <= y1]
+
+    def scan_rects():
+        for bx0, by0, bx1, by1 in rects:
+            [k for k, (x0, y0, x1, y1) in boxes.items() if x0 <= bx1 and bx0 <= x1 and y0 <= by1 and by0 <= y1]
+
+    print(f"{'query':<18} {'linear ms':>10} {'grid ms':>10} {'speedup':>8}")
+    for name, linear, indexed in (
+            ("1000 point hits", scan_points, lambda: [index.at(x, y) for x, y in points]),
+            ("100 rubber bands", scan_rects, lambda: [index.within(r) for r in rects])):
+        a, b = timed(linear), timed(indexed)
+        print(f"{name:<18} {a:>10.2f} {b:>10.2f} {a / b:>7.1f}x")
+
+
+def bench_canvas(n):
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:
+        print("\nNo display: skipping the canvas benchmark")
+        return
+    root.geometry(f"{WIDTH}x{HEIGHT}+0+0")
+    canvas = tk.Canvas(root, width=WIDTH, height=HEIGHT, highlightthickness=0)
+    canvas.pack()
+    layer = IconLayer(canvas)
+    root.update()
+
+    def build():
+        for i, (x, y) in enumerate(grid_positions(n)):
+            layer.add("\U0001F4C4", f"File {i}.txt", x, y)
+        root.update()
+
+    def resize():
+        for size in ("large", "small", "medium"):
+            layer.set_size(size)
+            root.update()
+
+    def toggle():
+        layer.set_visible(False)
+        root.update()
+        layer.set_visible(True)
+        root.update()
+
+    def refresh():
+        layer.refresh()
+        root.update()
+
+    def select_all():
+        layer.select(layer.index.within((0, 0, WIDTH, HEIGHT)))
+        root.update()
+
+    def drag_frames():
+        # One move of the whole selection per frame, as DragController applies it
+        layer._start_drag(_Press())
+        for step in range(60):
+            layer._drag_to(step, step)
+            root.update()
+        layer._finish_drag()
+
+    print(f"\n{n} icons on a {WIDTH}x{HEIGHT} canvas")
+    print(f"  build            {timed(build):>9.1f} ms")
+    print(f"  resize x3        {timed(resize):>9.1f} ms")
+    print(f"  hide + show      {timed(toggle):>9.1f} ms")
+    print(f"  refresh          {timed(refresh):>9.1f} ms")
+    print(f"  select all       {timed(select_all):>9.1f} ms")
+    print(f"  drag, per frame  {timed(drag_frames) / 60:>9.2f} ms")
+    root.destroy()
+
+
+class _Press:
+    x_root = y_root = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--icons", type=int, default=5000)
+    args = parser.parse_args()
+    print(f"Desktop icon index, {args.icons} icons")
+    bench_index(args.icons, random.Random(1234))
+    bench_canvas(args.icons)
+
+
+if __name__ == "__main__":
+    main()
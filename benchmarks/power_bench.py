@@ -0,0 +1,73 @@
+"""Device power model: fast-forward speed, tick cost and label updates.
+
+* 24 h of device life (1 s steps) stepped one status-bar tick at a time in
+  plain Python, against one vectorized ``simulate()``; both must end in the
+  same state
+* the cost of one live 3 s tick
+* how many label updates a day of change events causes, against the old
+  3 s polling loop that reconfigured the label on every tick
+
+    python benchmarks/power_bench.py [--hours 24] [--seed 0]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from power_model import PowerModel, TICK_MS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    seconds = args.hours * 3600
+    tick_s = TICK_MS / 1000
+
+    # Half a day plugged in and in use, the rest on battery, locked, with one app open
+    def day(model, run):
+        model.set_charging(True)
+        run(model, seconds / 2)
+        model.set_charging(False)
+        model.set_screen("lock")
+        model.set_apps(1)
+        run(model, seconds / 2)
+
+    def ticks(model, span):
+        for _ in range(int(span / tick_s)):
+            model.advance(tick_s)
+
+    stepped = PowerModel(seed=args.seed, battery=30.0)
+    updates = []
+    stepped.subscribe(lambda m: updates.append(m.snapshot()))
+    start = time.perf_counter()
+    day(stepped, ticks)
+    stepped_ms = (time.perf_counter() - start) * 1000
+
+    vector = PowerModel(seed=args.seed, battery=30.0)
+    vector.simulate(1)   # import NumPy outside the timing
+    vector = PowerModel(seed=args.seed, battery=30.0)
+    start = time.perf_counter()
+    day(vector, lambda m, span: m.simulate(span))
+    vector_ms = (time.perf_counter() - start) * 1000
+
+    tick = PowerModel(seed=args.seed)
+    start = time.perf_counter()
+    for _ in range(1000):
+        tick.advance(tick_s)
+    tick_us = (time.perf_counter() - start) * 1000
+
+    print(f"{args.hours:g} h stepped per tick : {stepped_ms:>9.1f} ms")
+    print(f"{args.hours:g} h vectorized       : {vector_ms:>9.1f} ms  ({stepped_ms / vector_ms:.0f}x)")
+    print(f"end state                 : battery {stepped.battery:.6f} / {vector.battery:.6f}, "
+          f"signal {stepped.signal:.3f} / {vector.signal:.3f} dBm")
+    print(f"live tick ({tick_s:g} s)          : {tick_us:>9.1f} us")
+    print(f"label updates per {args.hours:g} h    : {len(updates)} on change, "
+          f"{int(seconds / tick_s)} with {tick_s:g} s polling")
+
+
+if __name__ == "__main__":
+    main()
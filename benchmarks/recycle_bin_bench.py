@@ -0,0 +1,133 @@
+"""Benchmark for the Recycle Bin store and its virtualized window.
+
+Fills a ``RecycleBin`` with N entries and times the operations the window
+needs (views, prefix/substring search, deletes, rendering one page) next to
+the plain-list code they replaced.  With a display (or Xvfb) it also times
+opening the window: a Listbox filled one insert per entry against a
+``VirtualList`` that renders only the visible rows.
+
+    python benchmarks/recycle_bin_bench.py [--entries N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recycle_bin import RecycleBin, SORT_NAME, SORT_TIME
+
+WORDS = ("report", "photo", "archive", "invoice", "notes", "budget", "draft", "song", "backup", "scan")
+EXTS = (".txt", ".png", ".zip", ".pdf", ".mp3", ".docx")
+PAGE = 30
+
+
+def make_names(n, rng):
+    return [f"{rng.choice(WORDS)} {i} {rng.choice(WORDS)}{rng.choice(EXTS)}" for i in range(n)]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def row(label, ms, legacy=None):
+    extra = f"   (list: {legacy:.1f} ms)" if legacy is not None else ""
+    print(f"  {label:<32} {ms:>9.1f} ms{extra}")
+
+
+def bench_store(names, rng):
+    store = RecycleBin()
+    ms, ids = timed(lambda: store.add_many(names))
+    row("add all", ms)
+    ms, _ = timed(lambda: store.view(SORT_TIME))
+    row("view by deletion time", ms)
+    ms, _ = timed(lambda: store.view(SORT_NAME))
+    row("view by name", ms, timed(lambda: sorted(names, key=str.casefold))[0])
+    ms, hits = timed(lambda: store.search("invoice 12"))
+    row(f"prefix search ({len(hits)} hits)", ms,
+        timed(lambda: [n for n in names if n.casefold().startswith("invoice 12")])[0])
+    ms, hits = timed(lambda: store.search("99 backup", substring=True))
+    row(f"substring search ({len(hits)} hits)", ms,
+        timed(lambda: [n for n in names if "99 backup" in n.casefold()])[0])
+    ms, hits = timed(lambda: store.search("report", substring=True))
+    row(f"broad substring ({len(hits)} hits)", ms,
+        timed(lambda: [n for n in names if "report" in n.casefold()])[0])
+
+    victims = rng.sample(ids, 1000)
+    ms, _ = timed(lambda: [store.delete(item_id) for item_id in victims])
+    legacy = list(names)
+    legacy_victims = [names[(item_id - 1)] for item_id in victims[:50]]
+    legacy_ms, _ = timed(lambda: [legacy.remove(name) for name in legacy_victims])
+    row("delete 1000", ms, legacy_ms * 20)
+    ms, _ = timed(lambda: store.view(SORT_NAME))
+    row("view by name after deletes", ms)
+    # What one Restore/Delete or "Add New Item" click costs the window
+    ms, _ = timed(lambda: (store.delete(ids[0]), store.view(SORT_NAME)))
+    row("delete + view by name", ms)
+    ms, _ = timed(lambda: (store.add("new item.txt"), store.view(SORT_NAME)))
+    row("add + view by name", ms)
+    ms, hits = timed(lambda: store.search("99 backup", substring=True))
+    row("substring search after deletes", ms)
+
+    rows = store.view(SORT_TIME)
+    mid = len(rows) // 2
+    ms, _ = timed(lambda: [store.get(item_id).name for item_id in rows[mid:mid + PAGE]])
+    row(f"render one page ({PAGE} rows)", ms)
+    return store
+
+
+def bench_window(store, names):
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:
+        print("\nNo display: skipping the window benchmark")
+        return
+    from virtual_list import VirtualList
+    root.geometry("320x460")
+
+    def legacy():
+        listbox = tk.Listbox(root)
+        for name in names:
+            listbox.insert(tk.END, name)
+        listbox.pack(fill="both", expand=True)
+        root.update()
+        listbox.destroy()
+
+    def virtual():
+        view = VirtualList(root, render=lambda item_id: store.get(item_id).name, alive=store.__contains__)
+        view.pack(fill="both", expand=True)
+        view.set_rows(store.view())
+        root.update()
+        return view
+
+    print("\nOpening the window")
+    row("Listbox, one insert per entry", timed(legacy)[0])
+    ms, view = timed(virtual)
+    row("VirtualList", ms)
+
+    def scroll():
+        for step in range(100):
+            view.scroll_to(step * len(view.rows) // 100)
+            root.update()
+    ms, _ = timed(scroll)
+    row("scroll, per frame", ms / 100)
+    root.destroy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    args = parser.parse_args()
+    rng = random.Random(1234)
+    names = make_names(args.entries, rng)
+    print(f"Recycle Bin, {args.entries} entries")
+    store = bench_store(names, rng)
+    bench_window(store, names)
+
+
+if __name__ == "__main__":
+    main()
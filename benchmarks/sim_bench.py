@@ -0,0 +1,432 @@
+"""Headless benchmark suite for all five simulators.
+
+Each simulator runs in its own process (so peak RSS is per simulator) under a
+virtual X server and is driven through a scripted path:
+
+    boot -> login/setup -> desktop (idle) -> apps -> restart -> shutdown
+
+For every phase the suite records wall time, CPU time, event-loop latency
+(how late a 5 ms probe timer fires), peak RSS, live widget count and pending
+timers.  Results are written as JSON; two result files can be compared.
+
+    python benchmarks/sim_bench.py -o results.json [--only tablet,tv]
+    python benchmarks/sim_bench.py --compare before.json after.json
+
+If ``DISPLAY`` is not set, an ``Xvfb`` server is started for the run.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulators import SIMULATORS, load_simulator
+
+PROBE_MS = 5
+IDLE_MS = 2000
+PHASE_TIMEOUT = 20.0
+
+
+# ---------- MEASUREMENT ----------
+def peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+class Harness:
+    """Owns the Tk root, pumps the event loop and measures each phase."""
+
+    def __init__(self, name):
+        self.name = name
+        self.cls = load_simulator(name)
+        self.phases = {}
+        self.root = None
+        self.app = None
+
+    # ---------- ROOT ----------
+    def launch(self):
+        import tkinter as tk
+        self.root = tk.Tk()
+        self.closed = False
+        self.root.bind("<Destroy>", self._on_destroy, add="+")
+        self._arm_probe()
+        self.app = self.cls(self.root)
+        return self.app
+
+    def _on_destroy(self, event):
+        if event.widget is self.root:
+            self.closed = True
+
+    def _arm_probe(self):
+        self._probe_due = time.perf_counter() + PROBE_MS / 1000
+        try:
+            self.root.after(PROBE_MS, self._probe)
+        except Exception:
+            pass
+
+    def _probe(self):
+        self._lags.append(max(0.0, (time.perf_counter() - self._probe_due) * 1000))
+        self._arm_probe()
+
+    def widgets(self):
+        if self.closed:
+            return 0
+        count, stack = 0, [self.root]
+        while stack:
+            widget = stack.pop()
+            children = widget.winfo_children()
+            count += len(children)
+            stack.extend(children)
+        return count
+
+    def timers(self):
+        if self.closed:
+            return 0
+        return len(self.root.tk.splitlist(self.root.tk.call("after", "info")))
+
+    # ---------- EVENT LOOP ----------
+    def pump(self, done, timeout=PHASE_TIMEOUT):
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                self.root.update()
+            except Exception:
+                self.closed = True
+            try:
+                if self.closed or done():
+                    return True
+            except Exception:
+                pass
+            if time.perf_counter() > deadline:
+                return False
+            time.sleep(0.001)
+
+    def idle(self, ms):
+        end = time.perf_counter() + ms / 1000
+        return self.pump(lambda: time.perf_counter() >= end, timeout=ms / 1000 + 1)
+
+    # ---------- PHASES ----------
+    def run(self, driver):
+        self._lags = []
+        steps = driver(self)
+        while True:
+            self._lags = []
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                phase, done = next(steps)
+            except StopIteration:
+                break
+            ok = self.pump(done)
+            self.phases[phase] = {
+                "wall_ms": round((time.perf_counter() - wall) * 1000, 2),
+                "cpu_ms": round((time.process_time() - cpu) * 1000, 2),
+                "completed": ok,
+                "latency_ms": {
+                    "p50": round(percentile(self._lags, 50), 2),
+                    "p99": round(percentile(self._lags, 99), 2),
+                    "max": round(max(self._lags, default=0.0), 2),
+                    "samples": len(self._lags),
+                },
+                "peak_rss_kb": peak_rss_kb(),
+                "widgets": self.widgets(),
+                "timers": self.timers(),
+            }
+            if not ok:
+                break
+        if not self.closed:
+            self.root.destroy()
+
+    def toplevels_mapped(self, count):
+        # Pooled app windows may exist withdrawn; only count the ones on screen
+        import tkinter as tk
+        tops = [w for w in self.root.winfo_children() if isinstance(w, tk.Toplevel)]
+        return sum(1 for w in tops if w.winfo_ismapped()) >= count
+
+
+# ---------- DRIVERS ----------
+def drive_mac(h):
+    app = h.launch()
+    yield "boot", lambda: app.screens.current == "login"
+    app.password_entry.insert(0, "1234")
+    app.check_password()
+    yield "login", lambda: app.screens.current == "desktop"
+    h.idle(IDLE_MS)
+    yield "desktop", lambda: True
+    for open_app in (app.open_file_manager, app.open_web, app.open_store, app.open_settings):
+        open_app()
+    yield "apps", lambda: h.toplevels_mapped(4)
+    # Heavy clicking: close and relaunch every dock app 25 times
+    for _ in range(25):
+        for win in h.root.winfo_children():
+            if app.windows.owns(win):
+                app.windows.close(win)
+        for open_app in (app.open_file_manager, app.open_web, app.open_store, app.open_settings):
+            open_app()
+        h.root.update()
+    yield "relaunch", lambda: h.toplevels_mapped(4)
+    app.restart_system()
+    yield "restart", lambda: app.screens.current == "login"
+    app.shutdown_system()
+    yield "shutdown", lambda: h.closed
+
+
+def drive_handy(h):
+    import tkinter as tk
+    app = h.launch()
+    yield "boot", lambda: app.screens.current == "setup"
+    app.username_entry.insert(0, "bench")
+    app.finish_setup()
+    yield "login", lambda: app.screens.current == "desktop"
+    h.idle(IDLE_MS)
+    yield "desktop", lambda: True
+    apps = (app.open_start_menu, app.control_panel, app.about_os, app.system_info,
+            app.command_prompt, app.run_box, app.power_menu)
+    for open_app in apps:
+        open_app()
+    yield "apps", lambda: h.toplevels_mapped(len(apps))
+    app.restart(tk.Toplevel(h.root))
+    # Setup was saved, so a restart boots straight to the desktop
+    yield "restart", lambda: app.screens.current == "desktop"
+    quit_called = []
+    h.root.quit = lambda: quit_called.append(True)
+    app.shutdown(tk.Toplevel(h.root))
+    yield "shutdown", lambda: bool(quit_called)
+
+
+def drive_tablet(h):
+    import tkinter as tk
+    app = h.launch()
+    yield "boot", lambda: app.state == "lock"
+    h.phases["boot"]["boot_to_lock_ms"] = round(app.boot_time_ms, 1)
+    app.swipe_up(None)
+    yield "login", lambda: app.state == "home" and not app.transition.active
+    h.idle(IDLE_MS)
+    yield "desktop", lambda: True
+    apps = ["Browser", "Gallery", "Settings", "Notes", "Music"]
+    for name in apps:
+        app.open_app(name)
+    app.open_widget_menu()
+    app.show_control_panel()
+    yield "apps", lambda: h.toplevels_mapped(len(apps) + 1)
+    app.restart_os(tk.Toplevel(h.root))
+    yield "restart", lambda: app.state == "lock"
+    app.shutdown_os(tk.Toplevel(h.root))
+    yield "shutdown", lambda: h.closed
+
+
+def drive_windows(h):
+    app = h.launch()
+    yield "boot", lambda: app.screens.current == "desktop"
+    app.lock_system()
+    app.unlock_system()
+    yield "login", lambda: not app.locked
+    h.idle(IDLE_MS)
+    yield "desktop", lambda: True
+    # 10 lock/unlock and 10 sleep/wake round trips, each drawn to the screen
+    for _ in range(10):
+        for leave, back in ((app.lock_system, app.unlock_system), (app.sleep_system, app.wake_system)):
+            leave()
+            h.root.update()
+            back()
+            h.root.update()
+    yield "lock_sleep", lambda: True
+    # Drag an icon with a burst of motion events; moves are coalesced per frame
+    canvas = app.icon_canvas
+    x0, y0, x1, y1 = app.icons.index.box(max(app.icons.icons))
+    px, py = int(x0 + x1) // 2, int(y0) + 5
+    canvas.event_generate("<Button-1>", x=px, y=py)
+    for step in range(300):
+        canvas.event_generate("<B1-Motion>", x=px + step, y=py + step // 2)
+        if step % 30 == 0:
+            h.root.update()
+    canvas.event_generate("<ButtonRelease-1>", x=px + 300, y=py + 150)
+    yield "drag", lambda: True
+    h.phases["drag"]["drag_events"] = app.icons.drag.events
+    h.phases["drag"]["drag_coalesced"] = app.icons.drag.coalesced
+    app.toggle_start_menu()
+    app.open_recycle_bin()
+    app.open_personalize()
+    yield "apps", lambda: h.toplevels_mapped(3)
+    # Switch themes with the start menu and personalize window open; one batched pass each
+    apply_ms = []
+    for _ in range(5):
+        for theme in ("Silver", "Olive Green", "Luna Blue"):
+            app.set_theme(theme)
+            apply_ms.append(app.theme.last_apply_ms)
+            h.root.update()
+    yield "theme", lambda: True
+    h.phases["theme"]["theme_widgets"] = app.theme.widgets()
+    h.phases["theme"]["theme_apply_ms"] = round(max(apply_ms), 2)
+    # Restart closes the process; the benchmark relaunches it like a real reboot
+    app.restart_system()
+    h.pump(lambda: h.closed)
+    app = h.launch()
+    yield "restart", lambda: app.screens.current == "desktop"
+    app.shutdown_system()
+    yield "shutdown", lambda: h.closed
+
+
+def drive_tv(h):
+    app = h.launch()
+    app.power_on()
+    yield "boot", lambda: app.is_on
+    h.idle(IDLE_MS)
+    yield "desktop", lambda: True
+    for _ in app.channels:
+        app.next_channel()
+        h.root.update()
+    yield "apps", lambda: True
+    app.shutdown()
+    yield "shutdown", lambda: h.closed
+
+
+DRIVERS = {
+    "mac": drive_mac,
+    "handy": drive_handy,
+    "tablet": drive_tablet,
+    "windows": drive_windows,
+    "tv": drive_tv,
+}
+
+
+def run_child(name):
+    harness = Harness(name)
+    result = {"phases": harness.phases}
+    try:
+        harness.run(DRIVERS[name])
+    except Exception as exc:
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["peak_rss_kb"] = peak_rss_kb()
+    print(json.dumps(result))
+
+
+# ---------- DISPLAY ----------
+def start_xvfb():
+    binary = shutil.which("Xvfb")
+    if binary is None:
+        sys.exit("No DISPLAY and no Xvfb found; install Xvfb or run under a display.")
+    for number in range(99, 120):
+        if not os.path.exists(f"/tmp/.X11-unix/X{number}") and not os.path.exists(f"/tmp/.X{number}-lock"):
+            break
+    proc = subprocess.Popen([binary, f":{number}", "-screen", "0", "1920x1080x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+        if proc.poll() is not None or time.time() > deadline:
+            sys.exit("Xvfb failed to start")
+        time.sleep(0.05)
+    return proc, f":{number}"
+
+
+def run_all(names, output):
+    env = dict(os.environ)
+    env.setdefault("OS_AUDIO", "null")  # no sound from benchmark runs
+    xvfb = None
+    if not env.get("DISPLAY"):
+        xvfb, env["DISPLAY"] = start_xvfb()
+    try:
+        import tkinter
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "tk": tkinter.TkVersion,
+                "display": env["DISPLAY"],
+            },
+            "simulators": {},
+        }
+        for name in names:
+            # Every run is a first boot: settings go to a fresh, throwaway directory
+            with tempfile.TemporaryDirectory() as settings:
+                env["OS_SETTINGS_DIR"] = settings
+                proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", name],
+                                      env=env, capture_output=True, text=True)
+            lines = proc.stdout.strip().splitlines()
+            try:
+                report["simulators"][name] = json.loads(lines[-1])
+            except (IndexError, ValueError):
+                report["simulators"][name] = {"error": proc.stderr.strip()[-2000:] or f"exit code {proc.returncode}"}
+            summarize(name, report["simulators"][name])
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+    with open(output, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"\nwrote {output}")
+
+
+def summarize(name, result):
+    print(f"\n{name}")
+    if "error" in result:
+        print(f"  error: {result['error']}")
+    for phase, data in result.get("phases", {}).items():
+        lat = data["latency_ms"]
+        print(f"  {phase:<9} {data['wall_ms']:>9.1f} ms  cpu {data['cpu_ms']:>8.1f} ms  "
+              f"lag p50/p99 {lat['p50']:.1f}/{lat['p99']:.1f} ms  "
+              f"widgets {data['widgets']:>4}  timers {data['timers']:>3}")
+        if "drag_events" in data:
+            print(f"  {'':<9} {data['drag_events']} motion events, {data['drag_coalesced']} coalesced")
+        if "theme_widgets" in data:
+            print(f"  {'':<9} {data['theme_widgets']} themed widgets, slowest switch {data['theme_apply_ms']} ms")
+    if result.get("peak_rss_kb"):
+        print(f"  peak RSS {result['peak_rss_kb'] / 1024:.1f} MB")
+
+
+# ---------- COMPARE ----------
+def compare(before_path, after_path):
+    with open(before_path) as fh:
+        before = json.load(fh)["simulators"]
+    with open(after_path) as fh:
+        after = json.load(fh)["simulators"]
+    print(f"{'simulator':<9} {'phase':<9} {'before ms':>10} {'after ms':>10} {'change':>8}")
+    for name in after:
+        old_phases = before.get(name, {}).get("phases", {})
+        for phase, data in after[name].get("phases", {}).items():
+            old = old_phases.get(phase)
+            if old is None:
+                continue
+            change = (data["wall_ms"] - old["wall_ms"]) / old["wall_ms"] * 100 if old["wall_ms"] else 0.0
+            print(f"{name:<9} {phase:<9} {old['wall_ms']:>10.1f} {data['wall_ms']:>10.1f} {change:>+7.1f}%")
+        old_rss = before.get(name, {}).get("peak_rss_kb")
+        new_rss = after[name].get("peak_rss_kb")
+        if old_rss and new_rss:
+            print(f"{name:<9} {'peak RSS':<9} {old_rss / 1024:>8.1f}MB {new_rss / 1024:>8.1f}MB "
+                  f"{(new_rss - old_rss) / old_rss * 100:>+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmark suite for the OS simulators")
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--only", help="comma-separated simulators: " + ",".join(SIMULATORS))
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+    elif args.compare:
+        compare(*args.compare)
+    else:
+        names = args.only.split(",") if args.only else list(SIMULATORS)
+        run_all(names, args.output)
+
+
+if __name__ == "__main__":
+    main()
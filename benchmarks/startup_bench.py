@@ -0,0 +1,115 @@
+"""Cold-start benchmark: from process launch to the first (boot) screen.
+
+Each simulator is started several times in a fresh interpreter under
+``python -X importtime``.  For every run the child reports how long importing
+the simulator module took and, with a display (Xvfb is started if needed),
+how long it took to build the app and draw its first screen; the parent times
+the whole process.  The ``-X importtime`` log is used to list the imports
+that were paid for before the boot screen appeared.
+
+    python benchmarks/startup_bench.py [--runs N] [--only mac,tv] [--no-display]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from simulators import SIMULATORS
+
+# Kept free of imports of its own so the importtime log only shows what the
+# simulator needs.  os._exit skips mainloop and interpreter teardown.
+CHILD = """
+import sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {root!r})
+import simulators
+t1 = time.perf_counter()
+module = simulators.load_module({name!r})
+t2 = time.perf_counter()
+boot = -1.0
+if {display!r}:
+    import tkinter as tk
+    root = tk.Tk()
+    getattr(module, simulators.SIMULATORS[{name!r}][1])(root)
+    root.update()
+    boot = (time.perf_counter() - t2) * 1000
+print("RESULT", (t2 - t1) * 1000, boot, flush=True)
+import os
+os._exit(0)
+"""
+
+
+def parse_importtime(log):
+    """Return [(module, self us, cumulative us)] for imports after ``simulators``."""
+    rows, seen = [], False
+    for line in log.splitlines():
+        fields = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].strip()
+        if not seen:
+            seen = name == "simulators"
+            continue
+        rows.append((name, int(fields[0]), int(fields[1])))
+    return rows
+
+
+def run_once(name, env, display):
+    code = CHILD.format(root=ROOT, name=name, display=display)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          env=env, capture_output=True, text=True)
+    wall = (time.perf_counter() - start) * 1000
+    result = [line for line in proc.stdout.splitlines() if line.startswith("RESULT")]
+    if not result:
+        raise RuntimeError(f"{name}: {proc.stderr.strip()[-1000:] or proc.returncode}")
+    _, import_ms, boot_ms = result[-1].split()
+    return wall, float(import_ms), float(boot_ms), parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--only", help="comma-separated simulator names")
+    parser.add_argument("--no-display", action="store_true", help="only time the imports")
+    args = parser.parse_args()
+    names = args.only.split(",") if args.only else list(SIMULATORS)
+
+    env = dict(os.environ)
+    env.setdefault("OS_AUDIO", "null")  # no sound from benchmark runs
+    xvfb = None
+    display = not args.no_display
+    if display and not env.get("DISPLAY"):
+        if shutil.which("Xvfb"):
+            from sim_bench import start_xvfb
+            xvfb, env["DISPLAY"] = start_xvfb()
+        else:
+            print("No display and no Xvfb: timing imports only")
+            display = False
+    try:
+        with tempfile.TemporaryDirectory() as settings:
+            env["OS_SETTINGS_DIR"] = settings
+            print(f"{'simulator':<9} {'process ms':>10} {'import ms':>10} {'boot ms':>8}   slowest imports (self ms)")
+            for name in names:
+                runs = [run_once(name, env, display) for _ in range(args.runs)]
+                wall = statistics.median(r[0] for r in runs)
+                imports = statistics.median(r[1] for r in runs)
+                boot = statistics.median(r[2] for r in runs)
+                slowest = sorted(runs[-1][3], key=lambda row: row[1], reverse=True)[:3]
+                top = ", ".join(f"{row[0]} {row[1] / 1000:.1f}" for row in slowest)
+                boot_text = f"{boot:>8.1f}" if boot >= 0 else f"{'-':>8}"
+                print(f"{name:<9} {wall:>10.1f} {imports:>10.1f} {boot_text}   {top}")
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Cost of callback tracing: per-call overhead and export time.
+
+* the same no-op callback called through ``tkinter.CallWrapper`` and through
+  the traced wrapper, like Tk calls a ``command=`` option; the difference is
+  what tracing adds to every callback
+* the time ``export`` takes for a full ring
+
+No display needed: the wrappers are called directly.
+
+    python benchmarks/tracing_bench.py [--calls 200000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tracing
+
+
+class FakeWidget:
+    def __str__(self):
+        return ".!toplevel.!button"
+
+
+def per_call_ns(call, calls):
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        call()
+    return (time.perf_counter_ns() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    def callback():
+        pass
+
+    plain = tk.CallWrapper(callback, None, FakeWidget())
+    plain_ns = per_call_ns(plain, args.calls)
+
+    tracer = tracing.get_tracer()
+    tracer.patch()
+    traced = tk.CallWrapper(callback, None, FakeWidget())
+    traced_ns = per_call_ns(traced, args.calls)
+
+    print(f"command, plain       : {plain_ns:>7.0f} ns/call")
+    print(f"command, traced      : {traced_ns:>7.0f} ns/call  (+{traced_ns - plain_ns:.0f} ns)")
+    print(f"handlers tracked     : {len(tracer.histograms)}, {tracer.recorded} calls, "
+          f"{tracer.dropped} rotated out")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.json")
+        start = time.perf_counter()
+        tracer.export(path)
+        export_ms = (time.perf_counter() - start) * 1000
+        size_kb = os.path.getsize(path) / 1024
+    print(f"export {len(tracer.events())} events : {export_ms:>7.1f} ms, {size_kb:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
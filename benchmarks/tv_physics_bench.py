@@ -0,0 +1,116 @@
+"""Frame-time benchmark for the TV sprite physics.
+
+Compares the old per-object loop with ``SpriteField`` at 10 (plain Python),
+1,000 and 10,000 (NumPy) shapes.  With a display (or Xvfb) the timings include pushing coordinates to a
+real canvas; without one only the physics and Tcl script generation are timed.
+
+    python benchmarks/tv_physics_bench.py [--frames N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tv_physics import SpriteField
+
+WIDTH, HEIGHT = 780, 480
+COUNTS = (10, 1_000, 10_000)
+
+
+def make_canvas():
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:
+        return None, None
+    root.withdraw()
+    canvas = tk.Canvas(root, width=WIDTH, height=HEIGHT)
+    canvas.pack()
+    return root, canvas
+
+
+def random_shapes(n, rng):
+    shapes = []
+    for _ in range(n):
+        size = rng.randint(30, 80)
+        x = rng.randint(0, WIDTH - size)
+        y = rng.randint(0, HEIGHT - size)
+        shapes.append((x, y, size, rng.choice([-3, 3]), rng.choice([-3, 3])))
+    return shapes
+
+
+def bench_legacy(shapes, frames, canvas):
+    # The loop TV.animate used before: one dict and one or two Tk calls per shape
+    objs = []
+    for x, y, size, dx, dy in shapes:
+        item = canvas.create_oval(x, y, x + size, y + size) if canvas else None
+        objs.append({"id": item, "dx": dx, "dy": dy, "c": [x, y, x + size, y + size]})
+    start = time.perf_counter()
+    for _ in range(frames):
+        for obj in objs:
+            x1, y1, x2, y2 = canvas.coords(obj["id"]) if canvas else obj["c"]
+            dx, dy = obj["dx"], obj["dy"]
+            if x1 + dx < 0 or x2 + dx > WIDTH:
+                obj["dx"] *= -1
+            if y1 + dy < 0 or y2 + dy > HEIGHT:
+                obj["dy"] *= -1
+            if canvas:
+                canvas.move(obj["id"], obj["dx"], obj["dy"])
+            else:
+                c = obj["c"]
+                c[0] += obj["dx"]; c[2] += obj["dx"]
+                c[1] += obj["dy"]; c[3] += obj["dy"]
+    elapsed = time.perf_counter() - start
+    if canvas:
+        canvas.delete("all")
+    return elapsed / frames * 1000
+
+
+def bench_field(shapes, frames, canvas):
+    field = SpriteField(WIDTH, HEIGHT)
+    for x, y, size, dx, dy in shapes:
+        item = canvas.create_oval(x, y, x + size, y + size) if canvas else 0
+        field.add(item, x, y, size, size, dx, dy)
+    # Initial tagging happens once when a channel is built, not per frame
+    if canvas:
+        field.push(canvas)
+    else:
+        field.script(".c")
+    start = time.perf_counter()
+    for _ in range(frames):
+        field.step()
+        if canvas:
+            field.push(canvas)
+        else:
+            field.script(".c")
+    elapsed = time.perf_counter() - start
+    if canvas:
+        canvas.delete("all")
+    return elapsed / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=100)
+    args = parser.parse_args()
+
+    root, canvas = make_canvas()
+    rng = random.Random(1234)
+    mode = "canvas" if canvas else "headless (no display: physics + script only)"
+    print(f"TV sprite physics, {args.frames} frames, {mode}")
+    print(f"{'shapes':>8} {'legacy ms/frame':>16} {'field ms/frame':>15} {'speedup':>8}")
+    for n in COUNTS:
+        shapes = random_shapes(n, rng)
+        frames = max(5, args.frames // max(1, n // 1000))
+        legacy = bench_legacy(shapes, frames, canvas)
+        field = bench_field(shapes, frames, canvas)
+        print(f"{n:>8} {legacy:>16.3f} {field:>15.3f} {legacy / field:>7.1f}x")
+    if root:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Zap latency of the TV: how long a channel switch keeps the main loop busy.
+
+Each switch is timed from the key handler to the redrawn canvas
+(``update_idletasks``):
+
+* cached: the channel's scene already exists, so only visibility changes
+* cold: the first visit to a channel nobody prefetched
+* rebuild: what every switch used to cost, deleting the picture and
+  creating the shapes again
+* holding Right for a second (key repeat every 33 ms): how many scene
+  switches that causes and how long the key handlers ran in total
+
+If ``DISPLAY`` is not set, an ``Xvfb`` server is started for the run.
+
+    python benchmarks/tv_zap_bench.py [--zaps 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sim_bench import percentile, start_xvfb
+from simulators import load_simulator
+
+REPEAT_MS = 33
+
+
+def pump(root, ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        root.update()
+        time.sleep(0.001)
+
+
+def timed(root, action):
+    start = time.perf_counter()
+    action()
+    root.update_idletasks()
+    return (time.perf_counter() - start) * 1000
+
+
+def launch():
+    import tkinter as tk
+    root = tk.Tk()
+    tv = load_simulator("tv")(root)
+    tv.power_on()
+    tv.start_tv()
+    root.update()
+    return root, tv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--zaps", type=int, default=200)
+    args = parser.parse_args()
+    xvfb = None
+    if not os.environ.get("DISPLAY"):
+        xvfb, os.environ["DISPLAY"] = start_xvfb()
+    try:
+        root, tv = launch()
+        count = len(tv.channels)
+
+        # Cold: straight to channels the prefetch has not reached yet
+        cold = []
+        for index in range(count):
+            if not tv.scenes[index].built:
+                tv.channel_index = index
+                cold.append(timed(root, tv.show_channel))
+
+        cached = []
+        for i in range(args.zaps):
+            tv.channel_index = i % count
+            cached.append(timed(root, tv.show_channel))
+
+        def rebuild():
+            tv.canvas.delete("all")
+            for scene in tv.scenes:
+                scene.sprites.clear()
+                scene.built = False
+            tv.scene = None
+            tv.show_channel()
+
+        rebuilt = []
+        for i in range(args.zaps):
+            tv.channel_index = i % count
+            rebuilt.append(timed(root, rebuild))
+
+        pump(root, 500)
+        switches = []
+        show = tv.show_channel
+        tv.show_channel = lambda: switches.append(timed(root, show))
+        handler_ms = 0.0
+        for _ in range(1000 // REPEAT_MS):
+            start = time.perf_counter()
+            tv.next_channel()
+            handler_ms += (time.perf_counter() - start) * 1000
+            pump(root, REPEAT_MS)
+        pump(root, 300)
+        tv.show_channel = show
+
+        print(f"{'zap':<10} {'p50 ms':>7} {'p99 ms':>7}")
+        for name, values in (("cached", cached), ("cold", cold), ("rebuild", rebuilt)):
+            print(f"{name:<10} {percentile(values, 50):>7.2f} {percentile(values, 99):>7.2f}")
+        print(f"\nholding Right for 1 s: {1000 // REPEAT_MS} key repeats, {len(switches)} scene switches, "
+              f"{handler_ms:.1f} ms in key handlers, slowest switch {max(switches):.2f} ms")
+        root.destroy()
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Wallpaper pipeline: what a wallpaper change costs, and where.
+
+A large JPEG and PNG are generated and loaded at screen size through
+``wallpaper.Loader``:
+
+* cold: decode + scale on the worker (the main thread only polls)
+* disk hit: a new process/boot reading the cached PPM
+* memory hit: switching back to a wallpaper shown before
+* main-thread handoff: ``PhotoImage`` from the cached PPM, against Tk
+  decoding the PNG itself on the main thread (needs a display)
+
+Needs Pillow.
+
+    python benchmarks/wallpaper_bench.py [--size 1920x1080]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wallpaper
+from wallpaper import Loader, WallpaperCache
+
+
+def wait(request):
+    while not request.done:
+        time.sleep(0.0005)
+    if request.error:
+        raise RuntimeError(request.error)
+    return request
+
+
+def timed_ms(fn, runs=5):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def make_images(directory):
+    from PIL import Image
+    # Noise: the worst case for both codecs
+    pixels = Image.frombytes("RGB", (4000, 3000), os.urandom(4000 * 3000 * 3))
+    jpeg = os.path.join(directory, "big.jpg")
+    png = os.path.join(directory, "big.png")
+    pixels.save(jpeg, quality=90)
+    pixels.crop((0, 0, 2000, 1500)).save(png)
+    return jpeg, png
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="1920x1080")
+    args = parser.parse_args()
+    size = tuple(int(v) for v in args.size.split("x"))
+    if not wallpaper.Image:
+        sys.exit("Pillow is not installed")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        images = make_images(tmp)
+        print(f"{'image':<10} {'cold ms':>8} {'disk ms':>8} {'memory us':>10}")
+        for path in images:
+            def cold():
+                loader = Loader(WallpaperCache(os.path.join(tmp, f"cold{time.perf_counter_ns()}")))
+                wait(loader.submit(path, size))
+            cold_ms = timed_ms(cold, runs=3)
+            cache = WallpaperCache(os.path.join(tmp, "cache"))
+            loader = Loader(cache)
+            wait(loader.submit(path, size))
+
+            def disk():
+                cache._memory.clear()
+                cache._size = 0
+                wait(loader.submit(path, size))
+            disk_ms = timed_ms(disk)
+            memory_ms = timed_ms(lambda: wait(loader.submit(path, size)), runs=50)
+            print(f"{os.path.basename(path):<10} {cold_ms:>8.1f} {disk_ms:>8.1f} {memory_ms * 1000:>10.1f}")
+
+        try:
+            import tkinter as tk
+            root = tk.Tk()
+        except Exception as exc:
+            print(f"\nno display, skipping the Tk handoff ({exc})")
+            return
+        ppm = wait(loader.submit(images[1], size)).data
+        with open(images[1], "rb") as fh:
+            png = fh.read()
+        handoff = timed_ms(lambda: tk.PhotoImage(master=root, data=ppm, format="PPM"))
+        tk_decode = timed_ms(lambda: tk.PhotoImage(master=root, data=png))
+        print(f"\nmain thread: PhotoImage from cached PPM {handoff:.1f} ms, "
+              f"Tk decoding the PNG itself {tk_decode:.1f} ms (unscaled)")
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
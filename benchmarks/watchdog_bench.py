@@ -0,0 +1,77 @@
+"""Stall watchdog: heartbeat cost and how well stalls are measured.
+
+* the cost of one heartbeat, the only part that runs on the main loop
+* a loop beating every ``HEARTBEAT_MS`` that blocks for known lengths of time,
+  busy and sleeping; for each, the stall length the watchdog reported and
+  whether the sampled stack points at the blocking function
+* stalls below ``STALL_MS`` must not be reported at all
+
+No display needed: the loop is plain Python.
+
+    python benchmarks/watchdog_bench.py [--beats 100000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from watchdog import StallWatchdog, HEARTBEAT_MS, STALL_MS
+
+BLOCKS_MS = (100, 300, 600, 1500)
+
+
+def busy_handler(ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+def sleeping_handler(ms):
+    time.sleep(ms / 1000)
+
+
+def idle(watchdog, ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        watchdog.beat()
+        time.sleep(HEARTBEAT_MS / 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--beats", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        watchdog = StallWatchdog(report_interval_s=0)
+        watchdog.start(os.path.join(tmp, "stalls.log"))
+        start = time.perf_counter_ns()
+        for _ in range(args.beats):
+            watchdog.beat()
+        beat_ns = (time.perf_counter_ns() - start) / args.beats
+        print(f"heartbeat              : {beat_ns:>7.0f} ns")
+        print(f"{'blocked':<25} {'reported ms':>11} {'samples':>7}  stack")
+        for handler in (busy_handler, sleeping_handler):
+            for ms in BLOCKS_MS:
+                idle(watchdog, 300)
+                seen = len(watchdog.stalls)
+                handler(ms)
+                idle(watchdog, 300)
+                found = watchdog.stalls[seen:]
+                if not found:
+                    print(f"{handler.__name__:<16} {ms:>5} ms {'-':>11} {'-':>7}  "
+                          f"{'ok' if ms < STALL_MS else 'MISSED'}")
+                    continue
+                stall = found[0]
+                stacks = stall.samples.most_common(1)
+                hit = bool(stacks) and stacks[0][0][0][2] == handler.__name__
+                print(f"{handler.__name__:<16} {ms:>5} ms {stall.duration_ms:>11.0f} "
+                      f"{sum(stall.samples.values()):>7}  {'blocking function' if hit else 'elsewhere'}")
+        watchdog.stop()
+
+
+if __name__ == "__main__":
+    main()
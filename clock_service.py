@@ -0,0 +1,91 @@
+"""Shared, second-aligned clock for every status-bar label.
+
+Instead of one drifting 1000 ms ``after`` loop per clock, a single
+``ClockService`` per Tk root wakes up just after each real second boundary,
+formats every distinct format string once and pushes the text only to
+subscribed labels that are currently mapped (a label is refreshed as soon as
+it is mapped again).  Subscriptions are dropped when the label is destroyed,
+and the service stops ticking when nobody is subscribed.
+
+    get_clock_service(root).subscribe(label, "%H:%M:%S")
+"""
+import time
+
+from scheduler import get_scheduler, PRIORITY_HIGH
+
+# Wake slightly after the boundary so time.time() has already rolled over
+BOUNDARY_SLACK_MS = 5
+
+
+class ClockService:
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self._subs = {}
+        self._job = None
+
+    def subscribe(self, label, fmt="%H:%M:%S"):
+        key = str(label)
+        fresh = key not in self._subs
+        self._subs[key] = [label, fmt, None]
+        if fresh:
+            label.bind("<Destroy>", lambda e, k=key: self._destroyed(e, k), add="+")
+            label.bind("<Map>", lambda e, k=key: self._refresh(k), add="+")
+        self._refresh(key)
+        self._start()
+
+    def unsubscribe(self, label):
+        self._subs.pop(str(label), None)
+        if not self._subs and self._job is not None:
+            self._job.cancel()
+            self._job = None
+
+    def subscribers(self):
+        return len(self._subs)
+
+    def _destroyed(self, event, key):
+        if str(event.widget) == key:
+            self._subs.pop(key, None)
+
+    def _refresh(self, key):
+        sub = self._subs.get(key)
+        if sub is not None:
+            self._push(sub, time.strftime(sub[1], time.localtime()))
+
+    @staticmethod
+    def _push(sub, text):
+        if text != sub[2]:
+            sub[0].config(text=text)
+            sub[2] = text
+
+    def _start(self):
+        if self._job is None or not self._job.active:
+            self._job = self.scheduler.after(self._until_next_second(), self._tick, priority=PRIORITY_HIGH)
+
+    @staticmethod
+    def _until_next_second():
+        return int((1.0 - time.time() % 1.0) * 1000) + BOUNDARY_SLACK_MS
+
+    def _tick(self):
+        self._job = None
+        if not self._subs:
+            return
+        now = time.localtime()
+        texts = {}
+        for sub in list(self._subs.values()):
+            label, fmt, _ = sub
+            if not label.winfo_ismapped():
+                continue
+            text = texts.get(fmt)
+            if text is None:
+                text = texts[fmt] = time.strftime(fmt, now)
+            self._push(sub, text)
+        self._start()
+
+
+def get_clock_service(root):
+    """Return the clock service shared by everything running on ``root``."""
+    service = getattr(root, "_clock_service", None)
+    if service is None:
+        service = ClockService(get_scheduler(root))
+        root._clock_service = service
+    return service
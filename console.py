@@ -0,0 +1,398 @@
+"""Command console: a small shell behind a scrollback ``tk.Text``.
+
+``Shell`` interprets a line.  Built-ins (``help``, ``cd``, ``dir``, ``type``,
+``set`` ...) run right away; anything else is started as a local subprocess,
+and a reader thread passes its output back through ``console.write``.
+
+``Console`` is the widget:
+
+* ``write`` may be called from any thread, the main thread included.  It
+  only appends to a pending buffer and, unless a flush is already queued,
+  posts one to the ``Dispatcher``, which runs it on the main thread; the
+  buffer then goes into the Text in one insert, never once per line.
+* the buffer and the Text are both capped at ``max_lines``.  When a command
+  produces output faster than it can be shown, the oldest pending lines are
+  dropped (with a "lines skipped" note), so printing millions of lines keeps
+  memory flat and the UI responsive.
+* input starts after the prompt (the ``input`` mark).  Up/Down walk the
+  history, and Ctrl+C stops the running command.
+
+    console = Console(parent, banner="Type 'help' for commands.\\n\\n")
+    console.pack(fill="both", expand=True)
+"""
+import codecs
+import collections
+import os
+import sys
+import threading
+import time
+import tkinter as tk
+
+from lazy import lazy_import
+from dispatch import get_dispatcher
+
+# Only needed once the first program is started
+subprocess = lazy_import("subprocess")
+
+MAX_LINES = 5000
+MAX_PENDING_CHARS = 1 << 20
+MAX_HISTORY = 200
+READ_BYTES = 65536
+
+
+# ---------- SHELL ----------
+class Shell:
+    def __init__(self, console, cwd=None):
+        self.console = console
+        self.cwd = cwd or os.path.expanduser("~")
+        self.env = dict(os.environ)
+        self.history = collections.deque(maxlen=MAX_HISTORY)
+        self.proc = None
+        self.builtins = {
+            "help": self.do_help, "cls": self.do_cls, "clear": self.do_cls,
+            "echo": self.do_echo, "cd": self.do_cd, "pwd": self.do_pwd,
+            "dir": self.do_dir, "type": self.do_type, "set": self.do_set,
+            "ver": self.do_ver, "date": self.do_date, "time": self.do_time,
+            "history": self.do_history, "exit": self.do_exit,
+        }
+
+    @property
+    def busy(self):
+        return self.proc is not None
+
+    def prompt(self):
+        return f"{self.cwd}> "
+
+    def run(self, line):
+        """Run one command line; subprocesses keep running in the background."""
+        line = line.strip()
+        if not line:
+            return
+        self.history.append(line)
+        name, _, arg = line.partition(" ")
+        builtin = self.builtins.get(name.lower())
+        if builtin is not None:
+            builtin(arg.strip())
+        else:
+            self.spawn(line)
+
+    def write(self, text):
+        self.console.write(text)
+
+    # ---------- SUBPROCESSES ----------
+    def spawn(self, line):
+        options = {"start_new_session": True} if os.name == "posix" else {}
+        try:
+            proc = subprocess.Popen(line, shell=True, cwd=self.cwd, env=self.env,
+                                    stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT, **options)
+        except OSError as exc:
+            self.write(f"{exc}\n")
+            return
+        self.proc = proc
+        self.console.command_started()
+        threading.Thread(target=self._read, args=(proc,), name="console-reader", daemon=True).start()
+
+    def _read(self, proc):
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        fd = proc.stdout.fileno()
+        while True:
+            try:
+                data = os.read(fd, READ_BYTES)
+            except OSError:
+                break
+            if not data:
+                break
+            self.write(decoder.decode(data))
+        self.write(decoder.decode(b"", final=True))
+        proc.stdout.close()
+        code = proc.wait()
+        if code:
+            self.write(f"[exit code {code}]\n")
+        self.proc = None
+        self.console.command_done()
+
+    def interrupt(self):
+        proc = self.proc
+        if proc is None:
+            return
+        try:
+            if os.name == "posix":
+                os.killpg(proc.pid, 15)
+            else:
+                proc.terminate()
+        except OSError:
+            pass
+
+    # ---------- BUILT-INS ----------
+    def do_help(self, arg):
+        self.write("Built-in commands:\n  " + "  ".join(sorted(self.builtins)) +
+                   "\nAnything else runs as a program. Ctrl+C stops it.\n")
+
+    def do_cls(self, arg):
+        self.console.clear()
+
+    def do_echo(self, arg):
+        self.write(arg + "\n")
+
+    def do_cd(self, arg):
+        if not arg:
+            self.do_pwd(arg)
+            return
+        path = os.path.normpath(os.path.join(self.cwd, os.path.expanduser(arg)))
+        if os.path.isdir(path):
+            self.cwd = path
+        else:
+            self.write(f"The system cannot find the path specified: {arg}\n")
+
+    def do_pwd(self, arg):
+        self.write(self.cwd + "\n")
+
+    def do_dir(self, arg):
+        path = os.path.join(self.cwd, os.path.expanduser(arg)) if arg else self.cwd
+        try:
+            entries = sorted(os.scandir(path), key=lambda e: e.name.lower())
+        except OSError as exc:
+            self.write(f"{exc.strerror}: {arg or path}\n")
+            return
+        lines = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+                size = "<DIR>" if is_dir else f"{entry.stat().st_size:,}"
+            except OSError:
+                size = "?"
+            lines.append(f"{size:>14}  {entry.name}")
+        lines.append(f"{len(entries)} item(s)")
+        self.write("\n".join(lines) + "\n")
+
+    def do_type(self, arg):
+        if not arg:
+            self.write("usage: type FILE\n")
+            return
+        try:
+            with open(os.path.join(self.cwd, arg), encoding="utf-8", errors="replace") as fh:
+                while True:
+                    chunk = fh.read(READ_BYTES)
+                    if not chunk:
+                        break
+                    self.write(chunk)
+        except OSError as exc:
+            self.write(f"{exc.strerror}: {arg}\n")
+
+    def do_set(self, arg):
+        if "=" in arg:
+            key, _, value = arg.partition("=")
+            if value:
+                self.env[key.strip()] = value
+            else:
+                self.env.pop(key.strip(), None)
+            return
+        prefix = arg.upper()
+        self.write("".join(f"{k}={v}\n" for k, v in sorted(self.env.items())
+                           if k.upper().startswith(prefix)))
+
+    def do_ver(self, arg):
+        self.write(f"HandyOS CMD v1.0 (Python {sys.version.split()[0]})\n")
+
+    def do_date(self, arg):
+        self.write(time.strftime("%Y-%m-%d") + "\n")
+
+    def do_time(self, arg):
+        self.write(time.strftime("%H:%M:%S") + "\n")
+
+    def do_history(self, arg):
+        self.write("".join(f"{i:>4}  {line}\n" for i, line in enumerate(self.history, 1)))
+
+    def do_exit(self, arg):
+        self.console.close()
+
+
+# ---------- CONSOLE ----------
+class Console(tk.Frame):
+    def __init__(self, parent, banner="", max_lines=MAX_LINES, cwd=None, **text_options):
+        super().__init__(parent)
+        self.max_lines = max_lines
+        self.shell = Shell(self, cwd)
+        self._lock = threading.Lock()
+        self._chunks = collections.deque()
+        self._pending_lines = 0
+        self._pending_chars = 0
+        self._skipped = 0
+        self._flush_posted = False
+        self._running = False
+        self._recall = None
+        self.dispatcher = get_dispatcher(self)
+        # Stats
+        self.flushes = 0
+        self.skipped_total = 0
+
+        self.text = tk.Text(self, wrap="char", undo=False, **text_options)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.text.yview)
+        self.text.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side="right", fill="y")
+        self.text.pack(side="left", fill="both", expand=True)
+        self.text.bind("<Return>", self._on_return)
+        self.text.bind("<KeyPress>", self._on_key)
+        self.text.bind("<BackSpace>", self._on_backspace)
+        self.text.bind("<Up>", lambda e: self._walk_history(-1))
+        self.text.bind("<Down>", lambda e: self._walk_history(1))
+        self.text.bind("<Control-c>", self._on_interrupt)
+        self.bind("<Destroy>", self._on_destroy)
+
+        self.write(banner)
+        self._show_prompt()
+
+    def focus(self):
+        self.text.focus_set()
+
+    # ---------- OUTPUT ----------
+    def write(self, text):
+        """Queue ``text`` for the next frame; safe to call from any thread."""
+        if not text:
+            return
+        with self._lock:
+            self._chunks.append(text)
+            self._pending_lines += text.count("\n")
+            self._pending_chars += len(text)
+            # Ring buffer: drop the oldest pending output rather than grow without bound
+            while len(self._chunks) > 1 and (self._pending_lines > self.max_lines or
+                                             self._pending_chars > MAX_PENDING_CHARS):
+                old = self._chunks.popleft()
+                lines = old.count("\n")
+                self._pending_lines -= lines
+                self._pending_chars -= len(old)
+                self._skipped += lines
+            if self._flush_posted:
+                return
+            self._flush_posted = True
+        self.dispatcher.post(self._posted_flush)
+
+    def flush(self):
+        """Move pending output into the Text with one insert, then trim the scrollback."""
+        with self._lock:
+            self._flush_posted = False
+            if not self._chunks:
+                return
+            text = "".join(self._chunks)
+            skipped = self._skipped
+            self._chunks.clear()
+            self._pending_lines = self._pending_chars = self._skipped = 0
+        if text.count("\n") > self.max_lines:
+            cut = len(text)
+            for _ in range(self.max_lines + 1):
+                cut = text.rfind("\n", 0, cut)
+            skipped += text.count("\n", 0, cut + 1)
+            text = text[cut + 1:]
+        if skipped:
+            text = f"... {skipped:,} lines skipped ...\n" + text
+            self.skipped_total += skipped
+        follow = self.text.yview()[1] >= 1.0
+        self.text.insert("end-1c", text)
+        self._trim()
+        if follow:
+            self.text.see("end")
+        self.flushes += 1
+
+    def _trim(self):
+        lines = int(self.text.index("end-1c").split(".")[0])
+        if lines > self.max_lines:
+            self.text.delete("1.0", f"{lines - self.max_lines + 1}.0")
+
+    def clear(self):
+        with self._lock:
+            self._chunks.clear()
+            self._pending_lines = self._pending_chars = self._skipped = 0
+        self.text.delete("1.0", "end")
+
+    def close(self):
+        self.winfo_toplevel().destroy()
+
+    def command_started(self):
+        """Input is blocked, and output keeps being drained, until ``command_done``."""
+        self._running = True
+        self.dispatcher.hold()
+
+    def command_done(self):
+        """Called by the reader thread after the last output of a command."""
+        self.dispatcher.post(self._command_done)
+
+    def _posted_flush(self):
+        if self.winfo_exists():
+            self.flush()
+
+    def _command_done(self):
+        self._running = False
+        self.dispatcher.release()
+        if self.winfo_exists():
+            self.flush()
+            self._show_prompt()
+
+    # ---------- INPUT ----------
+    def _show_prompt(self):
+        if not self.winfo_exists():
+            return
+        self.write(self.shell.prompt())
+        self.flush()
+        self.text.mark_set("input", "end-1c")
+        self.text.mark_gravity("input", "left")
+        self.text.mark_set("insert", "end-1c")
+        self.text.see("end")
+
+    def _on_return(self, event):
+        if self._running:
+            return "break"
+        line = self.text.get("input", "end-1c")
+        self.text.insert("end-1c", "\n")
+        self._recall = None
+        self.shell.run(line)
+        if not self.winfo_exists():
+            return "break"  # exit
+        if not self._running:
+            self.flush()
+            self._show_prompt()
+        return "break"
+
+    def _on_key(self, event):
+        if self._running:
+            return None if event.state & 0x4 else "break"  # let Ctrl+C through
+        if self.text.compare("insert", "<", "input"):
+            # Output above the prompt is read-only; typing goes to the input line
+            if event.keysym == "Delete":
+                return "break"
+            if event.char:
+                self.text.mark_set("insert", "end-1c")
+        return None
+
+    def _on_backspace(self, event):
+        if self._running:
+            return "break"
+        if self.text.tag_ranges("sel"):
+            return None if self.text.compare("sel.first", ">=", "input") else "break"
+        if self.text.compare("insert", "<=", "input"):
+            return "break"
+        return None
+
+    def _on_interrupt(self, event):
+        if not self._running:
+            return None  # plain copy
+        self.write("^C\n")
+        self.shell.interrupt()
+        return "break"
+
+    def _walk_history(self, step):
+        history = self.shell.history
+        if self._running or not history:
+            return "break"
+        index = len(history) if self._recall is None else self._recall
+        index = max(0, min(len(history), index + step))
+        self._recall = index
+        self.text.delete("input", "end-1c")
+        if index < len(history):
+            self.text.insert("input", history[index])
+        self.text.mark_set("insert", "end-1c")
+        return "break"
+
+    def _on_destroy(self, event):
+        if str(event.widget) == str(self):
+            self.shell.interrupt()
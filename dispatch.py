@@ -0,0 +1,171 @@
+"""Hand work from background threads to the Tk main thread.
+
+Tk may only be touched from the thread that runs the main loop.  Worker
+threads (wallpaper decoding, console readers ...) post closures to a
+``Dispatcher`` instead, and the main loop runs them:
+
+    dispatcher = get_dispatcher(widget)
+    dispatcher.hold()                                 # main thread: work starts
+    threading.Thread(target=work).start()
+
+    def work():                                       # worker thread
+        result = compute()
+        dispatcher.post(label.configure, text=result)
+        dispatcher.post(dispatcher.release)           # done; stop draining
+
+* the queue is drained once per frame by a ``FrameScheduler`` job, in FIFO
+  order, until a time budget is used up; the rest waits for the next frame
+  so a burst of posts cannot freeze the UI
+* the drain job only runs while something is queued or a ``hold()`` is
+  outstanding, so an idle desktop does not wake up for it
+* backpressure: when ``max_pending`` closures are queued, a worker's
+  ``post`` blocks until the main loop catches up (``timeout`` seconds at
+  most, then the closure is dropped and counted).  Posts from the main
+  thread never block.
+* the dispatcher follows its scheduler: a paused session drains nothing,
+  and once its widget is destroyed posts are dropped without waiting
+* ``depth``, ``max_depth``, ``blocked`` ... and ``stats()`` show how far
+  behind the main loop is
+"""
+import collections
+import sys
+import threading
+import time
+
+from scheduler import get_scheduler, FRAME_MS, PRIORITY_HIGH
+
+BUDGET_MS = 4.0
+MAX_PENDING = 1000
+POST_TIMEOUT = 1.0
+
+
+class Dispatcher:
+    def __init__(self, widget, budget_ms=BUDGET_MS, max_pending=MAX_PENDING):
+        self.widget = widget
+        self.scheduler = get_scheduler(widget)
+        self.budget_ms = budget_ms
+        self.max_pending = max_pending
+        self._queue = collections.deque()
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._main = threading.get_ident()
+        self._holds = 0
+        self._job = None
+        self.closed = False
+        # Stats
+        self.posted = 0
+        self.drained = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.blocked_ms = 0.0
+        self.max_depth = 0
+        self.carried_over = 0
+        self.last_drain_ms = 0.0
+        self.max_drain_ms = 0.0
+        widget.bind("<Destroy>", self._destroyed, add="+")
+
+    @property
+    def depth(self):
+        return len(self._queue)
+
+    def stats(self):
+        return {"depth": self.depth, "max_depth": self.max_depth, "posted": self.posted,
+                "drained": self.drained, "dropped": self.dropped, "blocked": self.blocked,
+                "blocked_ms": round(self.blocked_ms, 1), "carried_over": self.carried_over,
+                "max_drain_ms": round(self.max_drain_ms, 2)}
+
+    # ---------- ANY THREAD ----------
+    def post(self, callback, *args, timeout=POST_TIMEOUT, **kwargs):
+        """Run ``callback(*args, **kwargs)`` on the main thread; False if it was dropped."""
+        on_main = threading.get_ident() == self._main
+        with self._lock:
+            if not on_main and len(self._queue) >= self.max_pending and not self.closed:
+                self.blocked += 1
+                start = time.perf_counter()
+                self._not_full.wait_for(lambda: len(self._queue) < self.max_pending or self.closed,
+                                        timeout)
+                self.blocked_ms += (time.perf_counter() - start) * 1000
+            if self.closed or (not on_main and len(self._queue) >= self.max_pending):
+                self.dropped += 1
+                return False
+            self._queue.append((callback, args, kwargs))
+            self.posted += 1
+            if len(self._queue) > self.max_depth:
+                self.max_depth = len(self._queue)
+        if on_main:
+            self._start()
+        return True
+
+    # ---------- MAIN THREAD ----------
+    def hold(self):
+        """Keep draining every frame until the matching ``release()``.
+
+        Call it on the main thread before starting work whose thread will post:
+        a worker cannot start the drain job itself.
+        """
+        self._holds += 1
+        self._start()
+
+    def release(self):
+        self._holds = max(0, self._holds - 1)
+
+    def drain(self, budget_ms=None):
+        """Run queued closures until the budget is used up; returns how many ran."""
+        budget = self.budget_ms if budget_ms is None else budget_ms
+        start = time.perf_counter()
+        ran = 0
+        while True:
+            with self._lock:
+                if not self._queue:
+                    break
+                if ran and (time.perf_counter() - start) * 1000 >= budget:
+                    self.carried_over += 1
+                    break
+                callback, args, kwargs = self._queue.popleft()
+                self._not_full.notify()
+            ran += 1
+            try:
+                callback(*args, **kwargs)
+            except Exception:
+                self.widget._root().report_callback_exception(*sys.exc_info())
+        self.drained += ran
+        self.last_drain_ms = (time.perf_counter() - start) * 1000
+        self.max_drain_ms = max(self.max_drain_ms, self.last_drain_ms)
+        return ran
+
+    def close(self):
+        """Drop everything queued and refuse further posts (waiting workers return)."""
+        with self._lock:
+            self.closed = True
+            self.dropped += len(self._queue)
+            self._queue.clear()
+            self._not_full.notify_all()
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+
+    def _start(self):
+        if self.closed or (self._job is not None and self._job.active):
+            return
+        self._job = self.scheduler.every(FRAME_MS, self._tick, priority=PRIORITY_HIGH, delay_ms=0)
+
+    def _tick(self):
+        self.drain()
+        with self._lock:
+            if self._queue or self._holds:
+                return None
+        self._job = None
+        return False
+
+    def _destroyed(self, event):
+        if str(event.widget) == str(self.widget):
+            self.close()
+
+
+def get_dispatcher(widget):
+    """The dispatcher of the scheduler ``widget`` runs on (see ``get_scheduler``)."""
+    scheduler = get_scheduler(widget)
+    dispatcher = getattr(scheduler, "dispatcher", None)
+    if dispatcher is None:
+        dispatcher = scheduler.dispatcher = Dispatcher(scheduler.root)
+    return dispatcher
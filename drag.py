@@ -0,0 +1,110 @@
+"""Coalesced drag handling.
+
+``<B1-Motion>`` fires far more often than the screen refreshes, and every
+``geometry``/``place`` call is a round trip to the Tk server.  A
+``DragController`` only remembers the latest pointer position and applies at
+most one move per display frame (``FRAME_MS``); the final position is always
+applied on release.  Positions can optionally snap to a grid and/or to the
+edges of the allowed area.
+
+    drag = DragController(widget, apply=lambda x, y: widget.place(x=x, y=y))
+    widget.bind("<Button-1>", lambda e: drag.start(e, widget.winfo_x(), widget.winfo_y()))
+    widget.bind("<B1-Motion>", drag.motion)
+    widget.bind("<ButtonRelease-1>", drag.end)
+"""
+import time
+
+from scheduler import get_scheduler, FRAME_MS, PRIORITY_HIGH
+
+
+class DragController:
+    def __init__(self, widget, apply, grid=0, snap=0, bounds=None):
+        """``apply(x, y)`` moves the object; ``bounds()`` returns (min_x, min_y, max_x, max_y)."""
+        self.scheduler = get_scheduler(widget)
+        self.apply = apply
+        self.grid = grid
+        self.snap = snap
+        self.bounds = bounds
+        self._job = None
+        self._active = False
+        self._last_apply = 0.0
+        self._pending = None
+        self._applied_pos = None
+        # Stats for the current / last drag
+        self.events = 0
+        self.applied = 0
+
+    @property
+    def coalesced(self):
+        return self.events - self.applied
+
+    def start(self, event, origin_x, origin_y):
+        self._cancel()
+        self._active = True
+        self._start = (event.x_root, event.y_root)
+        self._origin = (origin_x, origin_y)
+        self._pending = None
+        self._applied_pos = (origin_x, origin_y)
+        self._limits = self.bounds() if self.bounds is not None else None
+        self.events = 0
+        self.applied = 0
+
+    def motion(self, event):
+        if not self._active:
+            return
+        self.events += 1
+        self._pending = (event.x_root, event.y_root)
+        if self._job is not None:
+            return  # a flush is already queued for this frame
+        wait = FRAME_MS - (time.perf_counter() - self._last_apply) * 1000
+        if wait <= 0:
+            self._flush()
+        else:
+            self._job = self.scheduler.after(wait, self._flush, priority=PRIORITY_HIGH)
+
+    def end(self, event=None):
+        if not self._active:
+            return
+        if event is not None:
+            self._pending = (event.x_root, event.y_root)
+        self._cancel()
+        self._flush()
+        self._active = False
+
+    def _cancel(self):
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+
+    def _flush(self):
+        self._job = None
+        if self._pending is None:
+            return
+        px, py = self._pending
+        self._pending = None
+        x = self._origin[0] + px - self._start[0]
+        y = self._origin[1] + py - self._start[1]
+        x, y = self._snap(x, y)
+        if (x, y) == self._applied_pos:
+            return
+        self.apply(x, y)
+        self._applied_pos = (x, y)
+        self._last_apply = time.perf_counter()
+        self.applied += 1
+
+    def _snap(self, x, y):
+        if self.grid:
+            x = round(x / self.grid) * self.grid
+            y = round(y / self.grid) * self.grid
+        if self._limits is not None:
+            min_x, min_y, max_x, max_y = self._limits
+            if self.snap:
+                if abs(x - min_x) <= self.snap:
+                    x = min_x
+                elif abs(x - max_x) <= self.snap:
+                    x = max_x
+                if abs(y - min_y) <= self.snap:
+                    y = min_y
+                elif abs(y - max_y) <= self.snap:
+                    y = max_y
+        return x, y
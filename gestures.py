@@ -0,0 +1,230 @@
+"""Touch-style gestures from mouse events.
+
+``GestureTracker`` is the recognizer itself and knows nothing about Tk: it is
+fed positions with timestamps and returns a ``Gesture`` when one is
+recognized.  ``GestureRecognizer`` binds one to a widget:
+
+    gestures = GestureRecognizer(home)
+    gestures.on("swipe", lambda g: print(g.direction, g.velocity))
+    gestures.on("long_press", open_menu)
+
+* motion is sampled at most once per ``sample_ms``.  In between, a motion
+  event only stores its position, so fast mice cost next to nothing.
+* velocity comes from the samples of the last ``window_ms``, so the
+  finger's speed at release counts, not its average over the whole drag
+* one gesture per touch, fired once:
+
+  - ``swipe``: moved ``swipe_px`` along one axis; fired while the finger
+    is still moving
+  - ``fling``: released moving faster than ``fling_speed`` px/s before it
+    got that far
+  - ``long_press``: held still for ``long_press_ms``; fired by a timer,
+    not on release
+  - ``tap``: released quickly without moving
+  - ``pinch``: Ctrl+wheel (what touchpads send for a pinch), fired once
+    the wheel has been idle for ``pinch_idle_ms``, with the total ``scale``
+"""
+import collections
+
+from scheduler import get_scheduler, PRIORITY_HIGH
+
+SLOP_PX = 10
+SWIPE_PX = 60
+FLING_SPEED = 800
+SAMPLE_MS = 8
+WINDOW_MS = 80
+LONG_PRESS_MS = 600
+TAP_MS = 300
+PINCH_STEP = 1.1
+PINCH_IDLE_MS = 150
+
+
+class Gesture:
+    __slots__ = ("kind", "direction", "dx", "dy", "velocity", "duration_ms", "scale")
+
+    def __init__(self, kind, direction=None, dx=0, dy=0, velocity=0.0, duration_ms=0, scale=1.0):
+        self.kind = kind
+        self.direction = direction
+        self.dx = dx
+        self.dy = dy
+        self.velocity = velocity        # px/s at the end of the gesture
+        self.duration_ms = duration_ms
+        self.scale = scale              # pinch only
+
+    def __repr__(self):
+        return (f"<Gesture {self.kind} {self.direction or ''} dx={self.dx} dy={self.dy} "
+                f"v={self.velocity:.0f}px/s {self.duration_ms}ms scale={self.scale:.2f}>")
+
+
+def direction(dx, dy):
+    if abs(dx) > abs(dy):
+        return "right" if dx > 0 else "left"
+    return "down" if dy > 0 else "up"
+
+
+# ---------- TRACKER ----------
+class GestureTracker:
+    def __init__(self, slop=SLOP_PX, swipe_px=SWIPE_PX, fling_speed=FLING_SPEED,
+                 sample_ms=SAMPLE_MS, window_ms=WINDOW_MS, tap_ms=TAP_MS):
+        self.slop = slop
+        self.swipe_px = swipe_px
+        self.fling_speed = fling_speed
+        self.sample_ms = sample_ms
+        self.window_ms = window_ms
+        self.tap_ms = tap_ms
+        self.down = False
+        self.moved = False
+        self.done = False       # a gesture was recognized for this touch
+        self.x = self.y = 0
+        self._origin = (0, 0, 0)
+        self._samples = collections.deque(maxlen=max(4, window_ms // sample_ms + 2))
+        self._pinch_steps = 0
+        # Stats
+        self.events = 0
+        self.samples = 0
+
+    def press(self, x, y, t):
+        self.events += 1
+        self.down = True
+        self.moved = self.done = False
+        self.x, self.y = x, y
+        self._origin = (t, x, y)
+        self._samples.clear()
+        self._samples.append((t, x, y))
+
+    def move(self, x, y, t):
+        self.events += 1
+        self.x, self.y = x, y
+        if not self.down or self.done or t - self._samples[-1][0] < self.sample_ms:
+            return None
+        self.samples += 1
+        self._samples.append((t, x, y))
+        t0, x0, y0 = self._origin
+        dx, dy = x - x0, y - y0
+        if not self.moved and max(abs(dx), abs(dy)) > self.slop:
+            self.moved = True
+        if max(abs(dx), abs(dy)) >= self.swipe_px:
+            self.done = True
+            return Gesture("swipe", direction(dx, dy), dx, dy, self.velocity(x, y, t), t - t0)
+        return None
+
+    def release(self, x, y, t):
+        self.events += 1
+        if not self.down:
+            return None
+        self.down = False
+        if self.done:
+            return None
+        self.done = True
+        t0, x0, y0 = self._origin
+        dx, dy = x - x0, y - y0
+        if max(abs(dx), abs(dy)) > self.slop:
+            speed = self.velocity(x, y, t)
+            if speed >= self.fling_speed:
+                return Gesture("fling", direction(dx, dy), dx, dy, speed, t - t0)
+            return None
+        if t - t0 <= self.tap_ms:
+            return Gesture("tap", None, dx, dy, 0.0, t - t0)
+        return None
+
+    def long_press(self, t):
+        """Timer callback: a long press if the finger is still down and still."""
+        if not self.down or self.moved or self.done:
+            return None
+        self.done = True
+        t0, x0, y0 = self._origin
+        return Gesture("long_press", None, self.x - x0, self.y - y0, 0.0, t - t0)
+
+    def velocity(self, x, y, t):
+        """Speed in px/s between ``(x, y, t)`` and the oldest sample of the window."""
+        for ts, xs, ys in self._samples:
+            if t - ts <= self.window_ms:
+                break
+        elapsed = t - ts
+        if elapsed <= 0:
+            return 0.0
+        return ((x - xs) ** 2 + (y - ys) ** 2) ** 0.5 * 1000 / elapsed
+
+    def pinch(self, steps):
+        self.events += 1
+        # Counted in whole steps, so in and out again is exactly no pinch
+        self._pinch_steps += steps
+
+    def pinch_end(self, duration_ms=0):
+        steps, self._pinch_steps = self._pinch_steps, 0
+        if not steps:
+            return None
+        scale = PINCH_STEP ** steps
+        return Gesture("pinch", "out" if scale > 1 else "in", duration_ms=duration_ms, scale=scale)
+
+
+# ---------- WIDGET ----------
+class GestureRecognizer:
+    def __init__(self, widget, long_press_ms=LONG_PRESS_MS, pinch_idle_ms=PINCH_IDLE_MS, **options):
+        self.widget = widget
+        self.long_press_ms = long_press_ms
+        self.pinch_idle_ms = pinch_idle_ms
+        self.tracker = GestureTracker(**options)
+        self.scheduler = get_scheduler(widget)
+        self._handlers = {}
+        self._timer = None
+        self._pinch_job = None
+        self._pinch_started = self._pinch_last = 0
+        # Stats
+        self.recognized = collections.Counter()
+        widget.bind("<ButtonPress-1>", self._on_press, add="+")
+        widget.bind("<B1-Motion>", self._on_motion, add="+")
+        widget.bind("<ButtonRelease-1>", self._on_release, add="+")
+        widget.bind("<Control-MouseWheel>", lambda e: self._on_pinch(e, 1 if e.delta > 0 else -1), add="+")
+        widget.bind("<Control-Button-4>", lambda e: self._on_pinch(e, 1), add="+")
+        widget.bind("<Control-Button-5>", lambda e: self._on_pinch(e, -1), add="+")
+
+    def on(self, kind, callback):
+        """Call ``callback(gesture)`` for every recognized gesture of ``kind``."""
+        self._handlers.setdefault(kind, []).append(callback)
+        return self
+
+    def _emit(self, gesture):
+        if gesture is None:
+            return
+        self._cancel_timer()
+        self.recognized[gesture.kind] += 1
+        for callback in self._handlers.get(gesture.kind, ()):
+            callback(gesture)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _on_press(self, event):
+        self.tracker.press(event.x_root, event.y_root, event.time)
+        self._cancel_timer()
+        if "long_press" in self._handlers:
+            start = event.time
+            self._timer = self.scheduler.after(
+                self.long_press_ms, lambda: self._emit(self.tracker.long_press(start + self.long_press_ms)),
+                priority=PRIORITY_HIGH, owner=self.widget)
+
+    def _on_motion(self, event):
+        gesture = self.tracker.move(event.x_root, event.y_root, event.time)
+        if self.tracker.moved and self._timer is not None:
+            self._cancel_timer()
+        self._emit(gesture)
+
+    def _on_release(self, event):
+        self._cancel_timer()
+        self._emit(self.tracker.release(event.x_root, event.y_root, event.time))
+
+    def _on_pinch(self, event, steps):
+        if self._pinch_job is None:
+            self._pinch_started = event.time
+        else:
+            self._pinch_job.cancel()
+        self._pinch_last = event.time
+        self.tracker.pinch(steps)
+        self._pinch_job = self.scheduler.after(self.pinch_idle_ms, self._pinch_idle, owner=self.widget)
+
+    def _pinch_idle(self):
+        self._pinch_job = None
+        self._emit(self.tracker.pinch_end(self._pinch_last - self._pinch_started))
@@ -0,0 +1,191 @@
+"""Run all the OS simulators as sessions of one Tk interpreter.
+
+Normally every simulator gets its own process, its own Tcl interpreter and its
+own copy of the fonts, images and ttk theme.  ``Host`` runs each one in a
+Toplevel of a single ``Tk`` root instead, so they all share one interpreter
+and one event loop:
+
+* a session is started the first time it is selected, and it gets its own
+  ``FrameScheduler`` (``attach_scheduler``).  Its clocks, animations,
+  timeouts and pooled windows run on that scheduler only; a plain ``after``
+  or ttk's own progress animation would keep running while it is suspended.
+* only the session in front runs.  Switching away pauses its scheduler and
+  withdraws its windows; switching back restores both.
+* a simulator that shuts itself down (``destroy()``/``quit()``) only ends its
+  own session
+* the launcher bar shows the RSS of the process; ``benchmarks/host_bench.py``
+  compares it with running the five simulators as separate processes
+
+Ctrl+1 ... Ctrl+5 switch sessions from any window.
+
+    python host.py [--start windows] [--all]
+"""
+import os
+import sys
+import tkinter as tk
+
+from scheduler import get_scheduler, attach_scheduler, PRIORITY_LOW
+from simulators import SIMULATORS, load_simulator
+
+STATUS_MS = 2000
+
+
+def resident_kb():
+    """Current resident set size of this process in KB (peak RSS if unavailable)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            pages = int(fh.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+# ---------- SESSION ----------
+class Session:
+    def __init__(self, host, name):
+        self.host = host
+        self.name = name
+        self.suspended = False
+        self._hidden = []
+        self.top = tk.Toplevel(host.root)
+        self.scheduler = attach_scheduler(self.top)
+        # The simulators quit by ending the whole app; here that only ends the session
+        self.top.quit = self.top.destroy
+        self.top.bind("<Destroy>", self._destroyed, add="+")
+        self.app = load_simulator(name)(self.top)
+
+    def windows(self):
+        """The session's Toplevel and the popups/app windows opened from it."""
+        return [self.top] + [w for w in self.top.winfo_children() if isinstance(w, tk.Toplevel)]
+
+    def suspend(self):
+        if self.suspended:
+            return
+        self.suspended = True
+        self.scheduler.pause()
+        self._hidden = [w for w in self.windows() if w.winfo_ismapped()]
+        for window in self._hidden:
+            window.withdraw()
+
+    def resume(self):
+        if not self.suspended:
+            return
+        self.suspended = False
+        for window in self._hidden:
+            if window.winfo_exists():
+                window.deiconify()
+        self._hidden = []
+        self.scheduler.resume()
+        self.top.lift()
+        self.top.focus_force()
+
+    def _destroyed(self, event):
+        if str(event.widget) != str(self.top):
+            return
+        self.scheduler.cancel_all()
+        self.host._session_closed(self)
+
+
+# ---------- HOST ----------
+class Host:
+    def __init__(self, root, names=None):
+        self.root = root
+        self.names = list(names or SIMULATORS)
+        self.sessions = {}
+        self.current = None
+
+        root.title("all-os")
+        root.resizable(False, False)
+        root.attributes("-topmost", True)
+        bar = tk.Frame(root, bg="#202020")
+        bar.pack(fill="x")
+        self.buttons = {}
+        for index, name in enumerate(self.names, 1):
+            button = tk.Button(bar, text=f"{index}  {name}", width=10,
+                               command=lambda n=name: self.switch(n))
+            button.pack(side="left", padx=2, pady=4)
+            self.buttons[name] = button
+            root.bind_all(f"<Control-Key-{index}>", lambda e, n=name: self.switch(n))
+        self.status = tk.Label(bar, text="", fg="white", bg="#202020", font=("Arial", 10))
+        self.status.pack(side="left", padx=10)
+
+        get_scheduler(root).every(STATUS_MS, self.update_status, priority=PRIORITY_LOW, delay_ms=0)
+
+    # ---------- SESSIONS ----------
+    def switch(self, name):
+        """Bring session ``name`` to the front, starting it if needed."""
+        session = self.sessions.get(name)
+        if session is not None and session is self.current:
+            session.top.lift()
+            return session
+        previous = self.current
+        if session is None:
+            session = Session(self, name)
+            self.sessions[name] = session
+            if previous is not None:
+                previous.suspend()
+        else:
+            if previous is not None:
+                previous.suspend()
+            session.resume()
+        self.current = session
+        self.update_status()
+        return session
+
+    def close(self, name):
+        session = self.sessions.get(name)
+        if session is not None:
+            session.top.destroy()
+
+    def _session_closed(self, session):
+        self.sessions.pop(session.name, None)
+        if self.current is session:
+            self.current = None
+        try:
+            self.update_status()
+        except tk.TclError:
+            pass  # the whole host is being torn down
+
+    # ---------- STATUS ----------
+    def update_status(self):
+        for name, button in self.buttons.items():
+            session = self.sessions.get(name)
+            if session is None:
+                button.config(relief="raised", fg="gray")
+            elif session is self.current:
+                button.config(relief="sunken", fg="black")
+            else:
+                button.config(relief="raised", fg="black")
+        suspended = sum(1 for s in self.sessions.values() if s.suspended)
+        text = f"{len(self.sessions) - suspended} running, {suspended} suspended"
+        rss = resident_kb()
+        if rss:
+            text += f"  |  RSS {rss / 1024:.0f} MB"
+        self.status.config(text=text)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the OS simulators as sessions of one Tk root.")
+    parser.add_argument("--start", choices=sorted(SIMULATORS), help="session to open first")
+    parser.add_argument("--all", action="store_true", help="start every session up front")
+    args = parser.parse_args(argv)
+
+    root = tk.Tk()
+    host = Host(root)
+    if args.all:
+        for name in host.names:
+            host.switch(name)
+    if args.start:
+        host.switch(args.start)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
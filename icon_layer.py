@@ -0,0 +1,377 @@
+"""Canvas-backed desktop icons.
+
+Every desktop icon used to be a Frame with two Labels and six bindings, and
+changing the icon size, hiding the icons or refreshing the desktop destroyed
+and rebuilt all of them.  ``IconLayer`` draws each icon as two items (glyph
+and caption) on one Canvas, tagged ``icon`` and ``i<id>``.
+
+* hit-testing and rubber-band selection go through ``SpatialGrid`` instead of
+  asking Tk for overlapping items
+* resizing reconfigures fonts and moves captions by tag, so the number of Tcl
+  calls does not grow with the number of icons
+* hiding/showing is a single ``itemconfigure`` on the ``icon`` tag
+* dragging moves the whole selection (tag ``sel``) with one ``move`` per frame
+"""
+import collections
+import tkinter.font as tkfont
+
+from drag import DragController
+
+# name -> (glyph pt, caption pt)
+SIZES = {"small": (30, 10), "medium": (45, 11), "large": (65, 13)}
+CAPTION_COLOR = "white"
+SELECT_FILL = "#5b8fd1"
+SELECT_OUTLINE = "#9cc2f2"
+BAND_OUTLINE = "#cfe3ff"
+CONTROL_MASK = 0x0004
+
+
+# ---------- SPATIAL INDEX ----------
+class SpatialGrid:
+    """Uniform grid of cell -> keys for point and rectangle queries."""
+
+    def __init__(self, cell=96):
+        self.cell = cell
+        self._cells = collections.defaultdict(set)
+        self._boxes = {}
+
+    def __len__(self):
+        return len(self._boxes)
+
+    def _span(self, box):
+        c = self.cell
+        x0, y0, x1, y1 = box
+        return range(int(x0 // c), int(x1 // c) + 1), range(int(y0 // c), int(y1 // c) + 1)
+
+    def insert(self, key, box):
+        if key in self._boxes:
+            self.remove(key)
+        self._boxes[key] = box
+        xs, ys = self._span(box)
+        for cx in xs:
+            for cy in ys:
+                self._cells[cx, cy].add(key)
+
+    def remove(self, key):
+        box = self._boxes.pop(key, None)
+        if box is None:
+            return
+        xs, ys = self._span(box)
+        for cx in xs:
+            for cy in ys:
+                bucket = self._cells.get((cx, cy))
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._cells[cx, cy]
+
+    def clear(self):
+        self._cells.clear()
+        self._boxes.clear()
+
+    def box(self, key):
+        return self._boxes[key]
+
+    def at(self, x, y):
+        """Keys whose box contains the point."""
+        bucket = self._cells.get((int(x // self.cell), int(y // self.cell)), ())
+        found = []
+        for key in bucket:
+            x0, y0, x1, y1 = self._boxes[key]
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                found.append(key)
+        return found
+
+    def within(self, box):
+        """Keys whose box intersects ``box``."""
+        bx0, by0, bx1, by1 = box
+        found = set()
+        xs, ys = self._span(box)
+        for cx in xs:
+            for cy in ys:
+                for key in self._cells.get((cx, cy), ()):
+                    if key in found:
+                        continue
+                    x0, y0, x1, y1 = self._boxes[key]
+                    if x0 <= bx1 and bx0 <= x1 and y0 <= by1 and by0 <= y1:
+                        found.add(key)
+        return found
+
+
+# ---------- ICONS ----------
+class Icon:
+    __slots__ = ("id", "glyph", "text", "x", "y", "on_open", "on_menu")
+
+    def __init__(self, icon_id, glyph, text, x, y, on_open, on_menu):
+        self.id = icon_id
+        self.glyph = glyph
+        self.text = text
+        self.x = x  # centre of the cell
+        self.y = y  # top of the cell
+        self.on_open = on_open
+        self.on_menu = on_menu
+
+
+class IconLayer:
+    def __init__(self, canvas, size="medium", grid=0, snap=0, menu=None, on_move=None):
+        """``menu(event)`` is called for right-clicks on empty desktop, ``on_move(ids)`` after a drag."""
+        self.canvas = canvas
+        self.menu = menu
+        self.on_move = on_move
+        self.icons = {}
+        self.index = SpatialGrid()
+        self.selected = set()
+        self.visible = True
+        self.caption_color = CAPTION_COLOR
+        self._next_id = 0
+        self._metrics = {}
+        self._apply_metrics(size)
+        self._mode = None
+        self._drag_pos = None
+        self._band_origin = None
+        self._band = None
+        self.drag = DragController(canvas, self._drag_to, grid=grid, snap=snap, bounds=self._drag_bounds)
+        self._band_drag = DragController(canvas, self._band_to)
+        canvas.bind("<Button-1>", self._press)
+        canvas.bind("<B1-Motion>", self._motion)
+        canvas.bind("<ButtonRelease-1>", self._release)
+        canvas.bind("<Double-Button-1>", self._double)
+        canvas.bind("<Button-3>", self._context)
+
+    # ---------- METRICS ----------
+    def _apply_metrics(self, size):
+        metrics = self._metrics.get(size)
+        if metrics is None:
+            glyph_pt, caption_pt = SIZES[size]
+            glyph_font = ("Segoe UI Emoji", glyph_pt)
+            caption_font = ("Segoe UI", caption_pt)
+            glyph_h = tkfont.Font(root=self.canvas, font=glyph_font).metrics("linespace")
+            caption_h = tkfont.Font(root=self.canvas, font=caption_font).metrics("linespace")
+            cell_w = max(glyph_h + 24, 80)
+            metrics = (glyph_font, caption_font, glyph_h, cell_w, glyph_h + 2 * caption_h + 4)
+            self._metrics[size] = metrics
+        self.size = size
+        self.glyph_font, self.caption_font, self.glyph_h, self.cell_w, self.cell_h = metrics
+
+    def position(self, icon_id):
+        """Top-left corner of the icon's cell, as passed to ``add``."""
+        icon = self.icons[icon_id]
+        return icon.x - self.cell_w / 2, icon.y
+
+    def _box(self, icon):
+        half = self.cell_w / 2
+        return (icon.x - half, icon.y, icon.x + half, icon.y + self.cell_h)
+
+    # ---------- ICONS ----------
+    def add(self, glyph, text, x, y, on_open=None, on_menu=None):
+        """Add an icon whose cell's top-left corner is at (x, y); returns its id."""
+        icon_id = self._next_id
+        self._next_id += 1
+        icon = Icon(icon_id, glyph, text, x + self.cell_w / 2, y, on_open, on_menu)
+        self.icons[icon_id] = icon
+        tags = ("icon", f"i{icon_id}")
+        state = "normal" if self.visible else "hidden"
+        self.canvas.create_text(icon.x, icon.y, text=glyph, anchor="n", font=self.glyph_font,
+                                tags=tags + ("icon_glyph",), state=state)
+        self.canvas.create_text(icon.x, icon.y + self.glyph_h, text=text, anchor="n",
+                                width=self.cell_w, justify="center", fill=self.caption_color,
+                                font=self.caption_font, tags=tags + ("icon_caption",), state=state)
+        self.index.insert(icon_id, self._box(icon))
+        return icon_id
+
+    def remove(self, icon_id):
+        if self.icons.pop(icon_id, None) is None:
+            return
+        self.selected.discard(icon_id)
+        self.index.remove(icon_id)
+        self.canvas.delete(f"i{icon_id}", f"h{icon_id}")
+
+    def clear(self):
+        self.canvas.delete("icon")
+        self.icons.clear()
+        self.index.clear()
+        self.selected.clear()
+
+    def set_size(self, size):
+        """Rescale the existing items in place.
+
+        Cells keep their top-left corner, so ``position()`` (what the desktop
+        saves and passes back to ``add``) does not depend on the size.
+        """
+        if size == self.size:
+            return
+        old_glyph_h, old_cell_w = self.glyph_h, self.cell_w
+        self._apply_metrics(size)
+        dx = (self.cell_w - old_cell_w) / 2
+        self.canvas.itemconfigure("icon_glyph", font=self.glyph_font)
+        self.canvas.itemconfigure("icon_caption", font=self.caption_font, width=self.cell_w)
+        self.canvas.move("icon_glyph", dx, 0)
+        self.canvas.move("icon_caption", dx, self.glyph_h - old_glyph_h)
+        self.index.clear()
+        for icon in self.icons.values():
+            icon.x += dx
+            self.index.insert(icon.id, self._box(icon))
+        self._redraw_highlights()
+
+    def set_caption_color(self, color):
+        self.caption_color = color
+        self.canvas.itemconfigure("icon_caption", fill=color)
+
+    def set_visible(self, visible):
+        self.visible = visible
+        if not visible:
+            self.select(())
+        self.canvas.itemconfigure("icon", state="normal" if visible else "hidden")
+
+    def refresh(self):
+        """Re-apply fonts and visibility without rebuilding anything."""
+        self.select(())
+        self.canvas.itemconfigure("icon_glyph", font=self.glyph_font)
+        self.canvas.itemconfigure("icon_caption", font=self.caption_font, width=self.cell_w)
+        self.canvas.itemconfigure("icon", state="normal" if self.visible else "hidden")
+
+    def free_slot(self, x=50, y=100, gap=20):
+        """Top-left of the first empty cell, scanning down columns from (x, y)."""
+        height = max(self.canvas.winfo_height(), y + self.cell_h)
+        while True:
+            row_y = y
+            while row_y + self.cell_h <= height:
+                if not self.index.within((x + 1, row_y + 1, x + self.cell_w - 1, row_y + self.cell_h - 1)):
+                    return x, row_y
+                row_y += self.cell_h + gap
+            x += self.cell_w + gap
+
+    def icon_at(self, x, y):
+        if not self.visible:
+            return None
+        hits = self.index.at(x, y)
+        if not hits:
+            return None
+        # Selected icons are drawn on top, then the most recently added
+        return self.icons[max(hits, key=lambda k: (k in self.selected, k))]
+
+    # ---------- SELECTION ----------
+    def select(self, ids):
+        ids = set(ids)
+        added = ids - self.selected
+        removed = self.selected - ids
+        if not added and not removed:
+            return
+        path = str(self.canvas)
+        lines = []
+        for k in removed:
+            lines.append(f"{path} dtag i{k} sel")
+            lines.append(f"{path} delete h{k}")
+        for k in added:
+            lines.append(f"{path} addtag sel withtag i{k}")
+            lines.append(self._highlight_line(path, k))
+        self.selected = ids
+        # One Tcl round trip however many icons changed
+        self.canvas.tk.eval("\n".join(lines))
+
+    def _highlight_line(self, path, k):
+        x0, y0, x1, y1 = self._box(self.icons[k])
+        return (f"{path} create rectangle {x0} {y0} {x1} {y1} -fill {SELECT_FILL} "
+                f"-outline {SELECT_OUTLINE} -tags {{icon sel hl h{k}}}\n{path} lower h{k} i{k}")
+
+    def _redraw_highlights(self):
+        path = str(self.canvas)
+        lines = [f"{path} delete hl"]
+        lines.extend(self._highlight_line(path, k) for k in self.selected)
+        self.canvas.tk.eval("\n".join(lines))
+
+    # ---------- MOUSE ----------
+    def _press(self, event):
+        self.canvas.focus_set()
+        icon = self.icon_at(event.x, event.y)
+        toggle = event.state & CONTROL_MASK
+        if icon is None:
+            if not toggle:
+                self.select(())
+            self._start_band(event)
+            return
+        if toggle:
+            self.select(self.selected ^ {icon.id})
+            self._mode = None
+            return
+        if icon.id not in self.selected:
+            self.select((icon.id,))
+        self._start_drag(event)
+
+    def _motion(self, event):
+        if self._mode == "drag":
+            self.drag.motion(event)
+        elif self._mode == "band":
+            self._band_drag.motion(event)
+
+    def _release(self, event):
+        if self._mode == "drag":
+            self.drag.end(event)
+            self._finish_drag()
+        elif self._mode == "band":
+            self._band_drag.end(event)
+            self.canvas.delete(self._band)
+            self._band = None
+        self._mode = None
+
+    def _double(self, event):
+        icon = self.icon_at(event.x, event.y)
+        if icon is not None and icon.on_open is not None:
+            icon.on_open()
+
+    def _context(self, event):
+        icon = self.icon_at(event.x, event.y)
+        if icon is not None and icon.on_menu is not None:
+            icon.on_menu(event)
+        elif self.menu is not None:
+            self.menu(event)
+
+    # ---------- DRAG ----------
+    def _selection_box(self):
+        boxes = [self.index.box(k) for k in self.selected]
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+    def _start_drag(self, event):
+        self._mode = "drag"
+        x0, y0, x1, y1 = self._selection_box()
+        self._drag_extent = (x1 - x0, y1 - y0)
+        self._drag_origin = self._drag_pos = (x0, y0)
+        self.canvas.tag_raise("sel")
+        self.drag.start(event, x0, y0)
+
+    def _drag_bounds(self):
+        w, h = self._drag_extent
+        return (0, 0, self.canvas.winfo_width() - w, self.canvas.winfo_height() - h)
+
+    def _drag_to(self, x, y):
+        self.canvas.move("sel", x - self._drag_pos[0], y - self._drag_pos[1])
+        self._drag_pos = (x, y)
+
+    def _finish_drag(self):
+        dx = self._drag_pos[0] - self._drag_origin[0]
+        dy = self._drag_pos[1] - self._drag_origin[1]
+        if not dx and not dy:
+            return
+        for k in self.selected:
+            icon = self.icons[k]
+            icon.x += dx
+            icon.y += dy
+            self.index.insert(k, self._box(icon))
+        if self.on_move is not None:
+            self.on_move(sorted(self.selected))
+
+    # ---------- RUBBER BAND ----------
+    def _start_band(self, event):
+        self._mode = "band"
+        self._band_origin = (event.x, event.y)
+        self._band_base = set(self.selected)
+        self._band = self.canvas.create_rectangle(event.x, event.y, event.x, event.y,
+                                                  outline=BAND_OUTLINE, dash=(3, 2))
+        self._band_drag.start(event, event.x, event.y)
+
+    def _band_to(self, x, y):
+        ox, oy = self._band_origin
+        box = (min(ox, x), min(oy, y), max(ox, x), max(oy, y))
+        self.canvas.coords(self._band, *box)
+        self.select(self._band_base | self.index.within(box))
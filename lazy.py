@@ -0,0 +1,68 @@
+"""Deferred imports for modules a simulator may never need.
+
+``lazy_import(name)`` returns a stand-in that imports the real module on
+first attribute access, so dialogs (``messagebox``, ``colorchooser`` ...),
+``ttk`` and platform modules such as ``winsound`` cost nothing until they
+are used.  A missing optional module makes the stand-in falsy instead of
+failing at import time:
+
+    winsound = lazy_import("winsound")
+    if winsound:
+        winsound.Beep(1000, 500)
+
+``preload(*names)`` imports modules on a background thread so they are ready
+by the time they are first used (e.g. while a boot screen is showing).
+"""
+import importlib
+import sys
+
+
+class LazyModule:
+    __slots__ = ("_name", "_module", "_missing")
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._missing = False
+
+    def _load(self):
+        if self._module is None and not self._missing:
+            try:
+                self._module = importlib.import_module(self._name)
+            except ImportError:
+                self._missing = True
+        return self._module
+
+    def __getattr__(self, attr):
+        module = self._load()
+        if module is None:
+            raise ImportError(f"optional module {self._name!r} is not available")
+        return getattr(module, attr)
+
+    def __bool__(self):
+        return self._load() is not None
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "missing" if self._missing else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    """Return ``name`` if it is already imported, else a LazyModule for it."""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
+
+
+def preload(*names):
+    """Import ``names`` on a daemon thread; returns the thread."""
+    import threading
+
+    def run():
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+    thread = threading.Thread(target=run, name="preload", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,168 @@
+"""Widget and timer leak detector for screen transitions.
+
+Opt-in instrumentation: set ``OS_LEAKCHECK=1`` and every simulator wraps the
+methods listed in its ``TRANSITIONS`` attribute.  After each transition a
+snapshot is taken of
+
+* the live widget tree (total and per widget class),
+* pending Tcl ``after`` ids and FrameScheduler jobs (per callback name),
+* live Tk roots,
+* tracemalloc's current traced memory,
+
+and compared with the snapshot from the previous visit to the same
+transition.  Anything that grew is reported on stderr (and kept in
+``LeakDetector.flags``), so a screen that is entered repeatedly in a
+long-running session has to come back to the same footprint every time.
+"""
+import collections
+import functools
+import gc
+import os
+import sys
+import time
+import tkinter as tk
+
+from lazy import lazy_import
+from scheduler import get_scheduler
+
+# Only needed once the detector is switched on
+tracemalloc = lazy_import("tracemalloc")
+
+ENV_VAR = "OS_LEAKCHECK"
+MEMORY_TOLERANCE_KB = 64
+KEEP_SNAPSHOTS = 100
+
+
+def install(app, transitions=None):
+    """Attach a LeakDetector to ``app`` when ``OS_LEAKCHECK`` is set.
+
+    Call it before the app binds any of its transition methods to widgets.
+    """
+    if not os.environ.get(ENV_VAR):
+        return None
+    detector = LeakDetector(app.root)
+    detector.watch(app, transitions if transitions is not None else getattr(app, "TRANSITIONS", ()))
+    app.leak_detector = detector
+    return detector
+
+
+# ---------- SNAPSHOT ----------
+class Snapshot:
+    def __init__(self, label, widgets, timers, jobs, roots, memory_kb):
+        self.label = label
+        self.time = time.time()
+        self.widgets = widgets
+        self.timers = timers
+        self.jobs = jobs
+        self.roots = roots
+        self.memory_kb = memory_kb
+
+    @property
+    def widget_total(self):
+        return sum(self.widgets.values())
+
+    @property
+    def job_total(self):
+        return sum(self.jobs.values())
+
+    def growth(self, previous, memory_tolerance_kb=MEMORY_TOLERANCE_KB):
+        """Return human-readable growth entries relative to ``previous``."""
+        found = []
+        widget_delta = self.widget_total - previous.widget_total
+        if widget_delta > 0:
+            found.append(f"widgets +{widget_delta} ({_delta_text(self.widgets, previous.widgets)})")
+        if self.timers > previous.timers:
+            found.append(f"after ids +{self.timers - previous.timers}")
+        if self.job_total > previous.job_total:
+            found.append(f"scheduler jobs +{self.job_total - previous.job_total} "
+                         f"({_delta_text(self.jobs, previous.jobs)})")
+        if self.roots > previous.roots:
+            found.append(f"Tk roots +{self.roots - previous.roots}")
+        if self.memory_kb - previous.memory_kb > memory_tolerance_kb:
+            found.append(f"traced memory +{self.memory_kb - previous.memory_kb:.0f} KB")
+        return found
+
+
+def _delta_text(now, before):
+    parts = []
+    for key in sorted(now):
+        delta = now[key] - before.get(key, 0)
+        if delta > 0:
+            parts.append(f"{key} +{delta}")
+    return ", ".join(parts)
+
+
+# ---------- DETECTOR ----------
+class LeakDetector:
+    def __init__(self, root, memory_tolerance_kb=MEMORY_TOLERANCE_KB, report=None, keep=KEEP_SNAPSHOTS):
+        self.root = root
+        self.memory_tolerance_kb = memory_tolerance_kb
+        self.report = report or self._print
+        # Only the most recent ones: a long session must not grow because it is watched
+        self.snapshots = collections.deque(maxlen=keep)
+        self.flags = []
+        self._last = {}
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def watch(self, app, names):
+        """Wrap ``app.<name>`` so a snapshot is checked after every call."""
+        owner = type(app).__name__
+        for name in names:
+            method = getattr(app, name)
+            setattr(app, name, self._wrap(method, f"{owner}.{name}"))
+
+    def _wrap(self, method, label):
+        @functools.wraps(method)
+        def transition(*args, **kwargs):
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.check(label)
+        return transition
+
+    def snapshot(self, label):
+        widgets = collections.Counter()
+        timers = 0
+        jobs = collections.Counter()
+        try:
+            stack = list(self.root.winfo_children())
+            while stack:
+                widget = stack.pop()
+                widgets[widget.winfo_class()] += 1
+                stack.extend(widget.winfo_children())
+            timers = len(self.root.tk.splitlist(self.root.tk.call("after", "info")))
+            for job in get_scheduler(self.root).jobs():
+                jobs[getattr(job.callback, "__qualname__", repr(job.callback))] += 1
+        except tk.TclError:
+            pass  # root destroyed during the transition
+        current, _ = tracemalloc.get_traced_memory()
+        return Snapshot(label, widgets, timers, jobs, _live_roots(), current / 1024)
+
+    def check(self, label):
+        snap = self.snapshot(label)
+        self.snapshots.append(snap)
+        previous = self._last.get(label)
+        self._last[label] = snap
+        if previous is None:
+            return []
+        growth = snap.growth(previous, self.memory_tolerance_kb)
+        if growth:
+            self.flags.append((label, growth))
+            self.report(label, growth)
+        return growth
+
+    def _print(self, label, growth):
+        print(f"[leakcheck] {label} grew since its last visit: " + "; ".join(growth), file=sys.stderr)
+
+
+def _live_roots():
+    count = 0
+    for obj in gc.get_objects():
+        if isinstance(obj, tk.Tk):
+            try:
+                exists = int(obj.tk.call("winfo", "exists", "."))
+            except tk.TclError:
+                continue
+            count += exists
+    return count
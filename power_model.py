@@ -0,0 +1,339 @@
+"""Seeded battery and Wi-Fi model, and the service that shows it.
+
+``PowerModel`` knows nothing about Tk.  Given a seed it is fully
+deterministic: the same seed and the same inputs (screen state, open apps,
+charger) always give the same battery and signal history.
+
+* battery drain depends on the screen (``off``/``lock``/``on``), the number
+  of open apps and a weak Wi-Fi signal, with seeded jitter per step.
+  Charging is linear up to ``CC_LIMIT`` and then tapers off exponentially
+  towards 100%, like a real constant-current/constant-voltage charger.
+* the Wi-Fi signal (dBm) is a smooth seeded function of time plus noise.
+  The bars follow the smooth level, like a phone averaging its readings,
+  so they do not flicker with every noisy reading.
+* noise comes from a counter-based hash of (seed, step), not from a random
+  generator's state, so stepping one second at a time and ``simulate()``
+  over a whole day give the same history (up to float rounding).  Long
+  stretches are computed with NumPy in one vectorized pass (24 h of 1 s
+  steps in about 10 ms); short ones, like a status bar tick, in plain
+  Python, so NumPy is only imported for fast-forwards.
+* ``subscribe(callback)`` calls back when a displayed value changes (whole
+  battery percent, charging, signal bars), never on every step
+
+``PowerService`` (``get_power_service(root)``) advances one model per Tk
+root on the frame scheduler and pushes text to subscribed labels only when
+their value changes.  With no labels left it stops ticking; the time it
+missed is fast-forwarded the next time a label subscribes.
+
+    get_power_service(root).subscribe(label, battery_text)
+"""
+import math
+import time
+
+from lazy import lazy_import
+from scheduler import get_scheduler, PRIORITY_LOW
+
+np = lazy_import("numpy")
+
+STEP_S = 1.0
+VECTOR_MIN_STEPS = 256     # below this plain Python is faster than NumPy
+TICK_MS = 3000
+
+# Battery, % per hour
+DRAIN = {"off": 0.8, "lock": 3.0, "on": 8.0}
+APP_DRAIN = 2.5
+WEAK_SIGNAL_DRAIN = 1.5     # the radio works harder below WEAK_DBM
+JITTER = 0.25
+CC_RATE = 60.0
+CC_LIMIT = 80.0
+CV_TAU_S = 1800.0
+
+# Wi-Fi, dBm
+WIFI_MEAN = -60.0
+WIFI_WAVES = ((9.0, 3600.0), (5.0, 600.0))   # (amplitude, period s)
+WIFI_NOISE = 3.0
+WEAK_DBM = -75.0
+BARS_DBM = (-55.0, -65.0, -75.0, -85.0)      # 4, 3, 2, 1 bars; below: no signal
+
+_M64 = (1 << 64) - 1
+
+
+def _mix64(z):
+    """splitmix64 finalizer: well-spread 64-bit hash of an integer."""
+    z = (z + 0x9E3779B97F4A7C15) & _M64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _M64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _M64
+    return z ^ (z >> 31)
+
+
+def _noise(key, k):
+    """Uniform noise in [-1, 1) for step ``k`` of the stream ``key``."""
+    return (_mix64((key + k) & _M64) >> 11) * (2.0 / (1 << 53)) - 1.0
+
+
+def _noise_array(key, start, n):
+    z = np.arange(start, start + n, dtype=np.uint64) + np.uint64(key)
+    z += np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)).astype(np.float64) * (2.0 / (1 << 53)) - 1.0
+
+
+def signal_bars(dbm):
+    for bars, threshold in zip((4, 3, 2, 1), BARS_DBM):
+        if dbm >= threshold:
+            return bars
+    return 0
+
+
+# ---------- MODEL ----------
+class PowerModel:
+    def __init__(self, seed=0, battery=75.0, charging=False, screen="on", apps=0, step_s=STEP_S):
+        self.seed = seed
+        self.step_s = step_s
+        self.battery = float(battery)
+        self.charging = charging
+        self.screen = screen
+        self.apps = apps
+        self.step = 0           # steps simulated so far; model time is step * step_s
+        self._remainder = 0.0
+        self._drain_key = _mix64(seed * 2)
+        self._wifi_key = _mix64(seed * 2 + 1)
+        # Wave phases are part of the seeded device
+        self._phases = [(_mix64(self._wifi_key + i) >> 11) * (2 * math.pi / (1 << 53))
+                        for i in range(len(WIFI_WAVES))]
+        self.signal = self._signal_at(0)
+        self._listeners = []
+        self._shown = self.snapshot()
+
+    # ---------- STATE ----------
+    @property
+    def percent(self):
+        return int(round(self.battery))
+
+    @property
+    def level(self):
+        """Signal without the per-step noise, in dBm."""
+        return self._level_at(self.step)
+
+    @property
+    def bars(self):
+        return signal_bars(self.level)
+
+    @property
+    def connected(self):
+        return self.bars > 0
+
+    @property
+    def seconds(self):
+        return self.step * self.step_s
+
+    def snapshot(self):
+        """The values a status bar shows; listeners fire when this changes."""
+        return (self.percent, self.charging, self.bars)
+
+    def subscribe(self, callback):
+        """Call ``callback(model)`` whenever ``snapshot()`` changes."""
+        self._listeners.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def set_screen(self, screen):
+        if screen not in DRAIN:
+            raise ValueError(f"unknown screen state {screen!r}")
+        self.screen = screen
+
+    def set_apps(self, apps):
+        self.apps = max(0, apps)
+
+    def set_charging(self, charging):
+        self.charging = bool(charging)
+        self._changed()
+
+    # ---------- STEPPING ----------
+    def advance(self, seconds):
+        """Move the model ``seconds`` forward (fractions carry over to the next call)."""
+        total = seconds + self._remainder
+        n = int(total // self.step_s)
+        self._remainder = total - n * self.step_s
+        if n >= VECTOR_MIN_STEPS and np:
+            battery, signal = self._run_vector(n)
+            self.battery, self.signal = float(battery[-1]), float(signal[-1])
+        elif n:
+            self._run_scalar(n)
+        self.step += n
+        self._changed()
+        return n
+
+    def simulate(self, seconds):
+        """Advance by ``seconds`` and return the history (NumPy arrays, one entry per step).
+
+        Returns ``(seconds, battery, signal)``; requires NumPy.
+        """
+        n = int(seconds // self.step_s)
+        start = self.step
+        battery, signal = self._run_vector(n)
+        if n:
+            self.battery, self.signal = float(battery[-1]), float(signal[-1])
+        self.step += n
+        self._changed()
+        return (np.arange(start + 1, start + n + 1) * self.step_s, battery, signal)
+
+    def _drain_per_step(self):
+        return (DRAIN[self.screen] + APP_DRAIN * self.apps) * self.step_s / 3600
+
+    def _level_at(self, step):
+        t = step * self.step_s
+        dbm = WIFI_MEAN
+        for (amplitude, period), phase in zip(WIFI_WAVES, self._phases):
+            dbm += amplitude * math.sin(2 * math.pi * t / period + phase)
+        return dbm
+
+    def _signal_at(self, step):
+        return self._level_at(step) + WIFI_NOISE * _noise(self._wifi_key, step)
+
+    def _run_scalar(self, n):
+        drain = self._drain_per_step()
+        weak = WEAK_SIGNAL_DRAIN * self.step_s / 3600
+        decay = math.exp(-self.step_s / CV_TAU_S)
+        battery = self.battery
+        for k in range(self.step + 1, self.step + n + 1):
+            signal = self._signal_at(k)
+            if self.charging:
+                if battery < CC_LIMIT:
+                    battery = min(100.0, battery + CC_RATE * self.step_s / 3600)
+                else:
+                    battery = 100.0 - (100.0 - battery) * decay
+            else:
+                step_drain = drain + (weak if signal < WEAK_DBM else 0.0)
+                battery = max(0.0, battery - step_drain * (1 + JITTER * _noise(self._drain_key, k)))
+        self.battery, self.signal = battery, signal
+
+    def _run_vector(self, n):
+        k = np.arange(self.step + 1, self.step + n + 1)
+        t = k * self.step_s
+        signal = np.full(n, WIFI_MEAN)
+        for (amplitude, period), phase in zip(WIFI_WAVES, self._phases):
+            signal += amplitude * np.sin(2 * np.pi * t / period + phase)
+        signal += WIFI_NOISE * _noise_array(self._wifi_key, self.step + 1, n)
+        if not self.charging:
+            drain = self._drain_per_step() + np.where(signal < WEAK_DBM, WEAK_SIGNAL_DRAIN * self.step_s / 3600, 0.0)
+            drain *= -(1 + JITTER * _noise_array(self._drain_key, self.step + 1, n))
+            # cumsum adds left to right, like the scalar loop.  Drain only goes
+            # down, so clipping the running total equals clipping every step.
+            battery = np.maximum(0.0, np.cumsum(np.concatenate(([self.battery], drain)))[1:])
+            return battery, signal
+        battery = np.empty(n)
+        # Constant current: linear until the first step at or above CC_LIMIT
+        cc_steps = 0
+        if self.battery < CC_LIMIT:
+            rate = CC_RATE * self.step_s / 3600
+            guess = min(n, math.ceil((CC_LIMIT - self.battery) / rate) + 1)
+            linear = np.cumsum(np.concatenate(([self.battery], np.full(guess, rate))))[1:]
+            # Where the running sum crosses, exactly as the step-by-step loop sees it
+            crossed = np.flatnonzero(linear >= CC_LIMIT)
+            cc_steps = int(crossed[0]) + 1 if len(crossed) else guess
+            battery[:cc_steps] = np.minimum(100.0, linear[:cc_steps])
+        # Constant voltage: exponential approach to 100%
+        start = battery[cc_steps - 1] if cc_steps else self.battery
+        decay = math.exp(-self.step_s / CV_TAU_S)
+        battery[cc_steps:] = 100.0 - (100.0 - start) * decay ** np.arange(1, n - cc_steps + 1)
+        return battery, signal
+
+    def _changed(self):
+        shown = self.snapshot()
+        if shown == self._shown:
+            return
+        self._shown = shown
+        for callback in list(self._listeners):
+            callback(self)
+
+
+# ---------- STATUS BAR ----------
+def battery_text(model):
+    return f"{'⚡' if model.charging else '🔋'} {model.percent}%"
+
+
+def wifi_text(model):
+    if not model.connected:
+        return "📶 No signal"
+    return "📶 " + "▂▄▆█"[:model.bars]
+
+
+class PowerService:
+    def __init__(self, scheduler, model):
+        self.scheduler = scheduler
+        self.model = model
+        self._subs = {}
+        self._inputs = []
+        self._job = None
+        self._last = None
+        model.subscribe(self._model_changed)
+
+    def add_input(self, callback):
+        """Call ``callback(model)`` before every step, to feed it app/screen state."""
+        self._inputs.append(callback)
+
+    def subscribe(self, label, fmt=battery_text):
+        """Keep ``label``'s text at ``fmt(model)``; updated only when the model changes."""
+        key = str(label)
+        if key not in self._subs:
+            label.bind("<Destroy>", lambda e, k=key: self._destroyed(e, k), add="+")
+        self._subs[key] = [label, fmt, None]
+        self._start()
+        self._push(self._subs[key])
+
+    def unsubscribe(self, label):
+        self._subs.pop(str(label), None)
+        if not self._subs:
+            self._stop()
+
+    def subscribers(self):
+        return len(self._subs)
+
+    def _destroyed(self, event, key):
+        if str(event.widget) == key:
+            self.unsubscribe(event.widget)
+
+    def _push(self, sub):
+        text = sub[1](self.model)
+        if text != sub[2]:
+            sub[0].config(text=text)
+            sub[2] = text
+
+    def _model_changed(self, model):
+        for sub in list(self._subs.values()):
+            self._push(sub)
+
+    def _start(self):
+        if self._job is not None and self._job.active:
+            return
+        # Catch up on the time nobody was watching
+        self.tick()
+        self._job = self.scheduler.every(TICK_MS, self.tick, priority=PRIORITY_LOW)
+
+    def _stop(self):
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+
+    def tick(self):
+        now = time.monotonic()
+        for callback in self._inputs:
+            callback(self.model)
+        if self._last is not None:
+            self.model.advance(now - self._last)
+        self._last = now
+
+
+def get_power_service(root, **model_options):
+    """Return the power service of ``root``; ``model_options`` only apply when it is created."""
+    service = getattr(root, "_power_service", None)
+    if service is None:
+        service = PowerService(get_scheduler(root), PowerModel(**model_options))
+        root._power_service = service
+    return service
@@ -0,0 +1,207 @@
+"""Indexed Recycle Bin store.
+
+The bin used to be a plain list: deleting or looking up an entry scanned it,
+and the window inserted every entry into a Listbox.  ``RecycleBin`` keeps
+
+* entries in a dict keyed by a stable id, in deletion order, so ``add``,
+  ``delete`` (purge) and ``restore`` are O(1)
+* a name index (casefolded names and ids, sorted) that is kept up to date
+  as entries are added: a few new entries are inserted in place, a bulk
+  ``add_many`` is merged with one sort.  Deleted ids stay in the index
+  until they are half of it, then it is compacted in one pass, so a name
+  view never waits for a sort and a delete is O(1) amortized.
+* a search text over the name index for substring search, built when
+  entries are added.  A narrow query is found with ``str.find`` in it;
+  once it has matched a good part of the bin, one pass over the index is
+  cheaper than a find per hit.
+  Entries added since the text was built are scanned separately, so it is
+  rebuilt only once enough of them have accumulated.
+
+Views are lists of ids, suitable for a virtualized list that only renders
+the visible rows.  They may be shared with the store's index, so treat them
+as read-only, and the name view may still hold ids deleted since: skip ids
+that are no longer ``in`` the bin when rendering.
+"""
+import bisect
+import itertools
+import time
+
+SORT_TIME = "time"
+SORT_NAME = "name"
+# Rebuild the substring search text once this many entries were added since
+REBUILD_RECENT = 4096
+# Up to this many new entries are inserted into the name index one by one;
+# more are merged with a single sort
+INSERT_MAX = 256
+# Scan the whole index instead of walking str.find hits beyond this share of it
+SCAN_SHARE = 0.01
+
+
+class TrashItem:
+    __slots__ = ("id", "name", "deleted_at", "origin")
+
+    def __init__(self, item_id, name, deleted_at, origin):
+        self.id = item_id
+        self.name = name
+        self.deleted_at = deleted_at
+        self.origin = origin
+
+    def __repr__(self):
+        return f"TrashItem({self.id}, {self.name!r})"
+
+
+class RecycleBin:
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._items = {}
+        self._ids = itertools.count(1)
+        self._keys = []         # casefolded names, sorted
+        self._order = []        # ids in the order of _keys; may hold deleted ids
+        self._dead = 0          # deleted ids still in _order
+        self._haystack = None   # (text, row offsets, ids) for substring search
+        self._recent = []       # (key, id) added since the haystack was built
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item_id):
+        return item_id in self._items
+
+    def __iter__(self):
+        return iter(self._items.values())
+
+    def get(self, item_id):
+        return self._items[item_id]
+
+    # ---------- MUTATION ----------
+    def add(self, name, origin=None):
+        item = TrashItem(next(self._ids), name, self.clock(), origin)
+        self._items[item.id] = item
+        self._index([(name.casefold(), item.id)])
+        return item.id
+
+    def add_many(self, names, origin=None):
+        now = self.clock()
+        items, new_id = self._items, self._ids
+        entries = []
+        for name in names:
+            item = TrashItem(next(new_id), name, now, origin)
+            items[item.id] = item
+            entries.append((name.casefold(), item.id))
+        self._index(entries)
+        return [item_id for _, item_id in entries]
+
+    def delete(self, item_id):
+        """Permanently remove an entry; returns it."""
+        item = self._items.pop(item_id)
+        self._dead += 1
+        if self._dead * 2 > len(self._order):
+            self._compact()
+        return item
+
+    def restore(self, item_id):
+        """Take an entry out of the bin so the caller can put it back; returns it."""
+        return self.delete(item_id)
+
+    def clear(self):
+        self._items.clear()
+        self._keys = []
+        self._order = []
+        self._dead = 0
+        self._haystack = None
+        self._recent = []
+
+    # ---------- VIEWS ----------
+    def view(self, sort=SORT_TIME, reverse=False):
+        """Ids of all entries, by deletion time or by name."""
+        if sort == SORT_TIME:
+            ids = list(self._items)
+        elif sort == SORT_NAME:
+            ids = self._order
+        else:
+            raise ValueError(f"unknown sort order: {sort!r}")
+        return ids[::-1] if reverse else ids
+
+    def search(self, query, substring=False, sort=SORT_NAME, reverse=False):
+        """Ids of entries whose name starts with (or contains) ``query``, case-insensitively."""
+        key = query.casefold()
+        if not key:
+            return self.view(sort, reverse)
+        if substring:
+            ids = self._find_all(key)
+        else:
+            lo = bisect.bisect_left(self._keys, key)
+            hi = bisect.bisect_left(self._keys, key + "\U0010ffff", lo)
+            ids = self._alive(self._order[lo:hi])
+        if sort == SORT_TIME:
+            ids.sort()  # ids are issued in deletion order
+        elif sort != SORT_NAME:
+            raise ValueError(f"unknown sort order: {sort!r}")
+        if reverse:
+            ids.reverse()
+        return ids
+
+    # ---------- INDEX ----------
+    def _index(self, entries):
+        keys, order = self._keys, self._order
+        if len(entries) <= INSERT_MAX:
+            for key, item_id in entries:
+                # New ids are the largest, so they go after equal names
+                pos = bisect.bisect_right(keys, key)
+                keys.insert(pos, key)
+                order.insert(pos, item_id)
+        else:
+            keys = keys + [key for key, _ in entries]
+            order = order + [item_id for _, item_id in entries]
+            # Stable sort on the names alone keeps equal names in id order
+            ranks = sorted(range(len(keys)), key=keys.__getitem__)
+            self._keys = list(map(keys.__getitem__, ranks))
+            self._order = list(map(order.__getitem__, ranks))
+        self._recent.extend(entries)
+        if self._haystack is None or len(self._recent) > REBUILD_RECENT:
+            self._build_haystack()
+
+    def _compact(self):
+        alive = list(map(self._items.__contains__, self._order))
+        self._keys = list(itertools.compress(self._keys, alive))
+        self._order = list(itertools.compress(self._order, alive))
+        self._dead = 0
+        self._build_haystack()
+
+    def _alive(self, ids):
+        return list(filter(self._items.__contains__, ids)) if self._dead else list(ids)
+
+    def _build_haystack(self):
+        keys = self._keys
+        text = "\n".join(keys)
+        if text.count("\n") != max(0, len(keys) - 1):
+            # Rows are "\n"-separated, so a match can never span two names
+            keys = [key.replace("\n", " ") for key in keys]
+            text = "\n".join(keys)
+        offsets = list(itertools.accumulate(map((1).__add__, map(len, keys)), initial=0))
+        self._haystack = (text, offsets, list(self._order))
+        self._recent = []
+
+    def _find_all(self, key):
+        if self._haystack is None:
+            return []
+        text, offsets, ids = self._haystack
+        items = self._items
+        found = []
+        broad = SCAN_SHARE * len(ids)
+        pos = text.find(key)
+        while pos != -1:
+            if len(found) > broad:
+                # Broad query: one pass over the whole index beats a find per hit
+                order = self._order
+                return self._alive([order[row] for row, name in enumerate(self._keys) if key in name])
+            row = bisect.bisect_right(offsets, pos) - 1
+            if ids[row] in items:
+                found.append(ids[row])
+            # Skip to the next row so each entry is reported once
+            pos = text.find(key, offsets[row + 1])
+        recent = [entry for entry in self._recent if key in entry[0] and entry[1] in items]
+        if recent:
+            found = [entry[1] for entry in sorted(
+                [(items[item_id].name.casefold(), item_id) for item_id in found] + recent)]
+        return found
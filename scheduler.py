@@ -0,0 +1,293 @@
+"""Shared frame scheduler for the OS simulators.
+
+Every simulator used to keep its own ``root.after`` chains (clocks, battery,
+animations) and ``time.sleep`` boot threads, and none of them were ever
+cancelled.  ``FrameScheduler`` replaces all of them with a single timer per Tk
+root:
+
+* ``after(delay_ms, cb)`` - one-shot job
+* ``every(interval_ms, cb)`` - fixed-rate job, keeps its phase instead of
+  drifting; returning ``False`` from ``cb`` stops it
+* ``owner=widget`` - the job is cancelled automatically when the widget is
+  destroyed, so tearing a screen down also tears down its timers
+* ``priority`` - lower values run first when several jobs are due together
+* a per-tick budget (job count and milliseconds); whatever does not fit is
+  carried over to the next tick instead of blocking the event loop
+
+The scheduler only arms a Tk timer for the next due job, so an idle desktop
+wakes up exactly as often as its timers require, no matter how many screens
+have been visited before.
+"""
+import heapq
+import itertools
+import sys
+import time
+
+FRAME_MS = 16
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+
+def _now_ms():
+    return time.perf_counter() * 1000.0
+
+
+# ---------- JOB ----------
+class Job:
+    __slots__ = ("scheduler", "callback", "interval", "due", "priority",
+                 "seq", "owner", "cancelled", "runs")
+
+    def __init__(self, scheduler, callback, due, interval, priority, seq, owner):
+        self.scheduler = scheduler
+        self.callback = callback
+        self.due = due
+        self.interval = interval
+        self.priority = priority
+        self.seq = seq
+        self.owner = owner
+        self.cancelled = False
+        self.runs = 0
+
+    @property
+    def active(self):
+        return not self.cancelled
+
+    @property
+    def repeating(self):
+        return self.interval is not None
+
+    def cancel(self):
+        self.scheduler.cancel(self)
+
+    def __repr__(self):
+        name = getattr(self.callback, "__qualname__", repr(self.callback))
+        kind = f"every {self.interval}ms" if self.repeating else "once"
+        state = "cancelled" if self.cancelled else "active"
+        return f"<Job {name} {kind} prio={self.priority} {state}>"
+
+
+# ---------- SCHEDULER ----------
+class FrameScheduler:
+    def __init__(self, root, max_jobs_per_tick=32, budget_ms=8.0):
+        self.root = root
+        self.max_jobs_per_tick = max_jobs_per_tick
+        self.budget_ms = budget_ms
+        self._heap = []
+        self._seq = itertools.count()
+        self._live = 0
+        self._owners = {}
+        self._after_id = None
+        self._wake_at = None
+        self._paused = False
+        # Counters for benchmarks / diagnostics
+        self.ticks = 0
+        self.jobs_run = 0
+        self.carried_over = 0
+
+    # ---------- PUBLIC API ----------
+    def after(self, delay_ms, callback, priority=PRIORITY_NORMAL, owner=None):
+        """Run ``callback()`` once, ``delay_ms`` from now."""
+        return self._add(callback, delay_ms, None, priority, owner)
+
+    def every(self, interval_ms, callback, priority=PRIORITY_NORMAL, owner=None, delay_ms=None):
+        """Run ``callback()`` every ``interval_ms`` until it returns False or is cancelled.
+
+        The first run happens after ``delay_ms`` (default: one interval).
+        """
+        if interval_ms <= 0:
+            raise ValueError("interval_ms must be positive")
+        first = interval_ms if delay_ms is None else delay_ms
+        return self._add(callback, first, interval_ms, priority, owner)
+
+    def cancel(self, job):
+        if job is None or job.cancelled:
+            return
+        job.cancelled = True
+        self._live -= 1
+        self._forget_owner(job)
+        # Cancelled entries are dropped lazily; compact once they dominate
+        if len(self._heap) > 64 and self._live < len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if not entry[3].cancelled]
+            heapq.heapify(self._heap)
+        self._arm()
+
+    def cancel_owner(self, owner):
+        """Cancel every job registered with ``owner``."""
+        for job in list(self._owners.get(str(owner), ())):
+            self.cancel(job)
+
+    def cancel_all(self):
+        for _, _, _, job in self._heap:
+            if not job.cancelled:
+                job.cancelled = True
+        self._heap.clear()
+        self._owners.clear()
+        self._live = 0
+        self._arm()
+
+    def pause(self):
+        """Stop firing jobs (they keep their due times) until ``resume()``."""
+        self._paused = True
+        self._disarm()
+
+    def resume(self):
+        if not self._paused:
+            return
+        self._paused = False
+        self._arm()
+
+    @property
+    def paused(self):
+        return self._paused
+
+    def pending(self):
+        return self._live
+
+    def jobs(self):
+        return [entry[3] for entry in self._heap if not entry[3].cancelled]
+
+    # ---------- INTERNALS ----------
+    def _add(self, callback, delay_ms, interval, priority, owner):
+        job = Job(self, callback, _now_ms() + max(0, delay_ms), interval,
+                  priority, next(self._seq), owner)
+        self._live += 1
+        if owner is not None:
+            self._watch_owner(job, owner)
+        self._push(job)
+        self._arm()
+        return job
+
+    def _push(self, job):
+        heapq.heappush(self._heap, (job.due, job.priority, job.seq, job))
+
+    def _watch_owner(self, job, owner):
+        key = str(owner)
+        jobs = self._owners.get(key)
+        if jobs is None:
+            jobs = self._owners[key] = set()
+            owner.bind("<Destroy>", lambda e, k=key: self._owner_destroyed(e, k), add="+")
+        jobs.add(job)
+
+    def _forget_owner(self, job):
+        if job.owner is None:
+            return
+        jobs = self._owners.get(str(job.owner))
+        if jobs is not None:
+            jobs.discard(job)
+
+    def _owner_destroyed(self, event, key):
+        # <Destroy> is delivered for every child too; only react to the owner itself
+        if str(event.widget) != key:
+            return
+        for job in list(self._owners.pop(key, ())):
+            job.owner = None
+            self.cancel(job)
+
+    def _disarm(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._after_id = None
+        self._wake_at = None
+
+    def _arm(self):
+        while self._heap and self._heap[0][3].cancelled:
+            heapq.heappop(self._heap)
+        if self._paused or not self._heap:
+            self._disarm()
+            return
+        due = self._heap[0][0]
+        if self._wake_at is not None and self._wake_at <= due:
+            return
+        self._disarm()
+        delay = max(1, int(due - _now_ms() + 0.5))
+        try:
+            self._after_id = self.root.after(delay, self._tick)
+        except Exception:
+            # Tk root already destroyed
+            self._after_id = None
+            return
+        self._wake_at = due
+
+    def _tick(self):
+        self._after_id = None
+        self._wake_at = None
+        self.ticks += 1
+        start = _now_ms()
+
+        due = []
+        while self._heap and self._heap[0][0] <= start:
+            job = heapq.heappop(self._heap)[3]
+            if not job.cancelled:
+                due.append(job)
+        due.sort(key=lambda j: (j.priority, j.due, j.seq))
+
+        ran = 0
+        for index, job in enumerate(due):
+            if ran >= self.max_jobs_per_tick or (ran and _now_ms() - start >= self.budget_ms) or self._paused:
+                # Out of budget: keep the original due time so these go first next tick
+                for rest in due[index:]:
+                    if not rest.cancelled:
+                        self._push(rest)
+                        self.carried_over += 1
+                break
+            if job.cancelled:
+                continue
+            ran += 1
+            self._run(job, start)
+
+        self.jobs_run += ran
+        self._arm()
+
+    def _run(self, job, now):
+        job.runs += 1
+        try:
+            result = job.callback()
+        except Exception:
+            result = None
+            self.root._root().report_callback_exception(*sys.exc_info())
+        if job.cancelled:
+            return
+        if job.interval is None or result is False:
+            job.cancelled = True
+            self._live -= 1
+            self._forget_owner(job)
+            return
+        # Fixed rate: stay on the original phase, skipping missed slots
+        job.due += job.interval
+        if job.due <= now:
+            missed = int((now - job.due) // job.interval) + 1
+            job.due += missed * job.interval
+        self._push(job)
+
+
+# ---------- SHARED INSTANCE ----------
+def get_scheduler(widget):
+    """Return the scheduler ``widget`` runs on.
+
+    That is the nearest one attached to the widget or one of its masters with
+    ``attach_scheduler``, otherwise the one shared by its whole Tk root.
+    """
+    while True:
+        # __dict__, not getattr: Tk forwards unknown attributes to the interpreter
+        scheduler = widget.__dict__.get("_frame_scheduler")
+        if scheduler is not None:
+            return scheduler
+        if widget.master is None:
+            break
+        widget = widget.master
+    scheduler = widget._frame_scheduler = FrameScheduler(widget)
+    return scheduler
+
+
+def attach_scheduler(widget):
+    """Give ``widget`` and everything below it a scheduler of their own.
+
+    Used by the multi-OS host so each session's timers can be paused on their own.
+    """
+    scheduler = widget._frame_scheduler = FrameScheduler(widget)
+    return scheduler
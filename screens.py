@@ -0,0 +1,128 @@
+"""Retained screen cache.
+
+Navigation used to destroy the whole widget tree and rebuild it from scratch
+(or leave the old tree alive next to the new one).  ``ScreenManager`` builds
+each screen once into its own full-window Frame, switches by placing/raising
+the target and un-placing the previous one, and only calls the screen's
+``refresh`` callback to update its dynamic fields.
+
+Retained screens are capped by count and, optionally, by total widget count.
+Least-recently-shown screens that are not pinned and not on display are
+destroyed (their scheduler jobs go with them) and rebuilt on the next visit.
+"""
+import collections
+import time
+import tkinter as tk
+
+
+class Screen:
+    __slots__ = ("name", "build", "refresh", "pinned", "frame", "widgets")
+
+    def __init__(self, name, build, refresh, pinned):
+        self.name = name
+        self.build = build
+        self.refresh = refresh
+        self.pinned = pinned
+        self.frame = None
+        self.widgets = 0
+
+
+class ScreenManager:
+    def __init__(self, root, max_screens=6, max_widgets=None):
+        self.root = root
+        self.max_screens = max_screens
+        self.max_widgets = max_widgets
+        self._screens = {}
+        self._lru = collections.OrderedDict()
+        self.current = None
+        # Stats
+        self.builds = 0
+        self.hits = 0
+        self.evictions = 0
+        self.last_switch_ms = 0.0
+
+    def register(self, name, build, refresh=None, pinned=False):
+        """``build(frame)`` fills a fresh Frame; ``refresh(frame)`` runs on every show."""
+        self._screens[name] = Screen(name, build, refresh, pinned)
+
+    def get(self, name):
+        """Return the screen's frame if it is built, else None."""
+        screen = self._screens.get(name)
+        return screen.frame if screen is not None else None
+
+    def built(self, name):
+        frame = self.get(name)
+        return frame is not None and frame.winfo_exists()
+
+    def show(self, name):
+        start = time.perf_counter()
+        screen = self._screens[name]
+        if screen.frame is None or not screen.frame.winfo_exists():
+            screen.frame = tk.Frame(self.root)
+            screen.build(screen.frame)
+            screen.widgets = _count_widgets(screen.frame)
+            self.builds += 1
+        else:
+            self.hits += 1
+        if self.current is not None and self.current != name:
+            self._hide(self.current)
+        self.current = name
+        screen.frame.place(x=0, y=0, relx=0, rely=0, relwidth=1, relheight=1)
+        screen.frame.tkraise()
+        self._lru[name] = None
+        self._lru.move_to_end(name)
+        if screen.refresh is not None:
+            screen.refresh(screen.frame)
+        self._enforce_cap()
+        self.last_switch_ms = (time.perf_counter() - start) * 1000
+        return screen.frame
+
+    def hide(self):
+        """Take the current screen off the display (it stays built)."""
+        if self.current is not None:
+            self._hide(self.current)
+            self.current = None
+
+    def evict(self, name):
+        screen = self._screens.get(name)
+        if screen is None or screen.frame is None:
+            return
+        if self.current == name:
+            self.current = None
+        if screen.frame.winfo_exists():
+            screen.frame.destroy()
+        screen.frame = None
+        screen.widgets = 0
+        self._lru.pop(name, None)
+        self.evictions += 1
+
+    def evict_all(self):
+        for name in list(self._lru):
+            self.evict(name)
+
+    def _hide(self, name):
+        frame = self._screens[name].frame
+        if frame is not None and frame.winfo_exists():
+            frame.place_forget()
+
+    def _retained_widgets(self):
+        return sum(self._screens[name].widgets for name in self._lru)
+
+    def _enforce_cap(self):
+        for name in list(self._lru):
+            over_count = len(self._lru) > self.max_screens
+            over_widgets = self.max_widgets is not None and self._retained_widgets() > self.max_widgets
+            if not (over_count or over_widgets):
+                break
+            if name == self.current or self._screens[name].pinned:
+                continue
+            self.evict(name)
+
+
+def _count_widgets(widget):
+    count, stack = 0, [widget]
+    while stack:
+        children = stack.pop().winfo_children()
+        count += len(children)
+        stack.extend(children)
+    return count
@@ -0,0 +1,236 @@
+"""Persistent settings with a write-behind journal.
+
+Each simulator keeps its settings (colours, theme, icon layout, setup state)
+in a ``SettingsStore`` backed by an append-only JSON-lines journal:
+
+* the journal is read in one go at startup and replayed into a dict, so
+  ``get`` never touches the disk
+* ``set`` only updates memory and queues the key; a background writer thread
+  wakes up, waits ``flush_ms`` to batch a burst of changes (e.g. an icon
+  drag), coalesces them per key and appends them with a single write
+* when the journal holds many more records than there are keys it is
+  compacted: a snapshot is written to a temp file and atomically swapped in
+* pending changes are flushed on ``close()`` and at interpreter exit
+
+A torn last line (crash mid-write) is cut off on load, so the next append
+starts on a line of its own.  Journals live in
+``$OS_SETTINGS_DIR`` (default ``~/.all-os``).
+
+    settings = get_settings("handy")
+    settings.set("user_data", {"color": "#0080ff"})
+"""
+import atexit
+import json
+import os
+import threading
+import time
+
+ENV_VAR = "OS_SETTINGS_DIR"
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".all-os")
+FLUSH_MS = 250
+# Compact once the journal has this many records and at least twice as many as keys
+COMPACT_MIN_RECORDS = 256
+
+_DELETED = object()
+_stores = {}
+
+
+def settings_dir():
+    return os.environ.get(ENV_VAR) or DEFAULT_DIR
+
+
+def get_settings(name):
+    """Return the store for ``name`` (one journal file per simulator)."""
+    path = os.path.join(settings_dir(), f"{name}.journal")
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = SettingsStore(path)
+    return store
+
+
+class SettingsStore:
+    def __init__(self, path, flush_ms=FLUSH_MS, compact_min_records=COMPACT_MIN_RECORDS):
+        self.path = path
+        self.flush_ms = flush_ms
+        self.compact_min_records = compact_min_records
+        self._data = {}
+        self._lines = {}        # key -> encoded journal line, for compaction
+        self._pending = {}      # key -> encoded line not yet on disk
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._writing = False
+        self._flush_now = False
+        self._closed = False
+        self._thread = None
+        self._torn = False      # journal ends mid-line and could not be truncated
+        # Stats
+        self.records = 0
+        self.writes = 0
+        self.compactions = 0
+        self.errors = 0
+        self._load()
+        atexit.register(self.close)
+
+    # ---------- READ ----------
+    def get(self, key, default=None):
+        with self._lock:
+            return self._data.get(key, default)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._data)
+
+    # ---------- WRITE ----------
+    def set(self, key, value):
+        self._queue(key, value)
+
+    def update(self, mapping):
+        for key, value in mapping.items():
+            self._queue(key, value)
+
+    def delete(self, key):
+        self._queue(key, _DELETED)
+
+    def _queue(self, key, value):
+        # Encode on the caller's thread: the writer never sees live, mutable objects
+        line = _record(key, None if value is _DELETED else json.dumps(value, separators=(",", ":")))
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("settings store is closed")
+            if value is _DELETED:
+                self._data.pop(key, None)
+                self._lines.pop(key, None)
+            else:
+                self._data[key] = value
+                self._lines[key] = line
+            self._pending[key] = line
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, daemon=True,
+                                                name=f"settings:{os.path.basename(self.path)}")
+                self._thread.start()
+            self._wake.notify()
+
+    def flush(self, timeout=None):
+        """Block until every queued change is on disk."""
+        with self._lock:
+            self._flush_now = True
+            self._wake.notify()
+            return self._idle.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join()
+        else:
+            self._write_pending()
+
+    # ---------- JOURNAL ----------
+    def _load(self):
+        try:
+            with open(self.path, "rb") as fh:
+                blob = fh.read()
+        except FileNotFoundError:
+            return
+        if blob and not blob.endswith(b"\n"):
+            self._cut_torn_tail(blob.rfind(b"\n") + 1)
+        for raw in blob.splitlines():
+            try:
+                record = json.loads(raw)
+                key = record["k"]
+            except (ValueError, KeyError, TypeError):
+                continue  # torn or foreign line
+            if record.get("d"):
+                self._data.pop(key, None)
+                self._lines.pop(key, None)
+            else:
+                self._data[key] = record.get("v")
+                self._lines[key] = raw.decode("utf-8")
+            self.records += 1
+
+    def _cut_torn_tail(self, end):
+        # Appending after the partial bytes would merge them with the next record
+        try:
+            with open(self.path, "r+b") as fh:
+                fh.truncate(end)
+        except OSError:
+            self._torn = True
+
+    def _writer(self):
+        while True:
+            with self._lock:
+                self._wake.wait_for(lambda: self._pending or self._closed)
+                # Let a burst of changes accumulate into one write
+                deadline = time.monotonic() + self.flush_ms / 1000
+                while not (self._closed or self._flush_now):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wake.wait(remaining)
+                closing = self._closed
+            self._write_pending()
+            if closing:
+                return
+
+    def _write_pending(self):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._flush_now = False
+            self._writing = True
+        try:
+            if batch:
+                self._append(batch.values())
+            if self._should_compact():
+                self._compact()
+            return True
+        except OSError:
+            self.errors += 1
+            with self._lock:
+                # Keep the changes (newer ones win) for the next attempt
+                for key, line in batch.items():
+                    self._pending.setdefault(key, line)
+            return False
+        finally:
+            with self._lock:
+                self._writing = False
+                self._idle.notify_all()
+
+    def _append(self, lines):
+        lines = list(lines)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(("\n" if self._torn else "") + "\n".join(lines) + "\n")
+        self._torn = False
+        self.records += len(lines)
+        self.writes += 1
+
+    def _should_compact(self):
+        with self._lock:
+            keys = len(self._lines)
+        return self.records >= self.compact_min_records and self.records > 2 * keys
+
+    def _compact(self):
+        with self._lock:
+            lines = list(self._lines.values())
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write("".join(line + "\n" for line in lines))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.path)
+        self.records = len(lines)
+        self.compactions += 1
+
+
+def _record(key, encoded_value):
+    if encoded_value is None:
+        return '{"k":%s,"d":1}' % json.dumps(key)
+    return '{"k":%s,"v":%s}' % (json.dumps(key), encoded_value)
@@ -0,0 +1,61 @@
+"""Registry of the OS simulators and a loader for their scripts.
+
+Some simulator files have spaces in their names ("Tv os.py"), so they cannot
+be imported with a plain ``import``.  ``load_simulator`` imports them by path
+and returns the simulator class, which takes a Tk root like the scripts do.
+Every script also has a ``main()`` entry point:
+
+    python simulators.py tv
+
+``host.py`` runs all of them as switchable sessions of one Tk root.
+"""
+import importlib.util
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# name -> (script, class name)
+SIMULATORS = {
+    "mac": ("Mac_system_os.py", "MacMacSystemOS"),
+    "handy": ("HandyOS.py", "HandyOS"),
+    "tablet": ("tablet_os.py", "TabletOS"),
+    "windows": ("Windots xb.py", "WindowsXB"),
+    "tv": ("Tv os.py", "TV"),
+}
+
+
+def load_module(name):
+    script, _ = SIMULATORS[name]
+    module_name = f"sim_{name}"
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    if HERE not in sys.path:
+        sys.path.insert(0, HERE)
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(HERE, script))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
+
+
+def load_simulator(name):
+    """Return the simulator class registered as ``name``."""
+    return getattr(load_module(name), SIMULATORS[name][1])
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Run one of the OS simulators.")
+    parser.add_argument("name", choices=sorted(SIMULATORS))
+    args = parser.parse_args(argv)
+    load_module(args.name).main()
+
+
+if __name__ == "__main__":
+    main()
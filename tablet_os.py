@@ -1,23 +1,85 @@
 ﻿import tkinter as tk
-from tkinter import ttk
 import time
-import threading
-import random
+from functools import lru_cache
 from math import sin, cos, radians
+from scheduler import get_scheduler
+from power_model import get_power_service, battery_text, wifi_text
+from tween import animate, fade
+from gestures import GestureRecognizer
+from clock_service import get_clock_service
+from screens import ScreenManager
+from window_pool import WindowPool
+from settings_store import get_settings
+from wallpaper import Wallpaper, FILETYPES, prefetch
+from lazy import lazy_import
+import leakcheck
+import tracing
+import watchdog
+
+# Themed widgets are first needed on the home screen, after boot
+ttk = lazy_import("tkinter.ttk")
+filedialog = lazy_import("tkinter.filedialog")
+messagebox = lazy_import("tkinter.messagebox")
+
+APPS = ["Browser", "Gallery", "Settings", "Notes", "Music"]
+BOOT_DOTS = 12
+BOOT_FRAMES = 90
+BOOT_FADE = [f"#{alpha:02x}{alpha:02x}{alpha:02x}" for alpha in range(100, 0, -5)]
+SWIPE_MS = 300
+HOLD_MS = 1500
+POWER_FADE_MS = 500
+
+
+@lru_cache(maxsize=4)
+def boot_keyframes(w, h, radius=80):
+    # Dot coordinates and colour for every spinner frame, computed once per screen size
+    frames = []
+    for i in range(BOOT_FRAMES):
+        color = f"#{int(155+100*sin(i/10))%255:02x}{int(200):02x}{int(255):02x}"
+        dots = []
+        for j in range(BOOT_DOTS):
+            angle = radians(i * 4 + j * 30)
+            x = w//2 + radius * cos(angle)
+            y = h//2 + radius * sin(angle)
+            dots.append((x-10, y-10, x+10, y+10))
+        frames.append((dots, color))
+    return frames
 
 # ======================
 # Tablet OS - Powered by Python
 # ======================
 
 class TabletOS:
+    TRANSITIONS = ("create_boot_screen", "load_lock_screen", "load_home_screen",
+                   "show_control_panel", "hide_control_panel")
+
     def __init__(self, root):
         self.root = root
         self.root.title("Tablet OS")
         self.root.attributes('-fullscreen', True)
         self.root.configure(bg="black")
+        self.scheduler = get_scheduler(self.root)
+        self.settings = get_settings("tablet")
+        tracing.install(self)
+        watchdog.install(self)
+        leakcheck.install(self)
+        # Decode the saved wallpaper while the boot animation runs
+        if self.settings.get("wallpaper"):
+            prefetch(self.root, self.settings.get("wallpaper"))
         self.state = "boot"
-        self.battery_level = 75
-        self.charging = False
+        # Battery and Wi-Fi come from a seeded device model; labels subscribe to it
+        self.power = get_power_service(self.root, battery=75.0, screen="off")
+        self.power.add_input(lambda model: model.set_apps(self.windows.open_count()))
+        self.transition = None
+        # Screens are built once and switched by raising them
+        self.screens = ScreenManager(self.root)
+        self.screens.register("boot", self.build_boot_screen)
+        self.screens.register("lock", self.build_lock_screen)
+        self.screens.register("home", self.build_home_screen, pinned=True)
+        # App windows are built once and reused across launches
+        self.windows = WindowPool(self.root)
+        for app in APPS:
+            self.windows.register(app, lambda win, a=app: self.build_app(win, a), single_instance=True)
         self.create_boot_screen()
         self.control_panel_visible = False
         self.panel_frame = None
@@ -26,7 +88,19 @@ class TabletOS:
 
     # ---------------------- BOOT SCREEN ----------------------
     def create_boot_screen(self):
-        self.canvas = tk.Canvas(self.root, bg="black", highlightthickness=0)
+        self.end_transition()
+        self.boot_started = time.perf_counter()
+        self.state = "boot"
+        self.power.model.set_screen("off")
+        self.screens.show("boot")
+        self.canvas.configure(bg="black")
+        self.canvas.itemconfigure(self.boot_text, state="hidden")
+        self.canvas.itemconfigure(self.powered_text, state="hidden")
+        self.boot_frame = 0
+        self.scheduler.every(50, self.boot_animation, owner=self.canvas, delay_ms=0)
+
+    def build_boot_screen(self, frame):
+        self.canvas = tk.Canvas(frame, bg="black", highlightthickness=0)
         self.canvas.pack(fill="both", expand=True)
         self.boot_text = self.canvas.create_text(
             self.root.winfo_screenwidth()//2,
@@ -45,155 +119,167 @@ class TabletOS:
             state="hidden"
         )
 
-        threading.Thread(target=self.boot_animation).start()
+        # Spinner dots are created once and only moved/recoloured per frame
+        self.boot_keyframes = boot_keyframes(self.root.winfo_screenwidth(), self.root.winfo_screenheight())
+        self.boot_dots = [self.canvas.create_oval(0, 0, 0, 0, width=0, tags="wave")
+                          for _ in range(BOOT_DOTS)]
 
     def boot_animation(self):
-        w, h = self.root.winfo_screenwidth(), self.root.winfo_screenheight()
-        radius = 80
-        for i in range(90):
-            self.canvas.delete("wave")
-            for j in range(12):
-                angle = radians(i * 4 + j * 30)
-                x = w//2 + radius * cos(angle)
-                y = h//2 + radius * sin(angle)
-                self.canvas.create_oval(x-10, y-10, x+10, y+10,
-                                        fill=f"#{int(155+100*sin(i/10))%255:02x}{int(200):02x}{int(255):02x}",
-                                        width=0, tags="wave")
-            time.sleep(0.05)
-            self.canvas.update()
-
-        for alpha in range(100, 0, -5):
-            self.canvas.configure(bg=f"#{alpha:02x}{alpha:02x}{alpha:02x}")
-            time.sleep(0.03)
-            self.canvas.update()
-
+        dots, color = self.boot_keyframes[self.boot_frame]
+        for item, xy in zip(self.boot_dots, dots):
+            self.canvas.coords(item, *xy)
+        self.canvas.itemconfigure("wave", fill=color)
+        self.boot_frame += 1
+        if self.boot_frame == BOOT_FRAMES:
+            self.boot_frame = 0
+            self.scheduler.every(30, self.boot_fade, owner=self.canvas)
+            return False
+
+    def boot_fade(self):
+        self.canvas.configure(bg=BOOT_FADE[self.boot_frame])
+        self.boot_frame += 1
+        if self.boot_frame < len(BOOT_FADE):
+            return
         self.canvas.itemconfigure(self.boot_text, state="normal")
         self.canvas.itemconfigure(self.powered_text, state="normal")
-        time.sleep(2)
-        self.load_lock_screen()
+        self.scheduler.after(2000, self.load_lock_screen, owner=self.canvas)
+        return False
 
     # ---------------------- LOCK SCREEN ----------------------
     def load_lock_screen(self):
+        self.boot_time_ms = (time.perf_counter() - self.boot_started) * 1000
         self.state = "lock"
-        self.canvas.destroy()
-        self.lock_frame = tk.Frame(self.root, bg="#add8e6")
-        self.lock_frame.pack(fill="both", expand=True)
+        self.power.model.set_screen("lock")
+        self.screens.show("lock")
+
+    def build_lock_screen(self, frame):
+        self.lock_frame = frame
+        self.lock_frame.configure(bg="#add8e6")
 
         self.clock_label = tk.Label(self.lock_frame, text="", font=("Segoe UI", 60), bg="#add8e6")
         self.clock_label.place(relx=0.5, rely=0.4, anchor="center")
 
-        self.battery_label = tk.Label(self.lock_frame, text="🔋 75%", font=("Segoe UI", 18), bg="#add8e6")
+        self.battery_label = tk.Label(self.lock_frame, font=("Segoe UI", 18), bg="#add8e6")
         self.battery_label.place(relx=0.9, rely=0.05)
+        self.power.subscribe(self.battery_label, battery_text)
 
-        self.wifi_label = tk.Label(self.lock_frame, text="📶 Connected", font=("Segoe UI", 18), bg="#add8e6")
+        self.wifi_label = tk.Label(self.lock_frame, font=("Segoe UI", 18), bg="#add8e6")
         self.wifi_label.place(relx=0.05, rely=0.05)
+        self.power.subscribe(self.wifi_label, wifi_text)
 
-        self.lock_frame.bind("<Button-1>", self.swipe_up)
-        self.update_clock()
-        self.update_battery()
+        lock_gestures = GestureRecognizer(self.lock_frame)
+        lock_gestures.on("tap", self.swipe_up)
+        lock_gestures.on("swipe", lambda g: g.direction == "up" and self.swipe_up())
+        lock_gestures.on("fling", lambda g: g.direction == "up" and self.swipe_up())
+        get_clock_service(self.root).subscribe(self.clock_label, "%H:%M:%S")
 
-    def update_clock(self):
+    def swipe_up(self, gesture=None):
         if self.state != "lock":
             return
-        current_time = time.strftime("%H:%M:%S")
-        self.clock_label.config(text=current_time)
-        self.root.after(1000, self.update_clock)
-
-    def update_battery(self):
-        if self.state not in ["lock", "home"]:
-            return
-        change = random.choice([-1, 0, 1])
-        self.battery_level = max(0, min(100, self.battery_level + change))
-        icon = "⚡" if self.charging else "🔋"
-        if self.state == "lock":
-            self.battery_label.config(text=f"{icon} {self.battery_level}%")
-        elif self.state == "home":
-            self.home_battery_label.config(text=f"{icon} {self.battery_level}%")
-        self.root.after(3000, self.update_battery)
-
-    def swipe_up(self, event):
-        for i in range(30):
-            self.lock_frame.place_configure(rely=0 - (i / 30))
-            self.root.update()
-            time.sleep(0.01)
+        # The home screen goes up underneath, and the lock screen slides off on top of it
         self.load_home_screen()
+        self.lock_frame.place(x=0, y=0, relx=0, rely=0, relwidth=1, relheight=1)
+        self.lock_frame.tkraise()
+        self.transition = animate(self.lock_frame, SWIPE_MS,
+                                  lambda y: self.lock_frame.place_configure(rely=y),
+                                  start=0.0, end=-1.0, easing="ease_in")
+        self.transition.then(self.lock_frame.place_forget)
+
+    def end_transition(self):
+        # Jump a running slide/fade to its end state so the next screen starts clean
+        if self.transition is not None:
+            self.transition.finish()
+            self.transition = None
 
     # ---------------------- HOME SCREEN ----------------------
     def load_home_screen(self):
         self.state = "home"
-        self.lock_frame.destroy()
-        self.home = tk.Frame(self.root, bg="#b0e0e6")
-        self.home.pack(fill="both", expand=True)
+        self.power.model.set_screen("on")
+        self.screens.show("home")
+
+    def build_home_screen(self, frame):
+        self.home = frame
+        self.home.configure(bg="#b0e0e6")
+        self.wallpaper = Wallpaper(self.home, on_error=lambda msg: messagebox.showerror("Wallpaper", msg))
+        if self.settings.get("wallpaper"):
+            self.wallpaper.show(self.settings.get("wallpaper"))
 
         title = tk.Label(self.home, text="Tablet OS Home", font=("Segoe UI", 28, "bold"), bg="#b0e0e6")
         title.pack(pady=30)
 
         # Icons same as lock screen
-        self.home_battery_label = tk.Label(self.home, text=f"🔋 {self.battery_level}%", font=("Segoe UI", 16), bg="#b0e0e6")
+        self.home_battery_label = tk.Label(self.home, font=("Segoe UI", 16), bg="#b0e0e6")
         self.home_battery_label.place(relx=0.9, rely=0.05)
-        self.home_wifi_label = tk.Label(self.home, text="📶 Connected", font=("Segoe UI", 16), bg="#b0e0e6")
+        self.power.subscribe(self.home_battery_label, battery_text)
+        self.home_wifi_label = tk.Label(self.home, font=("Segoe UI", 16), bg="#b0e0e6")
         self.home_wifi_label.place(relx=0.05, rely=0.05)
+        self.power.subscribe(self.home_wifi_label, wifi_text)
 
         # App buttons
-        apps = ["Browser", "Gallery", "Settings", "Notes", "Music"]
-        for app in apps:
+        for app in APPS:
             b = ttk.Button(self.home, text=app, command=lambda a=app: self.open_app(a))
             b.pack(pady=10)
 
-        # Hold home screen to open widget/wallpaper menu
-        self.home.bind("<ButtonPress-1>", self.start_hold)
-        self.home.bind("<ButtonRelease-1>", self.end_hold)
-        self.hold_start = None
+        # Hold the home screen for the widget/wallpaper menu, swipe down/up for the control panel
+        self.gestures = GestureRecognizer(self.home, long_press_ms=HOLD_MS)
+        self.gestures.on("long_press", self.open_widget_menu)
+        self.gestures.on("swipe", self.on_home_swipe)
+        self.gestures.on("fling", self.on_home_swipe)
 
-        # Swipe down for control panel
-        self.home.bind("<B1-Motion>", self.detect_swipe)
-
-        self.update_battery()
-
-    def start_hold(self, event):
-        self.hold_start = time.time()
-
-    def end_hold(self, event):
-        if self.hold_start and time.time() - self.hold_start >= 1.5:
-            self.open_widget_menu()
-        self.hold_start = None
+    def on_home_swipe(self, gesture):
+        if gesture.direction == "down":
+            self.show_control_panel()
+        elif gesture.direction == "up":
+            self.hide_control_panel()
 
-    def open_widget_menu(self):
+    def open_widget_menu(self, gesture=None):
         popup = tk.Toplevel(self.root)
         popup.geometry("400x400+700+300")
         popup.title("Widgets & Wallpaper")
         popup.configure(bg="#d0e8f0")
         tk.Label(popup, text="Add Widgets / Change Wallpaper", font=("Segoe UI", 16, "bold"), bg="#d0e8f0").pack(pady=20)
         ttk.Button(popup, text="Add Clock Widget").pack(pady=10)
-        ttk.Button(popup, text="Change Wallpaper to Blue", command=lambda: self.home.configure(bg="#b0e0e6")).pack(pady=10)
+        ttk.Button(popup, text="Choose Wallpaper Image...", command=self.choose_wallpaper).pack(pady=10)
+        ttk.Button(popup, text="Change Wallpaper to Blue", command=self.plain_wallpaper).pack(pady=10)
         ttk.Button(popup, text="Close", command=popup.destroy).pack(pady=20)
 
-    # ---------------------- CONTROL PANEL ----------------------
-    def detect_swipe(self, event):
-        if event.y > 100 and not self.control_panel_visible:
-            self.show_control_panel()
-        elif event.y < 50 and self.control_panel_visible:
-            self.hide_control_panel()
+    def choose_wallpaper(self):
+        path = filedialog.askopenfilename(title="Choose Wallpaper", filetypes=FILETYPES)
+        if path:
+            self.wallpaper.show(path)
+            self.settings.set("wallpaper", path)
+
+    def plain_wallpaper(self):
+        self.wallpaper.clear()
+        self.home.configure(bg="#b0e0e6")
+        self.settings.delete("wallpaper")
 
+    # ---------------------- CONTROL PANEL ----------------------
     def show_control_panel(self):
-        if self.panel_frame:
-            self.panel_frame.destroy()
-        self.panel_frame = tk.Frame(self.home, bg="#d0e8f0", height=300)
+        if self.control_panel_visible:
+            return
+        # Built on first use, then only packed/unpacked
+        if self.panel_frame is None or not self.panel_frame.winfo_exists():
+            self.panel_frame = tk.Frame(self.home, bg="#d0e8f0", height=300)
+            tk.Label(self.panel_frame, text="Control Panel", font=("Segoe UI", 20, "bold"), bg="#d0e8f0").pack(pady=10)
+            wifi = ttk.Label(self.panel_frame)
+            wifi.pack(pady=5)
+            self.power.subscribe(wifi, lambda m: "Wi-Fi: " + (f"{m.bars}/4 bars" if m.connected else "No signal"))
+            battery = ttk.Label(self.panel_frame)
+            battery.pack(pady=5)
+            self.power.subscribe(battery, lambda m: f"Battery: {m.percent}%" + (" (charging)" if m.charging else ""))
+            ttk.Button(self.panel_frame, text="Toggle Charging", command=self.toggle_charging).pack(pady=5)
         self.panel_frame.pack(fill="x", side="top")
         self.control_panel_visible = True
 
-        tk.Label(self.panel_frame, text="Control Panel", font=("Segoe UI", 20, "bold"), bg="#d0e8f0").pack(pady=10)
-        ttk.Label(self.panel_frame, text=f"Wi-Fi: Connected").pack(pady=5)
-        ttk.Label(self.panel_frame, text=f"Battery: {self.battery_level}%").pack(pady=5)
-        ttk.Button(self.panel_frame, text="Toggle Charging", command=self.toggle_charging).pack(pady=5)
-
     def hide_control_panel(self):
-        if self.panel_frame:
-            self.panel_frame.destroy()
+        if self.panel_frame is not None and self.panel_frame.winfo_exists():
+            self.panel_frame.pack_forget()
         self.control_panel_visible = False
 
     def toggle_charging(self):
-        self.charging = not self.charging
+        model = self.power.model
+        model.set_charging(not model.charging)
 
     # ---------------------- POWER MENU ----------------------
     def open_power_menu(self, event=None):
@@ -208,40 +294,48 @@ class TabletOS:
         ttk.Button(popup, text="Shutdown", command=lambda: self.shutdown_os(popup)).pack(pady=10)
         ttk.Button(popup, text="Cancel", command=popup.destroy).pack(pady=10)
 
-    def shutdown_os(self, popup):
+    def power_fade(self, popup):
         popup.destroy()
-        fade = tk.Frame(self.root, bg="black")
-        fade.place(relx=0, rely=0, relwidth=1, relheight=1)
-        for i in range(0, 255, 10):
-            fade.configure(bg=f"#{i:02x}{i:02x}{i:02x}")
-            self.root.update()
-            time.sleep(0.02)
-        self.root.destroy()
+        self.end_transition()
+        self.state = "power"
+        overlay = tk.Frame(self.root, bg="black")
+        overlay.place(relx=0, rely=0, relwidth=1, relheight=1)
+        overlay.tkraise()
+        self.transition = fade(overlay, POWER_FADE_MS, "#000000", "#fafafa")
+        return overlay
+
+    def shutdown_os(self, popup):
+        self.power_fade(popup)
+        self.transition.then(self.root.destroy)
 
     def restart_os(self, popup):
-        popup.destroy()
-        fade = tk.Frame(self.root, bg="black")
-        fade.place(relx=0, rely=0, relwidth=1, relheight=1)
-        for i in range(0, 255, 10):
-            fade.configure(bg=f"#{i:02x}{i:02x}{i:02x}")
-            self.root.update()
-            time.sleep(0.02)
-        fade.destroy()
-        self.home.destroy()
+        overlay = self.power_fade(popup)
+        self.transition.then(lambda: self.finish_restart(overlay))
+
+    def finish_restart(self, overlay):
+        self.transition = None
+        overlay.destroy()
+        self.hide_control_panel()
         self.create_boot_screen()
 
     # ---------------------- APPS ----------------------
     def open_app(self, app_name):
-        app_win = tk.Toplevel(self.root)
+        self.windows.open(app_name)
+
+    def build_app(self, app_win, app_name):
         app_win.title(app_name)
         app_win.geometry("600x400")
         label = tk.Label(app_win, text=f"{app_name} App Running...", font=("Segoe UI", 20))
         label.pack(expand=True)
-        ttk.Button(app_win, text="Close", command=app_win.destroy).pack(pady=10)
+        ttk.Button(app_win, text="Close", command=lambda: self.windows.close(app_win)).pack(pady=10)
 
 
 # ---------------------- RUN OS ----------------------
-if __name__ == "__main__":
+def main():
     root = tk.Tk()
-    app = TabletOS(root)
+    TabletOS(root)
     root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Shared fixtures.
+
+The pure-Python cores are tested directly.  Tests that need a real Tk root
+use the ``tk_root`` fixture and are skipped when there is no display.
+Scheduler-driven code runs on ``FakeRoot`` and the ``clock`` fixture instead,
+with ``advance`` standing in for the Tk event loop.
+"""
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scheduler  # noqa: E402
+
+
+@pytest.fixture
+def settings_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("OS_SETTINGS_DIR", str(tmp_path))
+    monkeypatch.setenv("OS_AUDIO", "null")
+    return tmp_path
+
+
+@pytest.fixture
+def tk_root(settings_dir):
+    tk = pytest.importorskip("tkinter")
+    try:
+        root = tk.Tk()
+    except tk.TclError as exc:
+        pytest.skip(f"no display: {exc}")
+    root.withdraw()
+    yield root
+    try:
+        root.destroy()
+    except tk.TclError:
+        pass
+
+
+def pump(root, until, timeout=10.0):
+    """Run ``root``'s event loop until ``until()`` is true; returns its last value."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            root.update()
+        except Exception:
+            pass
+        if until():
+            return True
+        time.sleep(0.002)
+    return until()
+
+
+# ---------- FAKE TK ROOT AND CLOCK ----------
+class FakeRoot:
+    """Just enough of a Tk root for the scheduler, on a clock the test moves."""
+    master = None
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.timers = {}
+        self._next = 0
+
+    def after(self, delay_ms, callback):
+        self._next += 1
+        self.timers[self._next] = (self.clock.now + delay_ms, callback)
+        return self._next
+
+    def after_cancel(self, after_id):
+        self.timers.pop(after_id, None)
+
+    def _root(self):
+        return self
+
+    def report_callback_exception(self, *exc_info):
+        raise exc_info[1]
+
+
+class FakeWidget:
+    def __init__(self, path):
+        self.path = path
+        self.bindings = []
+
+    def __str__(self):
+        return self.path
+
+    def bind(self, sequence, callback, add=None):
+        self.bindings.append(callback)
+
+    def destroy(self, event_widget=None):
+        event = type("Event", (), {"widget": event_widget or self})()
+        for callback in list(self.bindings):
+            callback(event)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler, "_now_ms", lambda: clock.now)
+    return clock
+
+
+def advance(sched, clock, ms):
+    """Move the clock forward, firing the root's timers as Tk would."""
+    end = clock.now + ms
+    while True:
+        due = [(at, after_id) for after_id, (at, _) in sched.root.timers.items() if at <= end]
+        if not due:
+            break
+        at, after_id = min(due)
+        clock.now = max(clock.now, at)
+        _, callback = sched.root.timers.pop(after_id)
+        callback()
+    clock.now = end
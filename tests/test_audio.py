@@ -0,0 +1,145 @@
+import array
+import threading
+import types
+import wave
+
+import pytest
+
+import audio
+from audio import Mixer, Sound, FileSinkBackend, WinsoundBackend
+
+
+class GatedSink(FileSinkBackend):
+    """A file sink whose ``open`` waits, so every request is queued before mixing starts."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.gate = threading.Event()
+
+    def open(self, rate):
+        self.gate.wait(5)
+        super().open(rate)
+
+
+def sound(value, frames, rate=1000):
+    return Sound(f"const {value}", array.array("h", [value] * frames), rate)
+
+
+def run(tmp_path, sounds, max_voices=8, volume=1.0):
+    """Mix ``sounds`` (started together) into a file; returns the mixer and the samples written."""
+    sink = GatedSink(str(tmp_path / "out.wav"))
+    mixer = Mixer(sink, rate=1000, max_voices=max_voices)
+    for s in sounds:
+        mixer.play(s, volume=volume)
+    sink.gate.set()
+    mixer.close(timeout=5)
+    with wave.open(sink.path, "rb") as wav:
+        out = array.array("h", wav.readframes(wav.getnframes()))
+    return mixer, out
+
+
+def test_block_size_follows_backend(tmp_path):
+    mixer = Mixer(FileSinkBackend(str(tmp_path / "out.wav")), rate=1000)
+    assert mixer.block_frames == 20
+
+
+def test_single_voice_is_copied_and_padded(tmp_path):
+    mixer, out = run(tmp_path, [sound(1000, 30)])
+    assert list(out) == [1000] * 30 + [0] * 10
+    assert mixer.played == 1 and mixer.blocks == 2
+
+
+def test_voices_are_summed(tmp_path):
+    mixer, out = run(tmp_path, [sound(1000, 50), sound(-300, 20)])
+    assert list(out[:20]) == [700] * 20
+    assert list(out[20:50]) == [1000] * 30
+    assert list(out[50:]) == [0] * 10
+
+
+def test_volume_scales_voices(tmp_path):
+    mixer, out = run(tmp_path, [sound(1000, 20), sound(1000, 20)], volume=0.5)
+    assert list(out) == [1000] * 20
+
+
+def test_sum_is_clipped(tmp_path):
+    mixer, out = run(tmp_path, [sound(30000, 20), sound(30000, 20)])
+    assert list(out) == [32767] * 20
+    mixer, out = run(tmp_path, [sound(-30000, 20), sound(-30000, 20)])
+    assert list(out) == [-32768] * 20
+
+
+def test_finished_voices_are_removed(tmp_path):
+    mixer, out = run(tmp_path, [sound(1, 20), sound(2, 60), sound(4, 40)])
+    # Each block holds exactly the voices still playing
+    assert list(out) == [7] * 20 + [6] * 20 + [2] * 20
+    assert mixer.active_voices() == 0
+    assert mixer.blocks == 3
+
+
+def test_oldest_voice_is_dropped(tmp_path):
+    mixer, out = run(tmp_path, [sound(1, 20), sound(2, 20), sound(4, 20)], max_voices=2)
+    assert list(out) == [6] * 20
+    assert mixer.played == 3 and mixer.dropped == 1
+
+
+def test_missing_file_plays_fallback_tone(tmp_path):
+    sink = FileSinkBackend(str(tmp_path / "out.wav"))
+    mixer = Mixer(sink, rate=1000)
+    mixer.play(str(tmp_path / "missing.wav"), fallback=(100, 40))
+    mixer.close(timeout=5)
+    assert mixer.played == 1
+    assert mixer.cached() == {}
+    with wave.open(sink.path, "rb") as wav:
+        assert wav.getnframes() == 40
+
+
+class FakeWinsound(types.SimpleNamespace):
+    SND_FILENAME, SND_ASYNC, SND_NODEFAULT = 0x20000, 0x1, 0x2
+
+    def __init__(self):
+        super().__init__(played=[])
+
+    def PlaySound(self, path, flags):
+        if path is None:
+            self.played.append(None)
+            return
+        with wave.open(path, "rb") as wav:
+            self.played.append((array.array("h", wav.readframes(wav.getnframes())), flags))
+
+
+@pytest.fixture
+def winsound(monkeypatch):
+    fake = FakeWinsound()
+    monkeypatch.setitem(__import__("sys").modules, "winsound", fake)
+    return fake
+
+
+def test_winsound_plays_a_burst_in_one_async_call(winsound):
+    backend = WinsoundBackend()
+    backend.open(1000)
+    backend.write(array.array("h", [1] * 100).tobytes())
+    backend.write(array.array("h", [2] * 100).tobytes())
+    assert winsound.played == []
+    backend.idle()
+    (samples, flags), = winsound.played
+    assert list(samples) == [1] * 100 + [2] * 100
+    assert flags & winsound.SND_ASYNC and flags & winsound.SND_FILENAME
+    backend.idle()
+    assert len(winsound.played) == 1
+
+
+def test_winsound_mixes_in_what_is_still_playing(winsound, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(audio.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(audio.time, "sleep", lambda s: now.__setitem__(0, now[0] + s))
+    backend = WinsoundBackend()
+    backend.open(1000)
+    backend.write(array.array("h", [10] * 300).tobytes())
+    backend.idle()
+    now[0] += 0.1
+    backend.write(array.array("h", [5] * 50).tobytes())
+    backend.idle()
+    samples, _ = winsound.played[-1]
+    assert list(samples) == [15] * 50 + [10] * 150
+    backend.close()
+    assert winsound.played[-1] is None
@@ -0,0 +1,145 @@
+import threading
+
+import pytest
+
+from dispatch import Dispatcher
+from scheduler import FRAME_MS
+
+from conftest import FakeRoot, advance
+
+
+class DispatchRoot(FakeRoot):
+    """A fake root that can also be bound to and destroyed."""
+
+    def __init__(self, clock):
+        super().__init__(clock)
+        self.bindings = []
+
+    def __str__(self):
+        return "."
+
+    def bind(self, sequence, callback, add=None):
+        self.bindings.append(callback)
+
+    def destroy(self):
+        event = type("Event", (), {"widget": self})()
+        for callback in list(self.bindings):
+            callback(event)
+
+
+@pytest.fixture
+def dispatcher(clock):
+    return Dispatcher(DispatchRoot(clock))
+
+
+def frame(dispatcher, clock, count=1):
+    advance(dispatcher.scheduler, clock, FRAME_MS * count)
+
+
+def from_worker(func, *args, **kwargs):
+    """Call ``func`` on another thread and return its result."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func(*args, **kwargs)))
+    thread.start()
+    thread.join(5)
+    return result[0]
+
+
+def test_main_thread_posts_drain_on_the_next_frame(dispatcher, clock):
+    calls = []
+    dispatcher.post(calls.append, 1)
+    dispatcher.post(calls.append, 2)
+    assert calls == []
+    frame(dispatcher, clock)
+    assert calls == [1, 2]
+    # Nothing queued and no hold: the drain job stops
+    assert dispatcher.scheduler.pending() == 0
+
+
+def test_worker_posts_need_a_hold(dispatcher, clock):
+    calls = []
+    assert from_worker(dispatcher.post, calls.append, "early")
+    frame(dispatcher, clock, 3)
+    assert calls == [] and dispatcher.depth == 1
+
+    dispatcher.hold()
+    frame(dispatcher, clock)
+    assert calls == ["early"]
+    # Held: the job keeps running with an empty queue
+    frame(dispatcher, clock, 3)
+    assert dispatcher.scheduler.pending() == 1
+    from_worker(dispatcher.post, calls.append, "late")
+    from_worker(dispatcher.post, dispatcher.release)
+    frame(dispatcher, clock)
+    assert calls == ["early", "late"]
+    frame(dispatcher, clock)
+    assert dispatcher.scheduler.pending() == 0
+
+
+def test_holds_nest(dispatcher, clock):
+    dispatcher.hold()
+    dispatcher.hold()
+    dispatcher.release()
+    frame(dispatcher, clock, 2)
+    assert dispatcher.scheduler.pending() == 1
+    dispatcher.release()
+    dispatcher.release()
+    frame(dispatcher, clock, 2)
+    assert dispatcher.scheduler.pending() == 0
+
+
+def test_budget_carries_the_rest_over(dispatcher, clock):
+    calls = []
+    for i in range(3):
+        dispatcher.post(calls.append, i)
+    # A zero budget still runs one closure per frame
+    assert dispatcher.drain(budget_ms=0) == 1
+    assert dispatcher.drain(budget_ms=0) == 1
+    assert calls == [0, 1] and dispatcher.carried_over == 2
+    frame(dispatcher, clock)
+    assert calls == [0, 1, 2]
+
+
+def test_full_queue_blocks_workers_until_timeout(clock):
+    dispatcher = Dispatcher(DispatchRoot(clock), max_pending=2)
+    assert from_worker(dispatcher.post, print)
+    assert from_worker(dispatcher.post, print)
+    assert not from_worker(dispatcher.post, print, timeout=0.05)
+    assert dispatcher.blocked == 1 and dispatcher.dropped == 1
+    assert dispatcher.blocked_ms >= 40
+    # The main thread never blocks and is never dropped
+    assert dispatcher.post(print)
+    assert dispatcher.depth == 3
+
+
+def test_blocked_worker_resumes_once_drained(clock):
+    dispatcher = Dispatcher(DispatchRoot(clock), max_pending=1)
+    calls = []
+    dispatcher.post(calls.append, 1)
+    result = []
+    worker = threading.Thread(target=lambda: result.append(dispatcher.post(calls.append, 2, timeout=5)))
+    worker.start()
+    while not dispatcher.blocked:
+        worker.join(0.001)
+    dispatcher.drain(budget_ms=0)
+    worker.join(5)
+    assert result == [True]
+    assert dispatcher.depth == 1 and dispatcher.dropped == 0
+    dispatcher.drain()
+    assert calls == [1, 2]
+
+
+def test_destroy_closes_and_releases_waiting_workers(clock):
+    dispatcher = Dispatcher(DispatchRoot(clock), max_pending=1)
+    dispatcher.post(print)
+    result = []
+    worker = threading.Thread(target=lambda: result.append(dispatcher.post(print, timeout=5)))
+    worker.start()
+    while not dispatcher.blocked:
+        worker.join(0.001)
+    dispatcher.widget.destroy()
+    worker.join(5)
+    assert result == [False]
+    assert dispatcher.closed and dispatcher.depth == 0
+    assert not dispatcher.post(print)
+    assert dispatcher.dropped == 3
@@ -0,0 +1,92 @@
+from gestures import GestureTracker, LONG_PRESS_MS, SWIPE_PX
+
+
+def drag(tracker, dx, dy, ms, start=0):
+    """Press at the origin and move in a straight line, one event per ms."""
+    tracker.press(0, 0, start)
+    gestures = []
+    for i in range(1, ms + 1):
+        gesture = tracker.move(round(dx * i / ms), round(dy * i / ms), start + i)
+        if gesture is not None:
+            gestures.append(gesture)
+    return gestures
+
+
+def test_tap():
+    tracker = GestureTracker()
+    assert drag(tracker, 2, 1, 60) == []
+    gesture = tracker.release(2, 1, 61)
+    assert gesture.kind == "tap"
+
+
+def test_slow_press_without_moving_is_not_a_tap():
+    tracker = GestureTracker()
+    tracker.press(0, 0, 0)
+    assert tracker.release(0, 0, 500) is None
+
+
+def test_swipe_fires_while_moving():
+    tracker = GestureTracker()
+    gestures = drag(tracker, 0, 200, 400)
+    assert [(g.kind, g.direction) for g in gestures] == [("swipe", "down")]
+    assert abs(gestures[0].dy) >= SWIPE_PX
+    # One gesture per touch: the release adds nothing
+    assert tracker.release(0, 200, 401) is None
+
+
+def test_swipe_directions():
+    for dx, dy, expected in ((-200, 10, "left"), (200, -10, "right"), (5, -200, "up")):
+        tracker = GestureTracker()
+        assert [g.direction for g in drag(tracker, dx, dy, 300)] == [expected]
+
+
+def test_fast_short_move_is_a_fling():
+    tracker = GestureTracker()
+    assert drag(tracker, 0, -40, 20) == []
+    gesture = tracker.release(0, -40, 21)
+    assert (gesture.kind, gesture.direction) == ("fling", "up")
+    assert gesture.velocity >= tracker.fling_speed
+
+
+def test_slow_short_drag_is_nothing():
+    tracker = GestureTracker()
+    assert drag(tracker, 40, 0, 1000) == []
+    assert tracker.release(40, 0, 1001) is None
+
+
+def test_long_press():
+    tracker = GestureTracker()
+    tracker.press(0, 0, 0)
+    tracker.move(3, 2, 300)
+    gesture = tracker.long_press(LONG_PRESS_MS)
+    assert gesture.kind == "long_press"
+    assert gesture.duration_ms == LONG_PRESS_MS
+    assert tracker.release(3, 2, 900) is None
+
+
+def test_no_long_press_after_moving_or_releasing():
+    tracker = GestureTracker()
+    drag(tracker, 30, 0, 100)
+    assert tracker.long_press(LONG_PRESS_MS) is None
+    tracker = GestureTracker()
+    tracker.press(0, 0, 0)
+    tracker.release(0, 0, 100)
+    assert tracker.long_press(LONG_PRESS_MS) is None
+
+
+def test_motion_is_sampled():
+    tracker = GestureTracker(sample_ms=8)
+    drag(tracker, 0, 40, 400)
+    assert tracker.samples <= 400 // 8
+
+
+def test_pinch():
+    tracker = GestureTracker()
+    for _ in range(3):
+        tracker.pinch(1)
+    gesture = tracker.pinch_end(120)
+    assert (gesture.kind, gesture.direction, gesture.duration_ms) == ("pinch", "out", 120)
+    assert gesture.scale > 1
+    tracker.pinch(1)
+    tracker.pinch(-1)
+    assert tracker.pinch_end() is None
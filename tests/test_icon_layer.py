@@ -0,0 +1,89 @@
+import types
+
+import pytest
+
+import icon_layer
+from icon_layer import IconLayer, SpatialGrid
+
+
+class FakeFont:
+    def __init__(self, root=None, font=None):
+        self.pt = font[1]
+
+    def metrics(self, name):
+        return int(self.pt * 1.5)
+
+
+class FakeCanvas:
+    """Keeps item coordinates so ``move`` by tag can be checked."""
+
+    def __init__(self):
+        self.items = {}
+        self.tk = types.SimpleNamespace(eval=lambda script: None)
+
+    def __str__(self):
+        return ".!canvas"
+
+    def bind(self, *args):
+        pass
+
+    def create_text(self, x, y, tags=(), **options):
+        item = len(self.items) + 1
+        self.items[item] = {"xy": [x, y], "tags": set(tags)}
+        return item
+
+    def itemconfigure(self, tag, **options):
+        pass
+
+    def move(self, tag, dx, dy):
+        for item in self.items.values():
+            if tag in item["tags"]:
+                item["xy"][0] += dx
+                item["xy"][1] += dy
+
+    def coords_of(self, icon_id, kind):
+        return next(tuple(item["xy"]) for item in self.items.values()
+                    if {f"i{icon_id}", kind} <= item["tags"])
+
+
+@pytest.fixture
+def layer(monkeypatch):
+    monkeypatch.setattr(icon_layer.tkfont, "Font", FakeFont)
+    monkeypatch.setattr(icon_layer, "DragController", lambda *args, **kwargs: None)
+    return IconLayer(FakeCanvas(), size="medium")
+
+
+def test_position_survives_resizing(layer):
+    icon = layer.add("♻", "Recycle Bin", 50, 100)
+    for size in ("large", "small", "medium", "large"):
+        layer.set_size(size)
+        assert layer.position(icon) == (50, 100)
+
+
+def test_items_follow_the_cell(layer):
+    icon = layer.add("♻", "Recycle Bin", 50, 100)
+    layer.set_size("large")
+    centre = 50 + layer.cell_w / 2
+    assert layer.canvas.coords_of(icon, "icon_glyph") == (centre, 100)
+    assert layer.canvas.coords_of(icon, "icon_caption") == (centre, 100 + layer.glyph_h)
+    assert layer.index.box(icon) == (50, 100, 50 + layer.cell_w, 100 + layer.cell_h)
+
+
+def test_saved_position_reopens_in_place(layer):
+    icon = layer.add("♻", "Recycle Bin", 50, 100)
+    layer.set_size("small")
+    saved = layer.position(icon)
+    # Next launch: the layer starts at the saved size and adds the icon at the saved position
+    reopened = IconLayer(FakeCanvas(), size="small")
+    again = reopened.add("♻", "Recycle Bin", *saved)
+    assert reopened.index.box(again) == layer.index.box(icon)
+
+
+def test_grid_queries():
+    grid = SpatialGrid(cell=10)
+    grid.insert("a", (0, 0, 15, 15))
+    grid.insert("b", (30, 30, 35, 35))
+    assert grid.at(12, 12) == ["a"]
+    assert grid.within((14, 14, 31, 31)) == {"a", "b"}
+    grid.remove("a")
+    assert grid.at(12, 12) == [] and len(grid) == 1
@@ -0,0 +1,42 @@
+import tkinter as tk
+
+import pytest
+
+import leakcheck
+from leakcheck import LeakDetector
+
+
+class GoneRoot:
+    """A root whose Tk is gone: snapshots come back empty."""
+
+    def winfo_children(self):
+        raise tk.TclError("application has been destroyed")
+
+
+@pytest.fixture
+def detector():
+    tracing = leakcheck.tracemalloc.is_tracing()
+    reports = []
+    detector = LeakDetector(GoneRoot(), report=lambda label, growth: reports.append((label, growth)), keep=3)
+    detector.reports = reports
+    yield detector
+    if not tracing:
+        leakcheck.tracemalloc.stop()
+
+
+def test_only_recent_snapshots_are_kept(detector):
+    for i in range(10):
+        detector.check(f"screen{i % 2}")
+    assert len(detector.snapshots) == 3
+    assert [s.label for s in detector.snapshots] == ["screen1", "screen0", "screen1"]
+    # Each transition still compares with its own previous visit
+    assert set(detector._last) == {"screen0", "screen1"}
+
+
+def test_growth_is_reported_against_the_last_visit(detector):
+    detector.check("home")
+    memory = bytearray(1024 * 1024)
+    assert any(g.startswith("traced memory") for g in detector.check("home"))
+    assert detector.reports and detector.reports[0][0] == "home"
+    assert detector.check("home") == []
+    del memory
@@ -0,0 +1,83 @@
+import pytest
+
+import power_model
+from power_model import PowerModel, CC_LIMIT, signal_bars
+
+np = pytest.importorskip("numpy")
+
+
+def stepped(model, seconds):
+    for _ in range(int(seconds)):
+        model.advance(1.0)
+
+
+@pytest.mark.parametrize("charging, battery", [(False, 75.0), (True, 20.0), (True, 90.0)])
+def test_vectorized_matches_stepping(charging, battery):
+    a = PowerModel(seed=7, battery=battery, charging=charging, apps=2)
+    b = PowerModel(seed=7, battery=battery, charging=charging, apps=2)
+    stepped(a, 3000)
+    b.simulate(3000)
+    assert a.step == b.step == 3000
+    assert a.battery == pytest.approx(b.battery, abs=1e-9)
+    assert a.signal == pytest.approx(b.signal, abs=1e-9)
+
+
+def test_same_seed_same_history():
+    runs = [PowerModel(seed=3).simulate(600) for _ in range(2)]
+    for x, y in zip(*runs):
+        assert np.array_equal(x, y)
+    other = PowerModel(seed=4).simulate(600)
+    assert not np.array_equal(runs[0][2], other[2])
+
+
+def test_fractions_carry_over():
+    model = PowerModel()
+    assert model.advance(0.6) == 0
+    assert model.advance(0.6) == 1
+    assert model.seconds == 1.0
+
+
+def test_battery_stays_in_range():
+    drained = PowerModel(battery=1.0, apps=10)
+    _, battery, _ = drained.simulate(3600)
+    assert battery.min() >= 0.0
+    assert drained.battery == 0.0
+    charged = PowerModel(battery=10.0, charging=True)
+    _, battery, _ = charged.simulate(6 * 3600)
+    assert battery.max() <= 100.0
+    assert np.all(np.diff(battery) >= 0)
+    # Linear up to the constant-current limit, then slower
+    assert (battery >= CC_LIMIT).any()
+
+
+def test_screen_and_apps_drain_more():
+    def used(**inputs):
+        model = PowerModel(seed=1, **inputs)
+        model.simulate(3600)
+        return 75.0 - model.battery
+
+    assert used(screen="off") < used(screen="lock") < used(screen="on") < used(screen="on", apps=3)
+    with pytest.raises(ValueError):
+        PowerModel().set_screen("dim")
+
+
+def test_listeners_fire_only_on_change():
+    model = PowerModel(seed=2, battery=50.0)
+    seen = []
+    model.subscribe(lambda m: seen.append(m.snapshot()))
+    stepped(model, 600)
+    assert seen
+    assert all(a != b for a, b in zip(seen, seen[1:]))
+    model.set_charging(True)
+    assert seen[-1][1] is True
+
+
+def test_signal_bars():
+    assert [signal_bars(dbm) for dbm in (-50, -60, -70, -80, -90)] == [4, 3, 2, 1, 0]
+
+
+def test_long_advances_fall_back_to_python_without_numpy(monkeypatch):
+    monkeypatch.setattr(power_model, "np", None)
+    model = PowerModel()
+    model.advance(power_model.VECTOR_MIN_STEPS * 2)
+    assert model.step == power_model.VECTOR_MIN_STEPS * 2
@@ -0,0 +1,120 @@
+import random
+import time
+
+import pytest
+
+import recycle_bin
+from recycle_bin import RecycleBin, SORT_NAME, SORT_TIME
+
+WORDS = ["report", "Photo", "notes", "REPORT-final", "budget", "photo (1)", "Ärger", "straße", "x"]
+
+
+class Reference:
+    """The bin as a plain dict, searched by brute force."""
+
+    def __init__(self):
+        self.items = {}
+
+    def ids(self, match, sort):
+        ids = [i for i, name in self.items.items() if match(name.casefold())]
+        if sort == SORT_TIME:
+            return sorted(ids)
+        return sorted(ids, key=lambda i: (self.items[i].casefold(), i))
+
+
+def random_name(rng):
+    return rng.choice(WORDS) + rng.choice(["", " copy", ".txt", str(rng.randint(0, 99))])
+
+
+def live(bin_, ids):
+    """Views may still hold deleted ids; the window skips them when rendering."""
+    return [item_id for item_id in ids if item_id in bin_]
+
+
+def check(bin_, ref, query):
+    key = query.casefold()
+    for sort in (SORT_NAME, SORT_TIME):
+        for reverse in (False, True):
+            expected = ref.ids(lambda name: name.startswith(key), sort)
+            got = bin_.search(query, sort=sort, reverse=reverse)
+            got = live(bin_, got) if not key else got
+            assert got == (expected[::-1] if reverse else expected)
+            expected = ref.ids(lambda name: key in name, sort)
+            got = bin_.search(query, substring=True, sort=sort, reverse=reverse)
+            got = live(bin_, got) if not key else got
+            assert got == (expected[::-1] if reverse else expected)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_search_matches_a_reference(seed, monkeypatch):
+    # A small threshold so the substring text is rebuilt during the run
+    monkeypatch.setattr(recycle_bin, "REBUILD_RECENT", 8)
+    rng = random.Random(seed)
+    bin_, ref = RecycleBin(), Reference()
+    for _ in range(300):
+        op = rng.random()
+        if op < 0.45:
+            name = random_name(rng)
+            ref.items[bin_.add(name)] = name
+        elif op < 0.55:
+            names = [random_name(rng) for _ in range(rng.randint(1, 10))]
+            ref.items.update(zip(bin_.add_many(names), names))
+        elif op < 0.8 and ref.items:
+            item_id = rng.choice(list(ref.items))
+            removed = bin_.delete(item_id) if rng.random() < 0.5 else bin_.restore(item_id)
+            assert removed.name == ref.items.pop(item_id)
+        else:
+            check(bin_, ref, rng.choice(["", "re", "PHOTO", "copy", "ss", "t", "zz", "1"]))
+    assert len(bin_) == len(ref.items)
+    assert bin_.view(SORT_TIME) == sorted(ref.items)
+    assert live(bin_, bin_.view(SORT_NAME)) == ref.ids(lambda name: True, SORT_NAME)
+
+
+def test_deletes_are_compacted_in_bulk():
+    bin_ = RecycleBin()
+    ids = bin_.add_many(f"file {i}" for i in range(100))
+    view = bin_.view(SORT_NAME)
+    for item_id in ids[:50]:
+        bin_.delete(item_id)
+    # Not compacted yet: the name view is the same list, dead ids and all
+    assert bin_.view(SORT_NAME) is view
+    bin_.delete(ids[50])
+    assert bin_.view(SORT_NAME) == sorted(ids[51:], key=lambda i: bin_.get(i).name)
+
+
+def test_clear_empties_every_view():
+    bin_ = RecycleBin()
+    bin_.add_many(["a", "b", "ab"])
+    bin_.search("a", substring=True)
+    bin_.clear()
+    assert bin_.view() == []
+    assert bin_.search("a") == []
+    assert bin_.search("a", substring=True) == []
+    item_id = bin_.add("abc")
+    assert bin_.search("b", substring=True) == [item_id]
+
+
+def test_unknown_sort_order():
+    with pytest.raises(ValueError):
+        RecycleBin().view("size")
+
+
+def timed_ms(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def test_one_million_entries_stay_interactive():
+    # What the bin window does per click, with a bin of 1M entries.  The
+    # limits are loose; before the index was kept sorted on add these took
+    # 0.3-2 s each.
+    rng = random.Random(7)
+    bin_ = RecycleBin()
+    ids = bin_.add_many(f"{rng.choice(WORDS)} {i}.txt" for i in range(1_000_000))
+    assert timed_ms(lambda: bin_.view(SORT_NAME)) < 20
+    assert timed_ms(lambda: (bin_.delete(ids[10]), bin_.view(SORT_NAME))) < 20
+    assert timed_ms(lambda: (bin_.restore(ids[11]), bin_.search("photo 12"))) < 20
+    assert timed_ms(lambda: (bin_.add("new item.txt"), bin_.view(SORT_NAME))) < 50
+    assert timed_ms(lambda: bin_.search("99.t", substring=True)) < 150
+    assert bin_.search("new item", substring=True) == [ids[-1] + 1]
@@ -0,0 +1,101 @@
+import pytest
+
+from scheduler import FrameScheduler, PRIORITY_HIGH, PRIORITY_LOW
+
+from conftest import FakeRoot, FakeWidget, advance
+
+
+@pytest.fixture
+def sched(clock):
+    return FrameScheduler(FakeRoot(clock))
+
+
+def test_after_runs_once(sched, clock):
+    calls = []
+    job = sched.after(100, lambda: calls.append(clock.now))
+    advance(sched, clock, 99)
+    assert calls == []
+    advance(sched, clock, 200)
+    assert calls == [100]
+    assert not job.active
+    assert sched.pending() == 0
+
+
+def test_every_keeps_its_phase_and_stops_on_false(sched, clock):
+    calls = []
+
+    def tick():
+        calls.append(clock.now)
+        return len(calls) < 3
+
+    job = sched.every(50, tick)
+    advance(sched, clock, 1000)
+    assert calls == [50, 100, 150]
+    assert not job.active
+    assert sched.pending() == 0
+    assert sched.root.timers == {}
+
+
+def test_cancel(sched, clock):
+    calls = []
+    job = sched.every(10, lambda: calls.append(1))
+    advance(sched, clock, 25)
+    job.cancel()
+    advance(sched, clock, 100)
+    assert len(calls) == 2
+    assert sched.pending() == 0
+
+
+def test_owner_destroyed_cancels_its_jobs(sched, clock):
+    owner = FakeWidget(".screen")
+    other = FakeWidget(".other")
+    calls = []
+    sched.every(10, lambda: calls.append("owned"), owner=owner)
+    sched.after(30, lambda: calls.append("once"), owner=owner)
+    kept = sched.every(10, lambda: None, owner=other)
+    owner.destroy()
+    advance(sched, clock, 100)
+    assert calls == []
+    assert kept.active
+    assert sched.pending() == 1
+
+
+def test_destroy_of_a_child_does_not_cancel(sched, clock):
+    owner = FakeWidget(".screen")
+    job = sched.every(10, lambda: None, owner=owner)
+    # <Destroy> is delivered to the owner's bindings for its children too
+    owner.destroy(event_widget=FakeWidget(".screen.button"))
+    assert job.active
+
+
+def test_priority_order_within_a_tick(sched, clock):
+    calls = []
+    sched.after(10, lambda: calls.append("low"), priority=PRIORITY_LOW)
+    sched.after(10, lambda: calls.append("normal"))
+    sched.after(10, lambda: calls.append("high"), priority=PRIORITY_HIGH)
+    advance(sched, clock, 10)
+    assert calls == ["high", "normal", "low"]
+
+
+def test_jobs_over_budget_carry_over(clock):
+    sched = FrameScheduler(FakeRoot(clock), max_jobs_per_tick=2)
+    calls = []
+    for i in range(5):
+        sched.after(10, lambda i=i: calls.append(i))
+    advance(sched, clock, 10)
+    assert calls == [0, 1]
+    assert sched.carried_over == 3
+    advance(sched, clock, 10)
+    assert calls == [0, 1, 2, 3, 4]
+
+
+def test_pause_and_resume(sched, clock):
+    calls = []
+    sched.every(10, lambda: calls.append(1))
+    sched.pause()
+    advance(sched, clock, 100)
+    assert calls == []
+    sched.resume()
+    # One catch-up run, not one per missed slot
+    advance(sched, clock, 5)
+    assert calls == [1]
@@ -0,0 +1,76 @@
+import json
+
+from settings_store import SettingsStore
+
+
+def make_store(tmp_path, **options):
+    return SettingsStore(str(tmp_path / "test.journal"), flush_ms=0, **options)
+
+
+def reload(store):
+    store.close()
+    return SettingsStore(store.path, flush_ms=0)
+
+
+def test_replay_keeps_the_last_value_and_deletes(tmp_path):
+    store = make_store(tmp_path)
+    store.set("a", 1)
+    store.set("b", {"x": [1, 2]})
+    store.flush()
+    store.set("a", 2)
+    store.delete("b")
+    store.set("c", "three")
+    store = reload(store)
+    assert store.snapshot() == {"a": 2, "c": "three"}
+
+
+def test_compaction_keeps_one_record_per_key(tmp_path):
+    store = make_store(tmp_path, compact_min_records=8)
+    for i in range(20):
+        store.set("counter", i)
+        store.set("other", -i)
+        store.flush()
+    assert store.compactions >= 1
+    with open(store.path, encoding="utf-8") as fh:
+        lines = fh.read().splitlines()
+    assert len(lines) <= 8
+    assert reload(store).snapshot() == {"counter": 19, "other": -19}
+
+
+def test_torn_tail_is_ignored_on_load(tmp_path):
+    path = tmp_path / "test.journal"
+    path.write_bytes(b'{"k":"a","v":1}\n{"k":"b","v":')
+    store = SettingsStore(str(path), flush_ms=0)
+    assert store.snapshot() == {"a": 1}
+
+
+def test_append_after_torn_tail_is_not_lost(tmp_path):
+    path = tmp_path / "test.journal"
+    path.write_bytes(b'{"k":"a","v":1}\n{"k":"b","v":')
+    store = SettingsStore(str(path), flush_ms=0)
+    store.set("new", 5)
+    store.flush()
+    store = reload(store)
+    assert store.snapshot() == {"a": 1, "new": 5}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        json.loads(line)
+
+
+def test_torn_tail_without_any_complete_line(tmp_path):
+    path = tmp_path / "test.journal"
+    path.write_bytes(b'{"k":"a"')
+    store = SettingsStore(str(path), flush_ms=0)
+    store.set("a", 1)
+    store.flush()
+    assert reload(store).snapshot() == {"a": 1}
+
+
+def test_torn_tail_that_cannot_be_truncated(tmp_path, monkeypatch):
+    path = tmp_path / "test.journal"
+    path.write_bytes(b'{"k":"a","v":1}\n{"k":"b","v":')
+    monkeypatch.setattr(SettingsStore, "_cut_torn_tail", lambda self, end: setattr(self, "_torn", True))
+    store = SettingsStore(str(path), flush_ms=0)
+    store.set("new", 5)
+    store.flush()
+    monkeypatch.undo()
+    assert reload(store).snapshot() == {"a": 1, "new": 5}
@@ -0,0 +1,13 @@
+import tkinter as tk
+
+from conftest import pump
+from simulators import load_simulator
+
+
+def test_shutdown_closes_the_simulator(tk_root):
+    app = load_simulator("tablet")(tk_root)
+    closed = []
+    tk_root.bind("<Destroy>", lambda e: e.widget is tk_root and closed.append(True), add="+")
+    popup = tk.Toplevel(tk_root)
+    app.shutdown_os(popup)
+    assert pump(tk_root, lambda: closed)
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from tracing import Tracer
+
+MS = 1_000_000
+
+
+def test_percentiles_come_from_the_histogram():
+    tracer = Tracer()
+    for i in range(98):
+        tracer.record(i * MS, 1 * MS, "command", "click", ".")
+    for i in range(2):
+        tracer.record(i * MS, 50 * MS, "command", "click", ".")
+    p50, p99 = tracer.percentiles("click")
+    # Quarter-octave buckets: the middle of a bucket is within 2 ** (1/8) of any value in it
+    assert p50 == pytest.approx(1.0, rel=0.1)
+    assert p99 == pytest.approx(50.0, rel=0.1)
+    assert tracer.percentiles("click", pcts=(98,)) == [p50]
+    assert tracer.percentiles("never called") == [0.0, 0.0]
+
+
+def test_summary_is_slowest_first():
+    tracer = Tracer()
+    for name, ms in (("fast", 0.1), ("slow", 20), ("medium", 3)):
+        for _ in range(10):
+            tracer.record(0, int(ms * MS), "job", name, ".")
+    rows = tracer.summary()
+    assert [row[0] for row in rows] == ["slow", "medium", "fast"]
+    assert all(row[1] == 10 for row in rows)
+
+
+def test_histograms_outlive_the_ring():
+    tracer = Tracer(size=4)
+    for i in range(10):
+        tracer.record(i, 1 * MS, "after", "tick", ".")
+    assert len(tracer.events()) == 4
+    assert sum(tracer.histograms["tick"].values()) == 10
+
+
+def test_export_is_chrome_trace_json(tmp_path):
+    tracer = Tracer(size=4)
+    t0 = tracer.epoch_ns
+    calls = [
+        ("command", "lost", ".!toplevel"),
+        ("command", "lost too", "."),
+        ("bind", "drag", ".!canvas"),
+        ("command", "open", ".!toplevel.!frame.!button"),
+        ("after", "blink", ".!toplevel2.!label"),
+        ("job", "clock", "."),
+    ]
+    for i, (kind, name, widget) in enumerate(calls):
+        tracer.record(t0 + i * MS, 2 * MS, kind, name, widget)
+    path = tracer.export(str(tmp_path / "trace.json"))
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+
+    events = [e for e in data["traceEvents"] if e["ph"] == "X"]
+    # The ring kept the last four calls, oldest first
+    assert [e["name"] for e in events] == ["drag", "open", "blink", "clock"]
+    assert [e["ts"] for e in events] == [2000.0, 3000.0, 4000.0, 5000.0]
+    assert all(e["dur"] == 2000.0 for e in events)
+    assert [e["cat"] for e in events] == ["bind", "command", "after", "job"]
+    assert events[1]["args"] == {"widget": ".!toplevel.!frame.!button"}
+
+    # One track per top-level window; the root's own widgets share the root's
+    names = {e["tid"]: e["args"]["name"] for e in data["traceEvents"] if e["ph"] == "M"}
+    assert sorted(names.values()) == [".", ".!toplevel", ".!toplevel2"]
+    assert [names[e["tid"]] for e in events] == [".", ".!toplevel", ".!toplevel2", "."]
+
+    assert data["otherData"] == {"recorded": 6, "dropped": 2}
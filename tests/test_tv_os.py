@@ -0,0 +1,79 @@
+import pytest
+
+from scheduler import FrameScheduler
+from simulators import load_module
+
+from conftest import FakeRoot, FakeWidget, advance
+
+tv_os = load_module("tv")
+
+
+class FakeLabel:
+    def __init__(self):
+        self.text = None
+
+    def config(self, text):
+        self.text = text
+
+
+@pytest.fixture
+def tv(clock):
+    """A powered-on TV without a window: the picture is recorded, not drawn."""
+    tv = tv_os.TV.__new__(tv_os.TV)
+    tv.scheduler = FrameScheduler(FakeRoot(clock))
+    tv.canvas = FakeWidget(".!canvas")
+    tv.label = FakeLabel()
+    tv.channels = [{"name": f"Channel {i}", "type": "cartoon"} for i in range(5)]
+    tv.channel_index = 0
+    tv.volume = 50
+    tv.is_on = True
+    tv._zap_job = None
+    tv._zap_pending = False
+    tv.shown = []
+    tv.show_channel = lambda: tv.shown.append(tv.channel_index)
+    return tv
+
+
+def test_first_press_switches_at_once(tv, clock):
+    tv.next_channel()
+    assert tv.shown == [1]
+    advance(tv.scheduler, clock, tv_os.ZAP_SETTLE_MS + 10)
+    # Nothing more to catch up with
+    assert tv.shown == [1]
+
+
+def test_held_key_only_updates_the_name(tv, clock):
+    tv.next_channel()
+    for _ in range(6):
+        advance(tv.scheduler, clock, 33)
+        tv.next_channel()
+        assert tv.label.text == f"Channel {tv.channel_index} | Volume: 50%"
+    assert tv.shown == [1]
+    assert tv.channel_index == 7 % 5
+    # The picture follows once the keys have been quiet for ZAP_SETTLE_MS
+    advance(tv.scheduler, clock, tv_os.ZAP_SETTLE_MS - 1)
+    assert tv.shown == [1]
+    advance(tv.scheduler, clock, 1)
+    assert tv.shown == [1, 2]
+
+
+def test_press_after_settling_is_instant_again(tv, clock):
+    tv.prev_channel()
+    advance(tv.scheduler, clock, tv_os.ZAP_SETTLE_MS)
+    tv.first_channel()
+    assert tv.shown == [4, 0]
+
+
+def test_closing_the_tv_drops_the_pending_switch(tv, clock):
+    tv.next_channel()
+    tv.next_channel()
+    tv.canvas.destroy()
+    advance(tv.scheduler, clock, tv_os.ZAP_SETTLE_MS * 2)
+    assert tv.shown == [1]
+
+
+def test_keys_do_nothing_while_off(tv, clock):
+    tv.is_on = False
+    tv.next_channel()
+    tv.first_channel()
+    assert tv.shown == [] and tv.channel_index == 0
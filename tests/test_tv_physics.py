@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+import tv_physics
+from tv_physics import SpriteField
+
+
+def populate(field, n, seed=5):
+    rng = random.Random(seed)
+    for item in range(1, n + 1):
+        size = rng.randint(20, 60)
+        field.add(item, rng.randint(0, 200 - size), rng.randint(0, 150 - size), size, size,
+                  rng.choice([-3, 3]), rng.choice([-2, 2]))
+    return field
+
+
+def frames(field, count, skip_every=0):
+    """Scripts for ``count`` pushes; every ``skip_every``-th push follows two steps."""
+    scripts = []
+    for i in range(count):
+        field.step()
+        if skip_every and i % skip_every == 0:
+            field.step()
+        scripts.append(field.script(".c"))
+    return scripts
+
+
+def test_small_fields_stay_plain():
+    field = populate(SpriteField(200, 150), 5)
+    assert not field._vector
+    assert isinstance(field.coords(), list)
+
+
+def test_plain_and_vector_paths_agree(monkeypatch):
+    pytest.importorskip("numpy")
+    plain = populate(SpriteField(200, 150), 30)
+    monkeypatch.setattr(tv_physics, "VECTOR_MIN_SPRITES", 1)
+    vector = populate(SpriteField(200, 150), 30)
+    assert not plain._vector and vector._vector
+    assert frames(plain, 200, skip_every=7) == frames(vector, 200, skip_every=7)
+    assert plain.coords() == vector.coords().tolist()
+
+
+def test_switching_mid_run_keeps_state_and_tags(monkeypatch):
+    pytest.importorskip("numpy")
+    field = populate(SpriteField(200, 150), 19)
+    reference = populate(SpriteField(200, 150), 19)
+    assert frames(field, 40) == frames(reference, 40)
+    monkeypatch.setattr(tv_physics, "VECTOR_MIN_SPRITES", 20)
+    field.add(99, 10, 10, 20, 20, 3, 2)
+    monkeypatch.setattr(tv_physics, "VECTOR_MIN_SPRITES", 10 ** 9)
+    reference.add(99, 10, 10, 20, 20, 3, 2)
+    assert field._vector and not reference._vector
+    # Sprites tagged before the switch are not tagged again
+    assert frames(field, 40) == frames(reference, 40)
+    assert field.coords().tolist() == reference.coords()
+
+
+def test_bounces_stay_inside_the_field():
+    field = populate(SpriteField(200, 150), 8)
+    for _ in range(500):
+        field.step()
+        for x1, y1, x2, y2 in field.coords():
+            assert 0 <= x1 and x2 <= 200 and 0 <= y1 and y2 <= 150
+
+
+def test_one_step_is_one_move_per_velocity():
+    field = SpriteField(1000, 1000, tag="ch")
+    for item in range(1, 6):
+        field.add(item, 100 * item, 100, 10, 10, 3, 2)
+    field.script(".c")
+    field.step()
+    assert field.script(".c") == ".c move ch_v0 3.0 2.0"
+
+
+def test_runs_without_numpy(monkeypatch):
+    monkeypatch.setattr(tv_physics, "np", None)
+    monkeypatch.setattr(tv_physics, "VECTOR_MIN_SPRITES", 4)
+    field = populate(SpriteField(200, 150), 10)
+    field.add_many([20, 21], [(0, 0), (50, 50)], [(10, 10), (10, 10)], [(1, 1), (-1, -1)])
+    assert not field._vector and len(field) == 12
+    frames(field, 10)
+
+
+def test_clear_goes_back_to_plain(monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(tv_physics, "VECTOR_MIN_SPRITES", 4)
+    field = populate(SpriteField(200, 150), 10)
+    assert field._vector
+    field.clear()
+    assert not field._vector and len(field) == 0
+    field.add_many([1, 2], [(0, 0), (50, 50)], [(10, 10), (10, 10)], [(1, 1), (-1, -1)])
+    assert not field._vector and len(field) == 2
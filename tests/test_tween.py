@@ -0,0 +1,99 @@
+import pytest
+
+import tween
+from scheduler import FrameScheduler
+from tween import Tween, lerp_color
+
+from conftest import FakeRoot, FakeWidget, advance
+
+
+@pytest.fixture
+def sched(clock, monkeypatch):
+    # Tweens read the same clock the scheduler runs on
+    monkeypatch.setattr(tween.time, "perf_counter", lambda: clock.now / 1000)
+    return FrameScheduler(FakeRoot(clock))
+
+
+def test_values_follow_the_clock(sched, clock):
+    values = []
+    slide = Tween(sched, 100, values.append, start=0.0, end=10.0, easing="linear", interval_ms=10)
+    assert values == [0.0]
+    advance(sched, clock, 50)
+    assert values[-1] == pytest.approx(5.0)
+    advance(sched, clock, 100)
+    assert values[-1] == 10.0
+    assert slide.finished and not slide.active
+    assert sched.pending() == 0
+
+
+def test_late_frames_are_skipped_not_replayed(sched, clock):
+    values = []
+    slide = Tween(sched, 100, values.append, easing="linear", interval_ms=10)
+    advance(sched, clock, 10)
+    # The loop was busy for 60 ms: the next frame shows where the tween is by now
+    clock.now += 60
+    advance(sched, clock, 0)
+    assert values[-2:] == [pytest.approx(0.1), pytest.approx(0.7)]
+    # Seven frames were due by then and two were drawn
+    assert slide.dropped_frames == 5
+
+
+def test_then_runs_on_completion(sched, clock):
+    calls = []
+    slide = Tween(sched, 50, lambda v: None, interval_ms=10)
+    assert slide.then(lambda: calls.append("a")) is slide
+    slide.then(lambda: calls.append("b"))
+    advance(sched, clock, 40)
+    assert calls == []
+    advance(sched, clock, 20)
+    assert calls == ["a", "b"]
+    # Once finished, then() runs the callback right away
+    slide.then(lambda: calls.append("c"))
+    assert calls == ["a", "b", "c"]
+
+
+def test_cancel_stops_where_it_is(sched, clock):
+    values, calls = [], []
+    slide = Tween(sched, 100, values.append, easing="linear", interval_ms=10)
+    slide.then(lambda: calls.append("done"))
+    advance(sched, clock, 30)
+    slide.cancel()
+    advance(sched, clock, 200)
+    assert values[-1] == pytest.approx(0.3)
+    assert calls == [] and slide.cancelled and not slide.finished
+    # Nothing is queued on a cancelled tween, and cancelling again is harmless
+    slide.then(lambda: calls.append("late"))
+    slide.cancel()
+    assert calls == [] and sched.pending() == 0
+
+
+def test_finish_jumps_to_the_end(sched, clock):
+    values, calls = [], []
+    slide = Tween(sched, 100, values.append, start=1.0, end=0.0, interval_ms=10)
+    slide.then(lambda: calls.append(values[-1]))
+    advance(sched, clock, 20)
+    slide.finish()
+    assert values[-1] == 0.0 and calls == [0.0]
+    assert slide.finished and sched.pending() == 0
+    # Finishing twice does not run the callbacks again
+    slide.finish()
+    assert calls == [0.0]
+
+
+def test_destroying_the_owner_cancels(sched, clock):
+    owner = FakeWidget(".!frame")
+    values, calls = [], []
+    slide = Tween(sched, 100, values.append, interval_ms=10, owner=owner)
+    slide.then(lambda: calls.append("done"))
+    advance(sched, clock, 20)
+    owner.destroy()
+    advance(sched, clock, 200)
+    assert not slide.active and calls == []
+    assert len(values) == 3
+
+
+def test_lerp_color():
+    mix = lerp_color("#000000", "#ff8040")
+    assert mix(0) == "#000000"
+    assert mix(1) == "#ff8040"
+    assert mix(0.5) == "#804020"
@@ -0,0 +1,109 @@
+import io
+import threading
+
+import pytest
+
+import watchdog
+from watchdog import StallWatchdog
+
+POLL_S = watchdog.HEARTBEAT_MS / 1000
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(watchdog.time, "monotonic", lambda: now[0])
+    return now
+
+
+def make(stall_ms, report_interval_s=0.0):
+    wd = StallWatchdog(stall_ms=stall_ms, hang_s=60, report_interval_s=report_interval_s)
+    wd.path = "stalls.log"
+    wd.thread_id = threading.get_ident()
+    wd._log = io.StringIO()
+    return wd
+
+
+def watch(wd, clock, timeline):
+    """Run ``_watch`` over ``timeline``: one entry per poll, the age (s) of the newest beat or None."""
+    wd._last_beat = clock[0]
+    polls = iter(timeline)
+
+    class Polls:
+        def wait(self, timeout):
+            try:
+                age = next(polls)
+            except StopIteration:
+                return True
+            clock[0] += timeout
+            if age is not None:
+                wd._last_beat = clock[0] - age
+            return False
+
+    wd._stop = Polls()
+    wd._watch()
+
+
+def durations(wd):
+    return [round(stall.duration_ms) for stall in wd.stalls]
+
+
+def test_steady_beats_are_not_stalls(clock):
+    wd = make(stall_ms=100)
+    watch(wd, clock, [0.0] * 20)
+    assert wd.stalls == [] and wd.reports == 0
+
+
+def test_stall_is_reported_when_it_ends(clock, capsys):
+    wd = make(stall_ms=100)
+    watch(wd, clock, [0.0] * 4 + [None] * 6 + [0.0] * 3)
+    # Seven polls without a beat: 350 ms, less the beat interval
+    assert durations(wd) == [300]
+    assert wd.reports == 1
+    assert "=== stall 300 ms" in wd._log.getvalue()
+    # The stall was sampled while it lasted: this test was on the stack
+    assert "test_stall_is_reported_when_it_ends" in wd._log.getvalue()
+    assert "main loop stalled 300 ms" in capsys.readouterr().err
+
+
+def test_stalled_again_before_we_looked(clock, capsys):
+    wd = make(stall_ms=30)
+    # One beat 40 ms before a poll: the loop came round, then stalled again
+    watch(wd, clock, [0.0, None, None, 0.04, 0.0])
+    assert durations(wd) == [60, 40]
+    assert wd.reports == 2
+
+
+def test_reports_are_rate_limited(clock, capsys):
+    wd = make(stall_ms=100, report_interval_s=1.0)
+    stall = [None] * 4 + [0.0]
+    watch(wd, clock, [0.0] + stall * 3)
+    assert len(wd.stalls) == 3
+    assert wd.reports == 1 and len(wd._suppressed) == 2
+    # The next report after the interval carries the ones in between
+    watch(wd, clock, [0.0] * 20 + stall)
+    assert wd.reports == 2 and wd._suppressed == []
+    assert "plus 2 stall(s) not reported" in wd._log.getvalue()
+
+
+def test_suppressed_stalls_are_flushed(clock, capsys):
+    wd = make(stall_ms=100, report_interval_s=10.0)
+    watch(wd, clock, [0.0] + ([None] * 4 + [0.0]) * 2)
+    wd._flush_suppressed()
+    assert "=== at exit ===" in wd._log.getvalue()
+    assert wd._suppressed == []
+
+
+def test_hang_dump_never_comes_early(clock, monkeypatch):
+    armed = []
+    monkeypatch.setattr(watchdog.faulthandler, "dump_traceback_later",
+                        lambda timeout, file: armed.append((clock[0], timeout)))
+    wd = StallWatchdog(hang_s=10)
+    wd._thread = object()
+    for _ in range(200):
+        clock[0] += 0.1
+        wd.beat()
+        at, timeout = armed[-1]
+        # Were the loop to hang right after this beat, the dump would wait at least hang_s
+        assert at + timeout - clock[0] >= wd.hang_s - 1e-9
+    assert len(armed) == 4
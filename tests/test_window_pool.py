@@ -0,0 +1,88 @@
+import itertools
+
+import pytest
+
+import window_pool
+from window_pool import WindowPool
+
+
+class FakeToplevel:
+    """Enough of ``tk.Toplevel`` for the pool; ``<Destroy>`` fires on ``destroy``."""
+    ids = itertools.count(1)
+
+    def __init__(self, master):
+        self.name = f".!toplevel{next(self.ids)}"
+        self.shown = True
+        self.destroyed = False
+        self.on_destroy = []
+
+    def __str__(self):
+        return self.name
+
+    def withdraw(self):
+        self.shown = False
+
+    def deiconify(self):
+        self.shown = True
+
+    def lift(self):
+        pass
+
+    def protocol(self, name, callback):
+        pass
+
+    def bind(self, sequence, callback, add=None):
+        self.on_destroy.append(callback)
+
+    def destroy(self):
+        self.destroyed = True
+        for callback in self.on_destroy:
+            callback(type("Event", (), {"widget": self})())
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(window_pool.tk, "Toplevel", FakeToplevel)
+    pool = WindowPool(root=None, max_windows=3, max_idle=2)
+    for name in ("notes", "clock"):
+        pool.register(name, build=lambda win: None)
+    return pool
+
+
+def test_closed_windows_are_reused(pool):
+    win = pool.open("notes")
+    pool.close(win)
+    assert not win.shown
+    assert pool.open("notes") is win
+    assert pool.builds == 1 and pool.reuses == 1
+
+
+def test_full_pool_recycles_an_idle_window(pool):
+    a, b, c = pool.open("notes"), pool.open("notes"), pool.open("clock")
+    pool.close(a)
+    d = pool.open("clock")
+    # The idle notes window made room; the open ones were left alone
+    assert a.destroyed and not b.destroyed and not c.destroyed
+    assert pool.owns(d) and d.shown
+    assert pool.evictions == 1 and pool.overflows == 0
+
+
+def test_open_windows_are_never_taken(pool):
+    wins = [pool.open("notes"), pool.open("notes"), pool.open("clock")]
+    extra = pool.open("notes")
+    assert extra not in wins and extra.shown
+    assert all(w.shown and not w.destroyed for w in wins)
+    assert not pool.owns(extra)
+    assert pool.overflows == 1 and pool.evictions == 0
+    assert pool.open_count() == 4
+    # Closing the extra window destroys it instead of pooling it
+    pool.close(extra)
+    assert extra.destroyed
+    assert pool.open_count() == 3
+
+
+def test_idle_windows_per_app_are_capped(pool):
+    wins = [pool.open("notes") for _ in range(3)]
+    for win in wins:
+        pool.close(win)
+    assert [w.destroyed for w in wins] == [True, False, False]
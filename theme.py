@@ -0,0 +1,174 @@
+"""Theme engine: widgets refer to colour roles, not colours.
+
+Colours used to be copied into widgets when they were created, so a theme
+change only reached the few widgets someone remembered to recolour.  With a
+``Theme`` every themed widget option is bound to a role of the palette:
+
+    theme = Theme(root, {"accent": "#0080ff", "desktop": "#003366"})
+    theme.bind(button, bg="accent", fg="accent~text", activebackground="accent~light")
+    theme.set_palette(accent="#ff8000")
+
+* a role spec is ``role`` or ``role~variant``.  The variants (``light``,
+  ``lighter``, ``dark``, ``darker``, ``muted``, ``text``, a readable text
+  colour) are computed once per base colour and cached.
+* ``set_palette`` recolours everything bound to the changed roles in a
+  single batched Tcl script, so a theme switch is one pass and one redraw.
+  Widgets that are gone by then are skipped.
+* ``watch(spec, callback)`` covers things that are not widget options, such
+  as canvas items or ttk styles: the callback gets the resolved colour now
+  and after every change
+* bindings are dropped when their widget is destroyed
+"""
+import itertools
+import time
+
+LIGHT = 0.25
+LIGHTER = 0.5
+DARK = 0.25
+DARKER = 0.5
+
+
+def _mix(rgb, other, amount):
+    return tuple(round(c + (o - c) * amount) for c, o in zip(rgb, other))
+
+
+VARIANTS = {
+    "light": lambda rgb: _mix(rgb, (255, 255, 255), LIGHT),
+    "lighter": lambda rgb: _mix(rgb, (255, 255, 255), LIGHTER),
+    "dark": lambda rgb: _mix(rgb, (0, 0, 0), DARK),
+    "darker": lambda rgb: _mix(rgb, (0, 0, 0), DARKER),
+    "muted": lambda rgb: _mix(rgb, (128, 128, 128), 0.5),
+    # Black or white, whichever reads better on the base colour
+    "text": lambda rgb: (0, 0, 0) if 0.299 * rgb[0] + 0.587 * rgb[1] + 0.114 * rgb[2] > 150 else (255, 255, 255),
+}
+
+
+class Theme:
+    def __init__(self, root, palette):
+        self.root = root
+        self.palette = dict(palette)
+        self._widgets = {}      # widget path -> {option: (role, variant)}
+        self._by_role = {}      # role -> set of widget paths
+        self._watchers = {}     # id -> (role, variant, callback)
+        self._watch_ids = itertools.count()
+        self._specs = {}        # "role~variant" -> (role, variant)
+        self._rgb = {}          # colour -> (r, g, b)
+        self._variants = {}     # (colour, variant) -> "#rrggbb"
+        # Stats
+        self.applies = 0
+        self.last_apply_ms = 0.0
+        self.last_apply_widgets = 0
+
+    # ---------- COLOURS ----------
+    def color(self, spec):
+        """Resolve a role spec against the current palette."""
+        role, variant = self._parse(spec)
+        return self._resolve(role, variant)
+
+    def _parse(self, spec):
+        parsed = self._specs.get(spec)
+        if parsed is None:
+            role, _, variant = spec.partition("~")
+            if role not in self.palette:
+                raise KeyError(f"unknown theme role {role!r}")
+            if variant and variant not in VARIANTS:
+                raise ValueError(f"unknown colour variant {variant!r}")
+            parsed = self._specs[spec] = (role, variant or None)
+        return parsed
+
+    def _resolve(self, role, variant):
+        base = self.palette[role]
+        if variant is None:
+            return base
+        key = (base, variant)
+        color = self._variants.get(key)
+        if color is None:
+            r, g, b = VARIANTS[variant](self._to_rgb(base))
+            color = self._variants[key] = f"#{r:02x}{g:02x}{b:02x}"
+        return color
+
+    def _to_rgb(self, color):
+        rgb = self._rgb.get(color)
+        if rgb is None:
+            if color.startswith("#") and len(color) == 7:
+                rgb = (int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16))
+            else:
+                # Named or short colours: ask Tk (16-bit channels)
+                rgb = tuple(c >> 8 for c in self.root.winfo_rgb(color))
+            self._rgb[color] = rgb
+        return rgb
+
+    # ---------- BINDINGS ----------
+    def bind(self, widget, **options):
+        """Bind widget options to role specs and apply the current colours."""
+        key = str(widget)
+        bound = self._widgets.get(key)
+        if bound is None:
+            bound = self._widgets[key] = {}
+            widget.bind("<Destroy>", lambda e, k=key: self._destroyed(e, k), add="+")
+        for option, spec in options.items():
+            bound[option] = self._parse(spec)
+            self._by_role.setdefault(bound[option][0], set()).add(key)
+        widget.configure(**{option: self._resolve(*parsed) for option, parsed in bound.items()
+                            if option in options})
+        return widget
+
+    def unbind(self, widget):
+        key = str(widget)
+        for role, _ in self._widgets.pop(key, {}).values():
+            self._by_role.get(role, set()).discard(key)
+
+    def watch(self, spec, callback, owner=None):
+        """Call ``callback(colour)`` now and whenever ``spec`` changes colour.
+
+        With ``owner`` the watch ends when that widget is destroyed.
+        """
+        role, variant = self._parse(spec)
+        watch_id = next(self._watch_ids)
+        self._watchers[watch_id] = (role, variant, callback)
+        if owner is not None:
+            key = str(owner)
+            owner.bind("<Destroy>", lambda e: self._owner_destroyed(e, key, watch_id), add="+")
+        callback(self._resolve(role, variant))
+        return watch_id
+
+    def widgets(self):
+        return len(self._widgets)
+
+    def _destroyed(self, event, key):
+        if str(event.widget) == key:
+            self.unbind(event.widget)
+
+    def _owner_destroyed(self, event, key, watch_id):
+        if str(event.widget) == key:
+            self._watchers.pop(watch_id, None)
+
+    # ---------- APPLY ----------
+    def set_palette(self, palette=None, **roles):
+        """Change some roles and recolour everything that uses them in one pass."""
+        changes = dict(palette or {}, **roles)
+        changed = {role for role, color in changes.items() if self.palette.get(role) != color}
+        self.palette.update(changes)
+        if changed:
+            self._apply(changed)
+        return changed
+
+    def _apply(self, roles):
+        start = time.perf_counter()
+        keys = set()
+        for role in roles:
+            keys |= self._by_role.get(role, set())
+        lines = []
+        for key in keys:
+            options = " ".join(f"-{option} {{{self._resolve(*parsed)}}}"
+                               for option, parsed in self._widgets[key].items())
+            # catch: a widget may already be gone before its <Destroy> was handled
+            lines.append(f"catch {{{key} configure {options}}}")
+        if lines:
+            self.root.tk.eval("\n".join(lines))
+        for role, variant, callback in list(self._watchers.values()):
+            if role in roles:
+                callback(self._resolve(role, variant))
+        self.applies += 1
+        self.last_apply_widgets = len(lines)
+        self.last_apply_ms = (time.perf_counter() - start) * 1000
@@ -0,0 +1,228 @@
+"""Callback tracing: which Tk callbacks are slow.
+
+Opt-in instrumentation: set ``OS_TRACE=trace.json`` (or ``OS_TRACE=1`` for
+``os_trace.json``) and every Python callback that Tk calls is timed:
+``command=`` options, ``bind`` handlers, ``after`` callbacks, and each
+``FrameScheduler`` job separately.
+
+* the hook is ``tkinter.CallWrapper``, which every callback registered with
+  Tk goes through, so no simulator code has to change; ``install`` has to
+  run before the app registers its callbacks
+* each call is one tuple (start, duration, kind, handler, widget path)
+  written to a preallocated ring buffer; the slot comes from an
+  ``itertools.count``, so recording takes no lock
+* every handler also gets a latency histogram (quarter-octave buckets) that
+  covers the whole run, not just what is left in the ring
+* ``export(path)`` writes Chrome trace JSON (chrome://tracing, Perfetto);
+  with ``OS_TRACE`` set this happens at exit.  Each top-level window is a
+  track of its own.
+* F12 toggles an overlay with p50/p99 per handler, slowest first
+"""
+import atexit
+import collections
+import itertools
+import json
+import math
+import os
+import time
+import tkinter as tk
+
+import scheduler
+from scheduler import get_scheduler, PRIORITY_LOW
+
+ENV_VAR = "OS_TRACE"
+DEFAULT_PATH = "os_trace.json"
+RING_SIZE = 1 << 16
+BUCKETS_PER_OCTAVE = 4
+OVERLAY_MS = 1000
+OVERLAY_ROWS = 15
+
+_tracer = None
+
+
+def install(app):
+    """Start tracing for ``app`` when ``OS_TRACE`` is set; returns the tracer.
+
+    Call it before the app creates widgets with commands or bindings.
+    """
+    target = os.environ.get(ENV_VAR)
+    if not target:
+        return None
+    tracer = get_tracer()
+    if not tracer.path:
+        tracer.path = DEFAULT_PATH if target == "1" else target
+        atexit.register(tracer.export)
+    if not tracer.patched:
+        tracer.patch()
+        # bind_all covers every root of the interpreter, so once per process
+        app.root.bind_all("<F12>", lambda e: tracer.toggle_overlay(app.root), add="+")
+    app.tracer = tracer
+    return tracer
+
+
+def get_tracer():
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def _is_after(func):
+    # Misc.after wraps the real callback in a closure named callit
+    return getattr(func, "__qualname__", "").endswith("after.<locals>.callit")
+
+
+def _handler_name(func):
+    if _is_after(func):
+        cells = dict(zip(func.__code__.co_freevars, func.__closure__ or ()))
+        try:
+            func = cells["func"].cell_contents
+        except (KeyError, ValueError):
+            pass
+    name = getattr(func, "__qualname__", None) or type(func).__name__
+    module = getattr(func, "__module__", None)
+    return f"{module}.{name}" if module and module.startswith("sim_") else name
+
+
+class Tracer:
+    def __init__(self, size=RING_SIZE):
+        self.size = size
+        self.path = None
+        self.epoch_ns = time.perf_counter_ns()
+        self._ring = [None] * size
+        self._slot = itertools.count()
+        self.recorded = 0
+        self.histograms = collections.defaultdict(collections.Counter)
+        self.patched = False
+        self._overlay = None
+
+    # ---------- RECORDING ----------
+    def record(self, start_ns, duration_ns, kind, name, widget):
+        i = next(self._slot)
+        self._ring[i % self.size] = (start_ns, duration_ns, kind, name, widget)
+        self.recorded = i + 1
+        bucket = int(math.log2(duration_ns) * BUCKETS_PER_OCTAVE) if duration_ns > 1 else 0
+        self.histograms[name][bucket] += 1
+
+    def events(self):
+        """Recorded calls still in the ring, oldest first."""
+        if self.recorded <= self.size:
+            return self._ring[:self.recorded]
+        start = self.recorded % self.size
+        return self._ring[start:] + self._ring[:start]
+
+    @property
+    def dropped(self):
+        return max(0, self.recorded - self.size)
+
+    def patch(self):
+        """Route every Tk callback and scheduler job through ``record``."""
+        if self.patched:
+            return
+        self.patched = True
+        tracer = self
+
+        class TracedCallWrapper(tk.CallWrapper):
+            def __init__(self, func, subst, widget):
+                super().__init__(func, subst, widget)
+                self.name = _handler_name(func)
+                self.kind = "bind" if subst else "after" if _is_after(func) else "command"
+                self.path = str(widget)
+
+            def __call__(self, *args):
+                start = time.perf_counter_ns()
+                try:
+                    return super().__call__(*args)
+                finally:
+                    tracer.record(start, time.perf_counter_ns() - start, self.kind, self.name, self.path)
+
+        run_job = scheduler.FrameScheduler._run
+
+        def traced_run(sched, job, now):
+            start = time.perf_counter_ns()
+            try:
+                return run_job(sched, job, now)
+            finally:
+                tracer.record(start, time.perf_counter_ns() - start, "job",
+                              _handler_name(job.callback), str(sched.root))
+
+        tk.CallWrapper = TracedCallWrapper
+        scheduler.FrameScheduler._run = traced_run
+
+    # ---------- STATISTICS ----------
+    def percentiles(self, name, pcts=(50, 99)):
+        """Latency percentiles of ``name`` in ms, from its histogram."""
+        histogram = self.histograms.get(name)
+        if not histogram:
+            return [0.0] * len(pcts)
+        total = sum(histogram.values())
+        buckets = sorted(histogram.items())
+        result = []
+        for pct in pcts:
+            target = total * pct / 100
+            seen = 0
+            for bucket, count in buckets:
+                seen += count
+                if seen >= target:
+                    break
+            # Geometric middle of the bucket
+            result.append(2 ** ((bucket + 0.5) / BUCKETS_PER_OCTAVE) / 1e6)
+        return result
+
+    def summary(self):
+        """``(name, calls, p50 ms, p99 ms)`` per handler, slowest p99 first."""
+        rows = []
+        for name, histogram in list(self.histograms.items()):
+            p50, p99 = self.percentiles(name)
+            rows.append((name, sum(histogram.values()), p50, p99))
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return rows
+
+    # ---------- EXPORT ----------
+    def export(self, path=None):
+        """Write the ring as Chrome trace JSON; returns the path."""
+        path = path or self.path or DEFAULT_PATH
+        pid = os.getpid()
+        tracks = {}
+        trace = []
+        for start, duration, kind, name, widget in self.events():
+            top = widget.split(".")[1] if widget != "." else ""
+            window = "." + top if top.startswith("!toplevel") else "."
+            tid = tracks.setdefault(window, len(tracks) + 1)
+            trace.append({"name": name, "cat": kind, "ph": "X", "pid": pid, "tid": tid,
+                          "ts": (start - self.epoch_ns) / 1000, "dur": duration / 1000,
+                          "args": {"widget": widget}})
+        for window, tid in tracks.items():
+            trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                          "args": {"name": window}})
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms",
+                       "otherData": {"recorded": self.recorded, "dropped": self.dropped}}, fh)
+        return path
+
+    # ---------- OVERLAY ----------
+    def toggle_overlay(self, root):
+        if self._overlay is not None and self._overlay.winfo_exists():
+            self._overlay.destroy()
+            self._overlay = None
+            return
+        overlay = self._overlay = tk.Toplevel(root)
+        overlay.title("Callback latency")
+        overlay.attributes("-topmost", True)
+        text = tk.Label(overlay, font=("Courier", 10), justify="left", anchor="nw",
+                        bg="#111111", fg="#d0ffd0")
+        text.pack(fill="both", expand=True)
+        tk.Button(overlay, text="Export trace", command=lambda: self._export_from(text)).pack(fill="x")
+
+        def refresh():
+            lines = [f"{'handler':<48} {'calls':>7} {'p50 ms':>8} {'p99 ms':>8}"]
+            for name, calls, p50, p99 in self.summary()[:OVERLAY_ROWS]:
+                lines.append(f"{name[-48:]:<48} {calls:>7} {p50:>8.2f} {p99:>8.2f}")
+            lines.append(f"\n{self.recorded} calls recorded, {self.dropped} rotated out of the ring")
+            text.configure(text="\n".join(lines))
+        refresh()
+        get_scheduler(overlay).every(OVERLAY_MS, refresh, priority=PRIORITY_LOW, owner=overlay)
+
+    def _export_from(self, label):
+        path = self.export()
+        label.configure(text=label.cget("text") + f"\nwritten to {os.path.abspath(path)}")
@@ -0,0 +1,217 @@
+"""Sprite physics for the TV animation engine.
+
+``SpriteField`` keeps every animated canvas item of a channel (position,
+velocity, size) and moves/bounces all of them in one step.  ``push()`` then
+updates the canvas in one batched Tcl call: sprites are tagged by velocity,
+so a frame is one ``move`` per distinct velocity plus a retag for the few
+sprites that bounced, instead of one call per shape.  Several fields can
+share a canvas as long as each has its own ``tag``.
+
+A channel has a handful of shapes, and for those plain Python lists are
+faster than NumPy (and NumPy is never imported).  Once a field reaches
+``VECTOR_MIN_SPRITES`` it moves its sprites into NumPy arrays and steps
+them vectorized, if NumPy is installed.
+"""
+import math
+
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+
+VECTOR_MIN_SPRITES = 64    # below this plain Python is faster than NumPy
+
+
+class SpriteField:
+    def __init__(self, width, height, capacity=16, tag="sprite"):
+        self.width = width
+        self.height = height
+        self.tag = tag
+        self.count = 0
+        self._capacity = capacity
+        self._groups = {}
+        self._members = {}
+        self._unpushed_steps = 0
+        self._plain()
+
+    def __len__(self):
+        return self.count
+
+    # ---------- POPULATION ----------
+    def add(self, item_id, x, y, w, h, dx, dy):
+        if not self._vector:
+            self._ids.append(int(item_id))
+            self._pos.append([float(x), float(y)])
+            self._vel.append([float(dx), float(dy)])
+            self._size.append((float(w), float(h)))
+            self._tagged.append(None)
+            self.count += 1
+            if self.count >= VECTOR_MIN_SPRITES and np:
+                self._vectorize()
+            return
+        if self.count == len(self._ids):
+            self._grow(max(16, self.count * 2))
+        i = self.count
+        self._ids[i] = item_id
+        self._pos[i] = (x, y)
+        self._vel[i] = (dx, dy)
+        self._size[i] = (w, h)
+        self._tagged[i] = np.nan
+        self.count += 1
+
+    def add_many(self, ids, pos, size, vel):
+        """Bulk version of ``add``; arguments are array-likes of shape (n,) / (n, 2)."""
+        if not self._vector and (self.count + len(ids) < VECTOR_MIN_SPRITES or not np):
+            for item_id, (x, y), (w, h), (dx, dy) in zip(ids, pos, size, vel):
+                self.add(item_id, x, y, w, h, dx, dy)
+            return
+        if not self._vector:
+            self._vectorize()
+        ids = np.asarray(ids, dtype=np.int64)
+        n = len(ids)
+        if self.count + n > len(self._ids):
+            self._grow(max(16, (self.count + n) * 2))
+        s = slice(self.count, self.count + n)
+        self._ids[s] = ids
+        self._pos[s] = pos
+        self._size[s] = size
+        self._vel[s] = vel
+        self._tagged[s] = np.nan
+        self.count += n
+
+    def clear(self):
+        """Forget all sprites (the caller deletes their canvas items)."""
+        self.count = 0
+        self._members.clear()
+        self._unpushed_steps = 0
+        self._plain()
+
+    def _plain(self):
+        self._vector = False
+        self._ids = []
+        self._pos = []
+        self._vel = []
+        self._size = []
+        # Velocity each item is currently tagged with on the canvas (None: untagged)
+        self._tagged = []
+
+    def _vectorize(self):
+        n = self.count
+        ids, pos, vel, size, tagged = self._ids, self._pos, self._vel, self._size, self._tagged
+        capacity = max(self._capacity, n * 2)
+        self._vector = True
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._pos = np.zeros((capacity, 2), dtype=np.float64)
+        self._vel = np.zeros((capacity, 2), dtype=np.float64)
+        self._size = np.zeros((capacity, 2), dtype=np.float64)
+        # Same as above, NaN: untagged
+        self._tagged = np.full((capacity, 2), np.nan)
+        if n:
+            self._ids[:n] = ids
+            self._pos[:n] = pos
+            self._vel[:n] = vel
+            self._size[:n] = size
+            self._tagged[:n] = [(math.nan, math.nan) if t is None else t for t in tagged]
+
+    def _grow(self, capacity):
+        for name in ("_ids", "_pos", "_vel", "_size", "_tagged"):
+            old = getattr(self, name)
+            new = np.full((capacity,) + old.shape[1:], np.nan if name == "_tagged" else 0, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    # ---------- SIMULATION ----------
+    def step(self):
+        """Advance one frame: reflect anything that would leave the field, then move."""
+        n = self.count
+        if not n:
+            return
+        self._unpushed_steps += 1
+        # Same rule the per-object loop used: flip an axis when the next step
+        # would cross the wall on that axis, then move with the new velocity.
+        if not self._vector:
+            width, height = self.width, self.height
+            for pos, vel, (w, h) in zip(self._pos, self._vel, self._size):
+                x = pos[0] + vel[0]
+                if x < 0 or x + w > width:
+                    vel[0] = -vel[0]
+                y = pos[1] + vel[1]
+                if y < 0 or y + h > height:
+                    vel[1] = -vel[1]
+                pos[0] += vel[0]
+                pos[1] += vel[1]
+            return
+        pos = self._pos[:n]
+        vel = self._vel[:n]
+        nxt = pos + vel
+        far = nxt + self._size[:n]
+        vel[:, 0] = np.where((nxt[:, 0] < 0) | (far[:, 0] > self.width), -vel[:, 0], vel[:, 0])
+        vel[:, 1] = np.where((nxt[:, 1] < 0) | (far[:, 1] > self.height), -vel[:, 1], vel[:, 1])
+        pos += vel
+
+    def coords(self):
+        """Return ``x1, y1, x2, y2`` rows: a list, or an (n, 4) array once vectorized."""
+        n = self.count
+        if not self._vector:
+            return [[x, y, x + w, y + h] for (x, y), (w, h) in zip(self._pos, self._size)]
+        return np.hstack((self._pos[:n], self._pos[:n] + self._size[:n]))
+
+    # ---------- CANVAS ----------
+    def script(self, canvas_path):
+        """Build the Tcl script that brings the canvas in sync with the field."""
+        n = self.count
+        if not n:
+            return ""
+        lines = self._retag(canvas_path)
+        if self._unpushed_steps == 1:
+            # Exactly one step since the last push: every sprite moved by its velocity
+            for (dx, dy), tag in self._groups.items():
+                if self._members.get(tag) and (dx or dy):
+                    lines.append(f"{canvas_path} move {tag} {dx!r} {dy!r}")
+        elif self._unpushed_steps:
+            lines.append(self._coords_script(canvas_path))
+        self._unpushed_steps = 0
+        return "\n".join(lines)
+
+    def push(self, canvas):
+        """Apply all pending movement to ``canvas`` in one batched Tcl call."""
+        script = self.script(str(canvas))
+        if script:
+            canvas.tk.eval(script)
+
+    def _retag(self, canvas_path):
+        n = self.count
+        if not self._vector:
+            changes = [(item, old, tuple(vel)) for item, old, vel in zip(self._ids, self._tagged, self._vel)
+                       if old is None or old[0] != vel[0] or old[1] != vel[1]]
+            self._tagged[:] = [tuple(vel) for vel in self._vel]
+        else:
+            vel = self._vel[:n]
+            tagged = self._tagged[:n]
+            changed = np.flatnonzero(~(vel == tagged).all(axis=1))
+            changes = list(zip(self._ids[changed].tolist(), tagged[changed].tolist(), vel[changed].tolist()))
+            tagged[changed] = vel[changed]
+        lines = []
+        groups, members = self._groups, self._members
+        for item, old, new in changes:
+            if old is not None and old[0] == old[0]:  # not NaN: drop the previous velocity tag
+                old_tag = groups[(old[0], old[1])]
+                members[old_tag] -= 1
+                lines.append(f"{canvas_path} dtag {item} {old_tag}")
+            key = (new[0], new[1])
+            tag = groups.get(key)
+            if tag is None:
+                tag = groups[key] = f"{self.tag}_v{len(groups)}"
+            members[tag] = members.get(tag, 0) + 1
+            lines.append(f"{canvas_path} addtag {tag} withtag {item}")
+        return lines
+
+    def _coords_script(self, canvas_path):
+        n = self.count
+        if not self._vector:
+            return "".join(f"{canvas_path} coords {item} {round(x1)} {round(y1)} {round(x2)} {round(y2)}\n"
+                           for item, (x1, y1, x2, y2) in zip(self._ids, self.coords()))
+        rows = np.empty((n, 5), dtype=np.int64)
+        rows[:, 0] = self._ids[:n]
+        rows[:, 1:] = np.rint(self.coords())
+        template = f"{canvas_path} coords %d %d %d %d %d\n"
+        return (template * n) % tuple(rows.ravel().tolist())
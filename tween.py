@@ -0,0 +1,131 @@
+"""Time-based tweens on the frame scheduler.
+
+Slides and fades used to be ``for`` loops of ``root.update()`` and
+``time.sleep``: the UI froze until they finished, and a slow machine made
+them last longer instead of looking choppier.  A ``Tween`` runs on the
+event loop instead:
+
+    slide = animate(frame, 300, lambda y: frame.place_configure(rely=y),
+                    start=0.0, end=-1.0, easing="ease_in")
+    slide.then(frame.place_forget)
+
+* progress comes from the clock, not from a frame counter.  Each frame
+  applies the value for the current time, so a late frame is skipped, not
+  replayed, and the tween ends on time with ``end`` applied exactly.
+* ``easing`` is the name of a curve in ``EASINGS`` or any ``f(t) -> t``
+* ``cancel()`` stops where it is; ``finish()`` jumps to the end value and
+  runs the ``then`` callbacks.  A tween whose ``owner`` is destroyed is
+  cancelled with it.
+* ``then(callback)`` runs ``callback()`` when the tween completes (not when
+  it is cancelled).  Start the next tween from it to chain transitions.
+"""
+import time
+
+from scheduler import get_scheduler, FRAME_MS, PRIORITY_HIGH
+
+
+def _ease_out_back(t, s=1.70158):
+    t -= 1
+    return t * t * ((s + 1) * t + s) + 1
+
+
+EASINGS = {
+    "linear": lambda t: t,
+    "ease_in": lambda t: t * t * t,
+    "ease_out": lambda t: 1 - (1 - t) ** 3,
+    "ease_in_out": lambda t: 4 * t * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 3 / 2,
+    "ease_out_back": _ease_out_back,
+}
+
+
+def lerp_color(start, end):
+    """``f(t)`` for ``t`` in 0..1 that mixes two ``#rrggbb`` colours."""
+    a = [int(start[i:i + 2], 16) for i in (1, 3, 5)]
+    b = [int(end[i:i + 2], 16) for i in (1, 3, 5)]
+    return lambda t: "#%02x%02x%02x" % tuple(round(x + (y - x) * t) for x, y in zip(a, b))
+
+
+class Tween:
+    def __init__(self, scheduler, duration_ms, apply, start=0.0, end=1.0, easing="ease_out",
+                 owner=None, interval_ms=FRAME_MS):
+        self.duration_ms = max(1.0, float(duration_ms))
+        self.apply = apply
+        self.start = start
+        self.end = end
+        self.easing = EASINGS[easing] if isinstance(easing, str) else easing
+        self.interval_ms = interval_ms
+        self.started = time.perf_counter()
+        self.cancelled = False
+        self.finished = False
+        self._then = []
+        # Stats
+        self.frames = 0
+        self.apply(start)
+        self._job = scheduler.every(interval_ms, self._step, priority=PRIORITY_HIGH, owner=owner)
+
+    @property
+    def active(self):
+        # The job also ends when the owner is destroyed
+        return not (self.cancelled or self.finished) and self._job.active
+
+    @property
+    def dropped_frames(self):
+        """Frames that were due but never drawn because the loop was busy."""
+        expected = int(min(self.duration_ms, self._elapsed_ms()) // self.interval_ms)
+        return max(0, expected - self.frames)
+
+    def value(self, t):
+        return self.start + (self.end - self.start) * self.easing(t)
+
+    def then(self, callback):
+        if self.finished:
+            callback()
+        elif not self.cancelled:
+            self._then.append(callback)
+        return self
+
+    def cancel(self):
+        if not self.active:
+            return
+        self.cancelled = True
+        self._job.cancel()
+
+    def finish(self):
+        """Apply the end value now and complete as if the time had run out."""
+        if not self.active:
+            return
+        self._job.cancel()
+        self._complete()
+
+    def _elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def _step(self):
+        t = self._elapsed_ms() / self.duration_ms
+        if t >= 1.0:
+            self._complete()
+            return False
+        self.frames += 1
+        self.apply(self.value(t))
+        return None
+
+    def _complete(self):
+        self.frames += 1
+        self.finished = True
+        self.apply(self.end)
+        callbacks, self._then = self._then, []
+        for callback in callbacks:
+            callback()
+
+
+def animate(widget, duration_ms, apply, start=0.0, end=1.0, easing="ease_out", owner=None):
+    """Start a tween on ``widget``'s scheduler, owned by ``owner`` (default: ``widget``)."""
+    return Tween(get_scheduler(widget), duration_ms, apply, start, end, easing,
+                 owner=widget if owner is None else owner)
+
+
+def fade(widget, duration_ms, start_color, end_color, option="bg", easing="linear", owner=None):
+    """Tween ``widget``'s colour ``option`` from one ``#rrggbb`` colour to another."""
+    mix = lerp_color(start_color, end_color)
+    return animate(widget, duration_ms, lambda t: widget.configure({option: mix(t)}),
+                   easing=easing, owner=owner)
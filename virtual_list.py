@@ -0,0 +1,110 @@
+"""Virtualized list widget.
+
+A plain Listbox holds one Tcl string per row, so filling it with a large
+collection takes one ``insert`` per entry and keeps all of them in memory.
+``VirtualList`` keeps the rows on the Python side and only puts the rows
+that fit in the window into its Listbox; the scrollbar and mouse wheel move a
+window over ``rows`` and re-render at most once per scheduler tick.
+Rows for which ``alive(row)`` is false are skipped when rendering, so a
+store can hand out views that still hold entries deleted since.
+
+    view = VirtualList(parent, render=lambda item_id: store.get(item_id).name,
+                       alive=store.__contains__)
+    view.set_rows(store.view())
+"""
+import tkinter as tk
+import tkinter.font as tkfont
+
+from scheduler import get_scheduler, PRIORITY_HIGH
+
+
+class VirtualList(tk.Frame):
+    def __init__(self, parent, render=str, alive=None, **listbox_options):
+        super().__init__(parent)
+        self.render = render
+        self.alive = alive
+        self.rows = []
+        self.top = 0
+        self.selected = None   # index into rows
+        self._shown = []       # index into rows of each Listbox line
+        self._job = None
+        self.listbox = tk.Listbox(self, activestyle="none", exportselection=False, **listbox_options)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self._scroll_command)
+        self.scrollbar.pack(side="right", fill="y")
+        self.listbox.pack(side="left", fill="both", expand=True)
+        font = tkfont.Font(root=self, font=self.listbox.cget("font"))
+        self._line = font.metrics("linespace") + 2 * int(self.listbox.cget("selectborderwidth"))
+        self.listbox.bind("<Configure>", lambda e: self._schedule())
+        self.listbox.bind("<<ListboxSelect>>", self._on_select)
+        self.listbox.bind("<MouseWheel>", lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.listbox.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll(3))
+
+    # ---------- DATA ----------
+    def set_rows(self, rows):
+        self.rows = rows
+        self.selected = None
+        self.top = min(self.top, max(0, len(rows) - self.page()))
+        self._schedule()
+
+    def selection(self):
+        if self.selected is None or self.selected >= len(self.rows):
+            return None
+        row = self.rows[self.selected]
+        if self.alive is not None and not self.alive(row):
+            return None
+        return row
+
+    def page(self):
+        return max(1, self.listbox.winfo_height() // self._line)
+
+    # ---------- SCROLLING ----------
+    def scroll(self, rows):
+        self.scroll_to(self.top + rows)
+
+    def scroll_to(self, top):
+        top = max(0, min(int(top), len(self.rows) - self.page()))
+        if top != self.top:
+            self.top = top
+            self._schedule()
+
+    def _scroll_command(self, command, amount, unit=None):
+        if command == "moveto":
+            self.scroll_to(float(amount) * len(self.rows))
+        elif unit == "pages":
+            self.scroll(int(amount) * self.page())
+        else:
+            self.scroll(int(amount))
+
+    # ---------- RENDER ----------
+    def _schedule(self):
+        if self._job is None:
+            self._job = get_scheduler(self).after(0, self._render, priority=PRIORITY_HIGH, owner=self)
+
+    def _render(self):
+        self._job = None
+        page = self.page()
+        rows, alive = self.rows, self.alive
+        if alive is None:
+            shown = list(range(self.top, min(len(rows), self.top + page + 1)))
+        else:
+            shown = []
+            index = self.top
+            while index < len(rows) and len(shown) <= page:
+                if alive(rows[index]):
+                    shown.append(index)
+                index += 1
+        self._shown = shown
+        texts = [self.render(rows[index]) for index in shown]
+        self.listbox.delete(0, "end")
+        if texts:
+            self.listbox.insert(0, *texts)
+        if self.selected in shown:
+            self.listbox.selection_set(shown.index(self.selected))
+        total = len(self.rows) or 1
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + page) / total))
+
+    def _on_select(self, event):
+        picked = self.listbox.curselection()
+        if picked and picked[0] < len(self._shown):
+            self.selected = self._shown[picked[0]]
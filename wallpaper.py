@@ -0,0 +1,302 @@
+"""Image wallpapers, decoded and scaled off the main thread.
+
+``Wallpaper(frame).show(path)`` puts an image behind the frame's children.
+The work that used to be impossible or would stall the main loop happens on
+one worker thread:
+
+* the image is decoded and scaled to cover the screen (Pillow; JPEGs are
+  decoded at reduced size with ``draft``), then centre-cropped in the same
+  resample
+* the result is kept as binary PPM, which Tk's photo reader takes as raw
+  RGB rows, so handing it to Tk is one parse-and-copy on the main thread
+* results are cached by (path, mtime, resolution) in memory (LRU, capped
+  in bytes) and on disk under ``$OS_SETTINGS_DIR/wallpapers``.  Boots and
+  switches back to a known wallpaper skip decoding, and a memory hit is
+  shown right away.
+* the worker hands the result to the main thread through the session's
+  ``Dispatcher``; nothing polls while no image is loading
+* a newer ``show`` on the same wallpaper replaces an older one that is
+  still in flight; the stale result is never shown
+
+Without Pillow only PNG/GIF/PPM files work.  Tk decodes them on the main
+thread and they are only shrunk by whole factors.
+"""
+import collections
+import os
+import queue
+import threading
+import tkinter as tk
+
+from lazy import lazy_import
+from dispatch import get_dispatcher
+from settings_store import settings_dir
+
+Image = lazy_import("PIL.Image")
+# Only needed for the disk cache, which the first wallpaper touches
+hashlib = lazy_import("hashlib")
+
+MEMORY_BYTES = 96 << 20
+DISK_FILES = 32
+TK_FORMATS = (".png", ".gif", ".ppm", ".pgm")
+FILETYPES = [("Images", "*.png *.jpg *.jpeg *.gif *.bmp *.webp *.ppm"), ("All files", "*.*")]
+
+
+# ---------- CACHE ----------
+class WallpaperCache:
+    """PPM bytes by key: an LRU in memory in front of a directory on disk."""
+
+    def __init__(self, directory=None, memory_bytes=MEMORY_BYTES, disk_files=DISK_FILES):
+        self.directory = directory or os.path.join(settings_dir(), "wallpapers")
+        self.memory_bytes = memory_bytes
+        self.disk_files = disk_files
+        self._memory = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        # Stats
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(path, size):
+        """Cache key for ``path`` at ``size``; None if the file is missing."""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        return (os.path.abspath(path), mtime, size[0], size[1])
+
+    def get_memory(self, key):
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+            return data
+
+    def get_disk(self, key):
+        try:
+            with open(self._file(key), "rb") as fh:
+                data = fh.read()
+        except OSError:
+            return None
+        self.disk_hits += 1
+        self.put_memory(key, data)
+        return data
+
+    def put(self, key, data):
+        self.put_memory(key, data)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._file(key)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+            self._prune()
+        except OSError:
+            pass  # the disk cache is best-effort
+
+    def put_memory(self, key, data):
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._memory[key] = data
+            self._size += len(data)
+            while self._size > self.memory_bytes and len(self._memory) > 1:
+                _, dropped = self._memory.popitem(last=False)
+                self._size -= len(dropped)
+
+    def _file(self, key):
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.ppm")
+
+    def _prune(self):
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith(".ppm")]
+        if len(entries) <= self.disk_files:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.disk_files]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+# ---------- DECODING ----------
+def render_ppm(path, size):
+    """Decode ``path`` and scale it to cover ``size`` (centre crop); binary PPM bytes."""
+    width, height = size
+    with Image.open(path) as img:
+        img.draft("RGB", (width, height))   # JPEG: let the decoder downscale for free
+        img = img.convert("RGB")
+        # Crop box in source pixels with the target's aspect ratio, resampled in one go
+        scale = max(width / img.width, height / img.height)
+        crop_w, crop_h = width / scale, height / scale
+        left, top = (img.width - crop_w) / 2, (img.height - crop_h) / 2
+        img = img.resize((width, height), Image.BILINEAR, box=(left, top, left + crop_w, top + crop_h))
+        return b"P6 %d %d 255\n" % (width, height) + img.tobytes()
+
+
+class Request:
+    __slots__ = ("path", "size", "key", "on_done", "data", "raw", "error", "done", "cancelled")
+
+    def __init__(self, path, size, key, on_done=None):
+        self.path = path
+        self.size = size
+        self.key = key
+        self.on_done = on_done   # called on the worker thread once loaded
+        self.data = None     # PPM bytes, scaled and cropped
+        self.raw = None      # file bytes for Tk to decode (no Pillow)
+        self.error = None
+        self.done = False
+        self.cancelled = False
+
+
+class Loader:
+    """One worker thread that serves every wallpaper in the process."""
+
+    def __init__(self, cache=None):
+        self.cache = cache or WallpaperCache()
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, path, size, on_done=None):
+        """Load ``path`` at ``size``.
+
+        A request that can be answered right away (missing file, memory hit)
+        is returned already ``done``; ``on_done`` is only called for the others,
+        on the worker thread, cancelled or not.
+        """
+        request = Request(path, size, self.cache.key(path, size), on_done)
+        if request.key is None:
+            request.error = f"Cannot open {path}"
+            request.done = True
+            return request
+        request.data = self.cache.get_memory(request.key)
+        if request.data is not None:
+            request.done = True
+            return request
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="wallpaper", daemon=True)
+                self._thread.start()
+        self._queue.put(request)
+        return request
+
+    def _run(self):
+        while True:
+            request = self._queue.get()
+            if not request.cancelled:
+                try:
+                    self._load(request)
+                except Exception as exc:
+                    request.error = f"Cannot load {os.path.basename(request.path)}: {exc}"
+            request.done = True
+            if request.on_done is not None:
+                request.on_done(request)
+
+    def _load(self, request):
+        data = self.cache.get_disk(request.key)
+        if data is None:
+            if not Image:
+                if not request.path.lower().endswith(TK_FORMATS):
+                    raise ValueError("this image format needs Pillow")
+                with open(request.path, "rb") as fh:
+                    request.raw = fh.read()
+                return
+            self.cache.misses += 1
+            data = render_ppm(request.path, request.size)
+            self.cache.put(request.key, data)
+        request.data = data
+
+
+_loader = None
+
+
+def get_loader():
+    global _loader
+    if _loader is None:
+        _loader = Loader()
+    return _loader
+
+
+def screen_size(widget):
+    return (widget.winfo_screenwidth(), widget.winfo_screenheight())
+
+
+def prefetch(widget, path):
+    """Start loading ``path`` at screen size (e.g. during boot) so ``show`` finds it cached."""
+    return get_loader().submit(path, screen_size(widget))
+
+
+# ---------- WIDGET ----------
+class Wallpaper:
+    """An image layer behind ``frame``'s other children."""
+
+    def __init__(self, frame, on_error=None):
+        self.frame = frame
+        self.on_error = on_error
+        self.path = None
+        self.photo = None
+        self.label = None
+        self._request = None
+
+    def show(self, path, size=None):
+        """Load ``path`` scaled to ``size`` (default: the screen) and show it when ready."""
+        if size is None:
+            size = screen_size(self.frame)
+        if self._request is not None:
+            self._request.cancelled = True
+        self.path = path
+        dispatcher = get_dispatcher(self.frame)
+        dispatcher.hold()
+        self._request = get_loader().submit(path, size,
+                                            lambda r: dispatcher.post(self._loaded, dispatcher, r))
+        if self._request.done:
+            dispatcher.release()
+            self._finish()
+
+    def clear(self):
+        if self._request is not None:
+            self._request.cancelled = True
+            self._request = None
+        self.path = None
+        if self.label is not None:
+            self.label.destroy()
+            self.label = None
+        self.photo = None
+
+    def _loaded(self, dispatcher, request):
+        dispatcher.release()
+        if request is self._request and self.frame.winfo_exists():
+            self._finish()
+
+    def _finish(self):
+        request, self._request = self._request, None
+        if request.error is not None:
+            self.path = None
+            if self.on_error is not None:
+                self.on_error(request.error)
+            return
+        if request.data is not None:
+            photo = tk.PhotoImage(master=self.frame, data=request.data, format="PPM")
+        else:
+            photo = tk.PhotoImage(master=self.frame, data=request.raw)
+            factor = max(1, min(photo.width() // request.size[0], photo.height() // request.size[1]))
+            if factor > 1:
+                photo = photo.subsample(factor)
+        self._ensure_label()
+        self.label.configure(image=photo)
+        self.photo = photo   # the previous image is released here
+
+    def _ensure_label(self):
+        if self.label is not None:
+            return
+        self.label = tk.Label(self.frame, bd=0, highlightthickness=0)
+        self.label.place(x=0, y=0, relwidth=1, relheight=1)
+        self.label.lower()
+        # Clicks on the wallpaper behave like clicks on the frame itself
+        self.label.bindtags((str(self.label), str(self.frame)) + self.label.bindtags()[1:])
@@ -0,0 +1,212 @@
+"""Event-loop stall watchdog: where the main loop got stuck.
+
+Opt-in instrumentation: set ``OS_WATCHDOG=stalls.log`` (or ``OS_WATCHDOG=1``
+for ``os_stalls.log``).  A heartbeat job on the Tk root's scheduler records
+when the loop last came round; a background thread checks on it and, once
+the loop has been quiet for ``STALL_MS``, samples the main thread's Python
+stack with ``sys._current_frames`` until it is back.
+
+* one report per stall, written when the stall ends: its length and the
+  stacks that were sampled, the most frequent first.  That is where the time
+  went, not just where the handler started.
+* reports are rate-limited to one per ``REPORT_INTERVAL_S``; stalls in
+  between are counted and summed up in the next report, so a screen that
+  janks every second cannot fill the disk overnight
+* a real hang never ends, so ``faulthandler`` is kept armed as well: if the
+  heartbeat stops for ``HANG_S`` it dumps every thread to the same log, even
+  when the main thread holds the GIL in C code and the watchdog thread
+  cannot run.  It is only re-armed every ``HANG_S / 2``, so the dump comes
+  between ``HANG_S`` and 1.5 x ``HANG_S`` after the last beat, never sooner.
+* modal dialogs (``messagebox``) run a nested event loop, which keeps the
+  heartbeat going; only the handler's own work counts as a stall
+
+The heartbeat wakes the loop every ``HEARTBEAT_MS``, so this is for
+diagnostic sessions only.
+"""
+import atexit
+import collections
+import faulthandler
+import os
+import sys
+import threading
+import time
+import traceback
+
+from scheduler import get_scheduler, PRIORITY_HIGH
+
+ENV_VAR = "OS_WATCHDOG"
+DEFAULT_PATH = "os_stalls.log"
+HEARTBEAT_MS = 50
+STALL_MS = 250
+HANG_S = 10
+REPORT_INTERVAL_S = 10
+MAX_SAMPLES = 50
+MAX_STACKS = 3
+
+_watchdog = None
+
+
+def install(app):
+    """Start the watchdog for ``app`` when ``OS_WATCHDOG`` is set; returns it.
+
+    All sessions of a process share one watchdog; its heartbeat runs on the
+    Tk root, whose scheduler is never paused.
+    """
+    target = os.environ.get(ENV_VAR)
+    if not target:
+        return None
+    watchdog = get_watchdog()
+    if watchdog.path is None:
+        watchdog.start(DEFAULT_PATH if target == "1" else target)
+        root = app.root._root()
+        get_scheduler(root).every(HEARTBEAT_MS, watchdog.beat, priority=PRIORITY_HIGH, owner=root)
+        root.bind("<Destroy>", lambda e: str(e.widget) == "." and watchdog.stop(), add="+")
+        atexit.register(watchdog.stop)
+    app.watchdog = watchdog
+    return watchdog
+
+
+def get_watchdog():
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = StallWatchdog()
+    return _watchdog
+
+
+class Stall:
+    __slots__ = ("started", "duration_ms", "samples")
+
+    def __init__(self, started):
+        self.started = started          # time.time() of the last beat before it
+        self.duration_ms = 0.0
+        self.samples = collections.Counter()
+
+    def describe(self):
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started))
+        return f"{self.duration_ms:.0f} ms at {when}"
+
+
+class StallWatchdog:
+    def __init__(self, stall_ms=STALL_MS, hang_s=HANG_S, report_interval_s=REPORT_INTERVAL_S):
+        self.stall_ms = stall_ms
+        self.hang_s = hang_s
+        self.report_interval_s = report_interval_s
+        self.path = None
+        self.thread_id = None
+        self._log = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._last_beat = time.monotonic()
+        self._last_wall = time.time()
+        self._armed_at = 0.0
+        self._last_report = float("-inf")
+        self._suppressed = []
+        # Stats
+        self.beats = 0
+        self.stalls = []
+        self.reports = 0
+
+    # ---------- MAIN THREAD ----------
+    def start(self, path, thread_id=None):
+        """Watch the calling thread (the one running the Tk loop)."""
+        self.path = path
+        self.thread_id = thread_id or threading.get_ident()
+        self._log = open(path, "a", encoding="utf-8", buffering=1)
+        self._stop.clear()
+        self.beat()
+        self._thread = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def beat(self):
+        if self._thread is None:
+            return
+        now = time.monotonic()
+        self._last_beat = now
+        self._last_wall = time.time()
+        self.beats += 1
+        # Re-arming starts a new faulthandler thread, so only do it every half
+        # hang; the timeout covers the beats until the next re-arm as well
+        rearm_s = self.hang_s / 2
+        if now - self._armed_at >= rearm_s:
+            self._armed_at = now
+            faulthandler.dump_traceback_later(self.hang_s + rearm_s, file=self._log)
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=1)
+        self._thread = None
+        faulthandler.cancel_dump_traceback_later()
+        self._flush_suppressed()
+        self._log.close()
+
+    # ---------- WATCHDOG THREAD ----------
+    def _watch(self):
+        poll = HEARTBEAT_MS / 1000
+        stall = None
+        while not self._stop.wait(poll):
+            beat = self._last_beat
+            quiet_ms = (time.monotonic() - beat) * 1000
+            if quiet_ms < self.stall_ms:
+                if stall is not None:
+                    # Back: the stall lasted from the beat before it to the one after
+                    stall.duration_ms = max(stall.duration_ms, (self._last_beat - stall_beat) * 1000 - HEARTBEAT_MS)
+                    self._finish(stall)
+                    stall = None
+                continue
+            if stall is None:
+                stall, stall_beat = Stall(self._last_wall), beat
+            elif beat != stall_beat:
+                # Came round and stalled again before we looked
+                stall.duration_ms = (beat - stall_beat) * 1000 - HEARTBEAT_MS
+                self._finish(stall)
+                stall, stall_beat = Stall(self._last_wall), beat
+            stall.duration_ms = quiet_ms
+            if sum(stall.samples.values()) < MAX_SAMPLES:
+                self._sample(stall)
+
+    def _sample(self, stall):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        # No source lookups here; lines are read only for what gets reported
+        stack = traceback.StackSummary.extract(traceback.walk_stack(frame), lookup_lines=False)
+        stall.samples[tuple((f.filename, f.lineno, f.name) for f in stack)] += 1
+
+    def _finish(self, stall):
+        self.stalls.append(stall)
+        now = time.monotonic()
+        if now - self._last_report < self.report_interval_s:
+            self._suppressed.append(stall)
+            return
+        self._last_report = now
+        self._report(stall)
+
+    def _report(self, stall):
+        self.reports += 1
+        lines = [f"=== stall {stall.describe()} ==="]
+        total = sum(stall.samples.values())
+        for stack, count in stall.samples.most_common(MAX_STACKS):
+            lines.append(f"-- {count} of {total} samples, innermost call first:")
+            summary = traceback.StackSummary.from_list(
+                [(filename, lineno, name, None) for filename, lineno, name in stack])
+            lines.extend(line.rstrip("\n") for line in summary.format())
+        if self._suppressed:
+            lines.append(self._suppressed_text())
+            self._suppressed = []
+        self._log.write("\n".join(lines) + "\n\n")
+        top = next(iter(stall.samples.most_common(1)), None)
+        where = f" in {os.path.basename(top[0][0][0])}:{top[0][0][1]} {top[0][0][2]}" if top else ""
+        print(f"[watchdog] main loop stalled {stall.duration_ms:.0f} ms{where}, see {self.path}",
+              file=sys.stderr)
+
+    def _suppressed_text(self):
+        longest = max(self._suppressed, key=lambda s: s.duration_ms)
+        return (f"-- plus {len(self._suppressed)} stall(s) not reported since the last report, "
+                f"longest {longest.describe()}")
+
+    def _flush_suppressed(self):
+        if self._suppressed:
+            self._log.write(f"=== at exit ===\n{self._suppressed_text()}\n\n")
+            self._suppressed = []
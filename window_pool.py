@@ -0,0 +1,166 @@
+"""Pool of pre-built, reusable app windows.
+
+Opening an app used to create a brand-new ``Toplevel`` on every click, and
+windows that were never closed just piled up.  ``WindowPool`` builds each app
+window once, hides it (``withdraw``) when it is closed and shows the pooled
+instance again (``deiconify``) on the next launch.
+
+* ``single_instance=True`` - launching an app that is already open just
+  raises the existing window
+* at most ``max_idle`` hidden windows are kept per app type
+* at most ``max_windows`` pooled windows exist in total; beyond that the
+  least-recently-used idle one is recycled.  An open window is never taken
+  away: when every pooled window is open, the new one is built outside the
+  pool and destroyed when it is closed.
+* ``prewarm()`` builds hidden instances ahead of time, one per scheduler tick
+"""
+import collections
+import time
+import tkinter as tk
+
+from scheduler import get_scheduler, PRIORITY_LOW
+
+
+class AppSpec:
+    __slots__ = ("name", "build", "refresh", "single_instance")
+
+    def __init__(self, name, build, refresh, single_instance):
+        self.name = name
+        self.build = build
+        self.refresh = refresh
+        self.single_instance = single_instance
+
+
+class PooledWindow:
+    __slots__ = ("spec", "win", "open")
+
+    def __init__(self, spec, win):
+        self.spec = spec
+        self.win = win
+        self.open = False
+
+
+class WindowPool:
+    def __init__(self, root, max_windows=12, max_idle=2):
+        self.root = root
+        self.max_windows = max_windows
+        self.max_idle = max_idle
+        self._specs = {}
+        self._lru = collections.OrderedDict()
+        self._overflow = {}      # windows built while the pool was full of open ones
+        # Stats
+        self.builds = 0
+        self.reuses = 0
+        self.evictions = 0
+        self.overflows = 0
+        self.last_open_ms = 0.0
+
+    def register(self, app_type, build, refresh=None, single_instance=False):
+        """``build(win)`` fills a new Toplevel; ``refresh(win)`` runs on every launch."""
+        self._specs[app_type] = AppSpec(app_type, build, refresh, single_instance)
+
+    def owns(self, win):
+        return str(win) in self._lru
+
+    def open_count(self):
+        """Number of app windows currently open (shown)."""
+        return sum(1 for entry in self._lru.values() if entry.open) + len(self._overflow)
+
+    # ---------- LAUNCH / CLOSE ----------
+    def open(self, app_type):
+        start = time.perf_counter()
+        spec = self._specs[app_type]
+        entry = None
+        if spec.single_instance:
+            entry = self._find(spec, opened=True)
+        if entry is None:
+            entry = self._find(spec, opened=False)
+        pooled = True
+        if entry is None and len(self._lru) >= self.max_windows:
+            entry = self._recycle(spec)
+            pooled = len(self._lru) < self.max_windows
+        if entry is None:
+            entry = self._build(spec, pooled)
+        else:
+            self.reuses += 1
+        self._show(entry)
+        self.last_open_ms = (time.perf_counter() - start) * 1000
+        return entry.win
+
+    def close(self, win):
+        """Hide ``win`` and keep it for the next launch of its app."""
+        entry = self._lru.get(str(win))
+        if entry is None:
+            win.destroy()
+            return
+        if entry.open:
+            entry.open = False
+            win.withdraw()
+        idle = [e for e in self._lru.values() if e.spec is entry.spec and not e.open]
+        for extra in idle[:-self.max_idle] if self.max_idle else idle:
+            self._evict(extra)
+
+    def close_all(self):
+        for entry in list(self._lru.values()):
+            if entry.open:
+                self.close(entry.win)
+
+    def prewarm(self, app_type, count=1):
+        """Build up to ``count`` hidden windows for ``app_type`` in the background."""
+        spec = self._specs[app_type]
+        scheduler = get_scheduler(self.root)
+
+        def build_one():
+            idle = sum(1 for e in self._lru.values() if e.spec is spec and not e.open)
+            if idle >= min(count, self.max_idle) or len(self._lru) >= self.max_windows:
+                return False
+            self._build(spec)
+        scheduler.every(1, build_one, priority=PRIORITY_LOW, delay_ms=0)
+
+    # ---------- INTERNALS ----------
+    def _find(self, spec, opened):
+        # Most recently used first
+        for entry in reversed(self._lru.values()):
+            if entry.spec is spec and entry.open == opened:
+                return entry
+        return None
+
+    def _recycle(self, spec):
+        victim = next((e for e in self._lru.values() if not e.open), None)
+        if victim is None or victim.spec is spec:
+            return victim
+        self._evict(victim)
+        return None
+
+    def _build(self, spec, pooled=True):
+        win = tk.Toplevel(self.root)
+        win.withdraw()
+        spec.build(win)
+        entry = PooledWindow(spec, win)
+        self.builds += 1
+        key = str(win)
+        if not pooled:
+            # Closing it (window manager or ``close``) destroys it
+            win.bind("<Destroy>", lambda e: self._overflow.pop(key, None) if str(e.widget) == key else None, add="+")
+            self._overflow[key] = entry
+            self.overflows += 1
+            return entry
+        win.protocol("WM_DELETE_WINDOW", lambda: self.close(win))
+        win.bind("<Destroy>", lambda e: self._lru.pop(key, None) if str(e.widget) == key else None, add="+")
+        self._lru[key] = entry
+        return entry
+
+    def _show(self, entry):
+        entry.open = True
+        key = str(entry.win)
+        if key in self._lru:
+            self._lru.move_to_end(key)
+        if entry.spec.refresh is not None:
+            entry.spec.refresh(entry.win)
+        entry.win.deiconify()
+        entry.win.lift()
+
+    def _evict(self, entry):
+        self._lru.pop(str(entry.win), None)
+        entry.win.destroy()
+        self.evictions += 1